@@ -0,0 +1,84 @@
+"""
+Benchmark for the attendance report aggregation.
+
+Builds a throwaway SQLite database with N employees x D days of attendance
+and times aggregate_attendance() against the old one-query-per-employee loop.
+
+    python bench_attendance_report.py --employees 5000 --days 365
+"""
+import argparse
+import os
+import random
+import tempfile
+import time as timer
+from datetime import date, time, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+
+    from main_app.config import Config
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+
+    from sqlalchemy import insert
+    from main_app import create_app
+    from main_app.extensions import db
+    from main_app.models.hr_models import Employee, Department, Attendance
+    from main_app.services.attendance_stats import aggregate_attendance
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        rnd = random.Random(7)
+
+        db.session.execute(insert(Department), [{"name": f"Department {i}"} for i in range(20)])
+        db.session.execute(insert(Employee), [
+            dict(employee_id=f"BENCH-{i:05d}", first_name=f"First{i}", last_name=f"Last{i}",
+                 email=f"bench{i}@example.com", date_hired=date(2020, 1, 1),
+                 department_id=i % 20 + 1, status="Active", archived=False)
+            for i in range(args.employees)
+        ])
+
+        start = date(2025, 1, 1)
+        end = start + timedelta(days=args.days - 1)
+        started = timer.perf_counter()
+        for emp_id in range(1, args.employees + 1):
+            rows = []
+            for d in range(args.days):
+                status = rnd.choices(["Present", "Late", "Absent"], [80, 12, 8])[0]
+                rows.append(dict(
+                    employee_id=emp_id, date=start + timedelta(days=d),
+                    time_in=time(8, 0) if status != "Absent" else None,
+                    time_out=time(17, 0) if status != "Absent" else None,
+                    status=status, working_hours=8.0 if status != "Absent" else 0.0
+                ))
+            db.session.execute(insert(Attendance), rows)
+        db.session.commit()
+        print(f"Seeded {args.employees * args.days:,} attendance rows in {timer.perf_counter() - started:.1f}s")
+
+        started = timer.perf_counter()
+        summary = aggregate_attendance(start, end, Employee.status == "Active")
+        print(f"aggregate_attendance: {timer.perf_counter() - started:.2f}s "
+              f"({len(summary['employees'])} employees, {len(summary['departments'])} departments)")
+
+        if not args.skip_legacy:
+            started = timer.perf_counter()
+            for emp in Employee.query.filter(Employee.status == "Active").all():
+                emp_att = Attendance.query.filter(
+                    Attendance.employee_id == emp.id,
+                    Attendance.date >= start,
+                    Attendance.date <= end
+                ).all()
+                sum(1 for a in emp_att if a.status in ["Present", "Late"])
+                sum(a.working_hours for a in emp_att)
+            print(f"per-employee loop:    {timer.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for the working-hours kernel.
+
+Generates N random (time_in, time_out, status) punches and times
+compute_working_hours() against the old per-row rule, which is run on a
+sample and extrapolated.
+
+    python bench_working_hours.py --punches 1000000
+"""
+import argparse
+import random
+import time as timer
+from datetime import date, datetime, time
+
+import numpy as np
+
+
+def legacy_hours(work_date, time_in, time_out, status):
+    """The per-row rule the Attendance listener used to run."""
+    if status == "Absent" or not time_in or not time_out:
+        return 0.0
+    work_start = datetime.combine(work_date, time(8, 0))
+    work_end = datetime.combine(work_date, time(17, 0))
+    start = max(datetime.combine(work_date, time_in), work_start)
+    end = min(datetime.combine(work_date, time_out), work_end)
+    if end <= start:
+        return 0.0
+    total_hours = (end - start).total_seconds() / 3600
+    return round(total_hours - 1, 2) if total_hours > 4 else round(total_hours, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--punches", type=int, default=1_000_000)
+    parser.add_argument("--legacy-sample", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from main_app.services.working_hours import compute_working_hours, time_seconds
+
+    rnd = random.Random(7)
+    n = args.punches
+    statuses = rnd.choices(["Present", "Late", "Absent"], [80, 12, 8], k=n)
+    # Second resolution, like device imports, so rounding ties are exercised
+    time_ins = [
+        None if s == "Absent" else time(rnd.randint(6, 10), rnd.randint(0, 59), rnd.randint(0, 59))
+        for s in statuses
+    ]
+    time_outs = [
+        None if s == "Absent" else time(rnd.randint(12, 19), rnd.randint(0, 59), rnd.randint(0, 59))
+        for s in statuses
+    ]
+    absent = np.array([s == "Absent" for s in statuses])
+
+    started = timer.perf_counter()
+    tin = time_seconds(time_ins)
+    tout = time_seconds(time_outs)
+    converted = timer.perf_counter() - started
+
+    started = timer.perf_counter()
+    result = compute_working_hours(tin, tout, absent)
+    kernel = timer.perf_counter() - started
+
+    print(f"{n:,} punches")
+    print(f"  time -> seconds:   {converted:.3f}s")
+    print(f"  kernel:            {kernel:.3f}s ({n / kernel / 1e6:.1f}M punches/s)")
+    print(f"  end to end:        {converted + kernel:.3f}s ({n / (converted + kernel) / 1e6:.2f}M punches/s)")
+
+    sample = min(args.legacy_sample, n)
+    day = date(2025, 1, 6)
+    started = timer.perf_counter()
+    legacy = [legacy_hours(day, time_ins[i], time_outs[i], statuses[i]) for i in range(sample)]
+    per_row = (timer.perf_counter() - started) / sample
+    print(f"  per-row rule:      {per_row * n:.3f}s extrapolated ({1 / per_row / 1e6:.2f}M punches/s)")
+
+    mismatches = int(np.sum(np.abs(result["hours"][:sample] - np.array(legacy)) > 1e-9))
+    print(f"  mismatches vs per-row rule on {sample:,} sample: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from main_app.models.user import User
 # Import all HR and Payroll models so Flask-Migrate can detect them
 from main_app.models.hr_models import *
 from main_app.models.payroll_models import *
+from main_app.models.job_models import *
 
 def create_app():
     # Use shared templates and static folders
@@ -29,6 +30,38 @@ def create_app():
     login_manager.init_app(app)
     mail.init_app(app)
 
+    # Late ledger sync runs once per commit instead of per attendance row
+    from main_app.services.late_ledger import register_late_ledger
+    register_late_ledger()
+
+    # Daily attendance rollup is refreshed for the days touched per commit
+    from main_app.services.attendance_rollup import register_attendance_rollup
+    register_attendance_rollup()
+
+    # Cached payroll dashboard statistics are dropped on payroll writes
+    from main_app.services.payroll_stats import register_payroll_stats
+    register_payroll_stats()
+
+    # Compiled deduction rules are dropped on deduction/bracket writes
+    from main_app.services.deduction_rules import register_deduction_rules
+    register_deduction_rules()
+
+    # Per-employee yearly payroll totals follow payroll commits
+    from main_app.services.payroll_ledger import register_payroll_ledger
+    register_payroll_ledger()
+
+    # Cached employee dashboard summaries follow attendance/leave commits
+    from main_app.services.employee_summary import register_employee_summary
+    register_employee_summary()
+
+    # Working-day calendar is regenerated when shifts or holidays change
+    from main_app.services.work_calendar import register_work_calendar
+    register_work_calendar()
+
+    # Cached request identities are dropped on user/employee changes
+    from main_app.services.identity import load_identity_user, register_identity_cache
+    register_identity_cache()
+
     # Login settings
     login_manager.login_view = "hr_auth_bp.login"
     login_manager.login_message_category = "info"
@@ -38,7 +71,8 @@ def create_app():
     # -----------------------------
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # User, employee profile and department in one cached lookup
+        return load_identity_user(int(user_id))
     # -----------------------------
     # Register Payroll Blueprints
     # -----------------------------
@@ -56,6 +90,12 @@ def create_app():
     app.register_blueprint(payroll_auth_bp)
     app.register_blueprint(payroll_employee_bp, url_prefix='/payroll/employee')
 
+    # -----------------------------
+    # CLI commands
+    # -----------------------------
+    from main_app.commands import register_commands
+    register_commands(app)
+
 
     # -----------------------------
     # Root route
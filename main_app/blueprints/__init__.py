@@ -13,6 +13,9 @@ def register_blueprint(app):
     
     #payroll blueprints
     from main_app.blueprints.payroll_system.routes.admin import payroll_admin_bp
+
+    #background jobs
+    from main_app.blueprints.jobs import jobs_bp
     
     app.register_blueprint(hr_auth_bp)
     app.register_blueprint(hr_admin_bp)
@@ -20,4 +23,5 @@ def register_blueprint(app):
     app.register_blueprint(hr_officer_bp, url_prefix="/hr/officer")
     app.register_blueprint(leave_officer_bp, url_prefix="/hr/leave-officer")
     app.register_blueprint(hr_employee_bp, url_prefix="/hr-employee")
-    app.register_blueprint(payroll_admin_bp, url_prefix="/payroll/admin")
\ No newline at end of file
+    app.register_blueprint(payroll_admin_bp, url_prefix="/payroll/admin")
+    app.register_blueprint(jobs_bp, url_prefix="/jobs")
\ No newline at end of file
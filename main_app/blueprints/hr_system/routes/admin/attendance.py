@@ -1,10 +1,9 @@
-from datetime import date, timedelta, datetime, time
+from datetime import date, datetime, time
 from flask import render_template, redirect, url_for, flash, request, session
 from flask_login import login_required, current_user
 from sqlalchemy.orm import joinedload
 from sqlalchemy import and_
 import os
-import pandas as pd
 from werkzeug.utils import secure_filename
 import uuid
 
@@ -14,6 +13,12 @@ from main_app.models.hr_models import Employee, Department, Leave, Attendance, E
 from main_app.models.user import User
 from main_app.extensions import db
 from main_app.helpers.functions import parse_date, allowed_file, ALLOWED_EXTENSIONS, UPLOAD_FOLDER
+from main_app.helpers.pagination import keyset_paginate
+from main_app.services.attendance_import import (
+    stage_attendance_import, get_import_preview, discard_import
+)
+
+from main_app.services.jobs import enqueue_job
 
 from main_app.blueprints.hr_system.routes.admin import hr_admin_bp
 
@@ -23,7 +28,8 @@ from main_app.blueprints.hr_system.routes.admin import hr_admin_bp
 @admin_required
 @login_required
 def view_attendance():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
+    direction = request.args.get('dir', 'next')
     start_date = request.args.get('start_date', '').strip()
     end_date = request.args.get('end_date', '').strip()
     employee_filter = request.args.get('employee', '').strip()
@@ -70,8 +76,11 @@ def view_attendance():
     if status_filter:
         query = query.filter(Attendance.status == status_filter)
 
-    # Pagination
-    attendances = query.order_by(Attendance.date.desc()).paginate(page=page, per_page=20, error_out=False)
+    # Keyset pagination on (date, id): constant cost however deep the page
+    attendances = keyset_paginate(
+        query, [Attendance.date, Attendance.id],
+        cursor=cursor, direction=direction, per_page=20
+    )
 
     # Lists for dropdowns
     employees = Employee.query.filter_by(archived=False).all()
@@ -97,8 +106,9 @@ def view_attendance():
 @admin_required
 @login_required
 def add_attendance():
-    preview_data = []
-     
+    preview = None
+    import_stats = None
+
     employees = Employee.query.filter_by(status='Active').all()
     if request.method == 'POST' and 'file' in request.files:
         file = request.files.get("file")
@@ -113,94 +123,45 @@ def add_attendance():
         file.save(filepath)
 
         try:
-            df = pd.read_excel(filepath, header=None)
-            records = []
-            current_id, current_name, current_dept = None, None, None
-            attendance_date = None
-
-            for _, row in df.iterrows():
-                line = " ".join(str(x) for x in row if str(x) != "nan").strip()
-                if not line or "tabling date" in line.lower():
-                    continue
-
-                if "Attendance date:" in line:
-                    attendance_date = line.split(":")[-1].strip()
-                    continue
-
-                if "User ID" in line and "Name" in line:
-                    uid_part = line.split("User ID:")[-1]
-                    name_part = uid_part.split("Name:")
-                    id_value = name_part[0].strip() if len(name_part) > 0 else None
-
-                    if len(name_part) > 1:
-                        name_dept_part = name_part[1].split("Department:")
-                        name = name_dept_part[0].strip()
-                        dept = name_dept_part[1].strip() if len(name_dept_part) > 1 else "Unknown"
-                    else:
-                        name, dept = "Unknown", "Unknown"
-
-                    current_id, current_name, current_dept = id_value, name, dept
-                    continue
-
-                if ":" in line:
-                    times = line.split()
-                    time_in = times[0] if len(times) > 0 else None
-                    time_out = times[1] if len(times) > 1 else None
-                    day_value = attendance_date or datetime.now().date().isoformat()
-
-                    emp_match = None
-                    try:
-                        emp_id_int = int(float(current_id))
-                        emp_match = Employee.query.get(emp_id_int)
-                    except:
-                        emp_match = None
-
-                    record_name = emp_match.get_full_name() if emp_match else current_name or "Unknown"
-                    matched = True if emp_match else False
-
-                    records.append({
-                        "Employee ID": current_id,
-                        "Name": record_name,
-                        "Department": getattr(emp_match.department, 'name', 'N/A') if emp_match else "Unknown",
-                        "Day": day_value,
-                        "Time In": time_in if matched else None,
-                        "Time Out": time_out if matched else None,
-                        "Matched": matched
-                    })
-
-            db_employees = Employee.query.filter_by(active=True).all()
-            excel_ids = {int(float(r["Employee ID"])) for r in records if r["Matched"]}
-
-            for emp in db_employees:
-                if emp.id not in excel_ids:
-                    records.append({
-                        "Employee ID": emp.id,
-                        "Name": emp.get_full_name(),
-                        "Department": getattr(emp.department, 'name', 'N/A') if emp.department else 'N/A',
-                        "Day": attendance_date or datetime.now().date().isoformat(),
-                        "Time In": None,
-                        "Time Out": None,
-                        "Matched": False
-                    })
-
-            if not records:
-                flash("No valid attendance records found. Please check the Excel format.", "danger")
-                return redirect(request.url)
-
-            # Store in session
-            session['import_attendance_preview'] = records
-            preview_data = records
-            flash("Preview loaded. Please confirm import.", "info")
-
+            # Stage parsed rows server-side; only the import id goes in the session
+            import_id, import_stats = stage_attendance_import(filepath)
         except Exception as e:
+            db.session.rollback()
             flash(f"Error reading Excel file: {e}", "danger")
             return redirect(request.url)
+        finally:
+            try:
+                os.remove(filepath)
+            except OSError as e:
+                print(f"⚠️ Cleanup error: {e}")
+
+        if not import_stats["rows"]:
+            discard_import(import_id)
+            flash("No valid attendance records found. Please check the Excel format.", "danger")
+            return redirect(request.url)
 
-    # Load preview from session if exists
-    if 'import_attendance_preview' in session and not preview_data:
-        preview_data = session['import_attendance_preview']
+        previous_id = session.get('attendance_import_id')
+        if previous_id:
+            discard_import(previous_id)
 
-    return render_template('hr/admin/attendance/import_attendance.html', preview=preview_data, employees=employees)
+        session['attendance_import_id'] = import_id
+        flash("Preview loaded. Please confirm import.", "info")
+
+    # Load preview page for the staged import, if any
+    import_id = session.get('attendance_import_id')
+    if import_id:
+        page = request.args.get('page', 1, type=int)
+        preview = get_import_preview(import_id, page=page)
+        if not preview.total:
+            session.pop('attendance_import_id', None)
+            preview = None
+
+    return render_template(
+        'hr/admin/attendance/import_attendance.html',
+        preview=preview,
+        import_stats=import_stats,
+        employees=employees
+    )
 
 
 
@@ -210,82 +171,22 @@ def add_attendance():
 @hr_admin_bp.route('/add_attendance/confirm', methods=['POST'])
 @admin_required
 @login_required
-def confirm_import_attendance():    
-    import os
-    records = session.get('import_attendance_preview', [])
-    if not records:
+def confirm_import_attendance():
+    import_id = session.get('attendance_import_id')
+    if not import_id:
         flash("No attendance records to import.", "danger")
         return redirect(url_for('hr_admin_bp.add_attendance'))
 
-    imported_count = 0
-
-    for row in records:
-        emp_id = row.get("Employee ID")
-        try:
-            emp_id_int = int(float(emp_id))
-        except:
-            continue
-
-        emp = Employee.query.get(emp_id_int)
-        if not emp:
-            continue
-
-        day = row.get("Day")
-        if not day or "Tabling" in str(day):
-            continue
-
-        # Convert day string to date
-        try:
-            date_list = []
-            if "~" in day:
-                start_str, end_str = day.split("~")
-                start_date = pd.to_datetime(start_str.strip(), errors='coerce').date()
-                end_date = pd.to_datetime(end_str.strip(), errors='coerce').date()
-                if start_date and end_date:
-                    date_list = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
-            else:
-                single_date = pd.to_datetime(day.strip(), errors='coerce').date()
-                if single_date:
-                    date_list = [single_date]
-        except:
-            continue
-
-        time_in = row.get("Time In")
-        time_out = row.get("Time Out")
-
-        for att_date in date_list:
-            # ✅ Skip if already exists
-            existing = Attendance.query.filter_by(employee_id=emp.id, date=att_date).first()
-            if existing:
-                continue
-
-            time_in_obj = pd.to_datetime(time_in, errors='coerce').time() if time_in else None
-            time_out_obj = pd.to_datetime(time_out, errors='coerce').time() if time_out else None
-
-            new_att = Attendance(
-                employee_id=emp.id,
-                date=att_date,
-                time_in=time_in_obj,
-                time_out=time_out_obj,
-                status="Present" if time_in_obj else "Absent",
-                remarks=""
-            )
-            db.session.add(new_att)
-            imported_count += 1
-
-    db.session.commit()
-    session.pop('import_attendance_preview', None)
+    # Bulk insert runs in the background job pool
+    job_id = enqueue_job(
+        "attendance_import",
+        {"import_id": import_id},
+        user_id=current_user.id,
+        redirect_url=url_for('hr_admin_bp.add_attendance')
+    )
+    session.pop('attendance_import_id', None)
 
-    # ✅ Cleanup uploaded files
-    try:
-        if os.path.exists(UPLOAD_FOLDER):
-            for f in os.listdir(UPLOAD_FOLDER):
-                os.remove(os.path.join(UPLOAD_FOLDER, f))
-    except Exception as e:
-        print(f"⚠️ Cleanup error: {e}")
-
-    flash(f"✅ Successfully imported {imported_count} attendance record(s).", "success")
-    return redirect(url_for('hr_admin_bp.add_attendance'))
+    return redirect(url_for('jobs_bp.job_status', job_id=job_id))
 
 
 
@@ -13,6 +13,7 @@ from main_app.models.hr_models import Employee, Department, Leave, Attendance, E
 from main_app.models.user import User 
 from main_app.extensions import db
 from main_app.helpers.functions import parse_date, allowed_file, ALLOWED_EXTENSIONS, UPLOAD_FOLDER
+from main_app.services.attendance_rollup import daily_status_counts
 
 from main_app.blueprints.hr_system.routes.admin import hr_admin_bp
 
@@ -63,11 +64,12 @@ def hr_dashboard():
     # --- Attendance Overview (Past 7 days) ---
     attendance_labels = []
     attendance_counts = []
+    daily_counts = daily_status_counts(today - timedelta(days=6), today)
     for i in range(7):
         day = today - timedelta(days=6-i)
-        records = Attendance.query.filter_by(date=day).all()
-        total = len(records)
-        present = len([r for r in records if r.status == "Present"])
+        counts = daily_counts.get(day, {})
+        total = sum(counts.values())
+        present = counts.get("Present", 0)
         attendance_percentage = round((present / total * 100) if total else 0, 2)
         attendance_labels.append(day.strftime("%a"))
         attendance_counts.append(attendance_percentage)
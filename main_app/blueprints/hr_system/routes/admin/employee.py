@@ -13,6 +13,7 @@ from main_app.extensions import db, mail
 from main_app.helpers.functions import parse_date
 from main_app.helpers.utils import generate_employee_id
 from main_app.helpers.docs import generate_moa_excel, generate_excel_employees, generate_service_record_docx, generate_coe_pdf
+from main_app.services.employee_search import search_employees
 
 
 from main_app.blueprints.hr_system.routes.admin import hr_admin_bp
@@ -36,11 +37,7 @@ def view_employees():
 
     # Apply search filter
     if search:
-        query = query.filter(
-            Employee.first_name.ilike(f"%{search}%") |
-            Employee.last_name.ilike(f"%{search}%") |
-            Employee.email.ilike(f"%{search}%")
-        )
+        query = search_employees(query, search, ("first_name", "last_name", "email"))
 
     # Apply department filter
     if department_id:
@@ -476,10 +473,7 @@ def view_archived_employees():
     query = Employee.query.filter_by(archived=True)
 
     if search:
-        query = query.filter(
-            (Employee.first_name.ilike(f"%{search}%")) |
-            (Employee.last_name.ilike(f"%{search}%"))
-        )
+        query = search_employees(query, search, ("first_name", "last_name"))
     if department_id:
         query = query.filter(Employee.department_id == department_id)
     if employment_type_id:
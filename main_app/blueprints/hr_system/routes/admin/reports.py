@@ -8,6 +8,8 @@ from datetime import datetime, date, timedelta
 
 from main_app.helpers.decorators import admin_required
 from main_app.models.hr_models import Position, Employee, Department, Attendance, Leave
+from main_app.services.attendance_stats import aggregate_attendance
+from main_app.services.jobs import enqueue_job
 
 
 from main_app.blueprints.hr_system.routes.admin import hr_admin_bp
@@ -98,80 +100,28 @@ def attendance_report():
         end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
 
     # ------------------------------
-    # Base employee query
+    # Aggregate attendance in one grouped query
     # ------------------------------
-    employees_query = Employee.query.filter(Employee.status == "Active")
+    criteria = [Employee.status == "Active"]
     if department_id:
-        employees_query = employees_query.filter(Employee.department_id == department_id)
-    employees = employees_query.all()
-    total_employees = len(employees)
-
-    # ------------------------------
-    # Collect attendance data per employee
-    # ------------------------------
-    report_data = []
-    total_hours_worked = 0
-    total_present_days = 0
-
-    for emp in employees:
-        emp_attendances = Attendance.query.filter(
-            Attendance.employee_id == emp.id,
-            Attendance.date >= start_date,
-            Attendance.date <= end_date
-        ).all()
-
-        days_present = sum(1 for a in emp_attendances if a.status in ["Present", "Late"])
-        days_absent = sum(1 for a in emp_attendances if a.status == "Absent")
-        late_count = sum(1 for a in emp_attendances if a.status == "Late")
-        hours_worked = sum(a.working_hours for a in emp_attendances)
-
-        total_hours_worked += hours_worked
-        total_present_days += days_present
-
-        report_data.append({
-            "employee_name": emp.get_full_name(),
-            "department_name": emp.department.name if emp.department else "",
-            "days_present": days_present,
-            "days_absent": days_absent,
-            "late_count": late_count,
-            "total_hours": round(hours_worked, 2)
-        })
-
-    # ------------------------------
-    # Average attendance rate
-    # ------------------------------
-    avg_attendance_rate = (
-        round((total_present_days / (total_employees * ((end_date - start_date).days + 1))) * 100, 2)
-        if total_employees > 0 else 0
-    )
-
-    # ------------------------------
-    # Department summary
-    # ------------------------------
-    department_summary = []
+        criteria.append(Employee.department_id == department_id)
+
+    summary = aggregate_attendance(start_date, end_date, *criteria)
+
+    report_data = summary["employees"]
+    total_employees = summary["totals"]["employees"]
+    total_hours_worked = summary["totals"]["total_hours"]
+    avg_attendance_rate = summary["totals"]["avg_attendance"]
+
+    department_summary = [
+        {
+            "name": dept["name"],
+            "avg_attendance": dept["avg_attendance"],
+            "avg_hours": dept["avg_hours"]
+        }
+        for dept in summary["departments"]
+    ]
     departments = Department.query.all()
-    for dept in departments:
-        dept_emps = [e for e in employees if e.department_id == dept.id]
-        if not dept_emps:
-            continue
-
-        dept_attendance_days = 0
-        dept_total_hours = 0
-        for emp in dept_emps:
-            emp_att = [a for a in report_data if a["employee_name"] == emp.get_full_name()]
-            if emp_att:
-                dept_attendance_days += emp_att[0]["days_present"]
-                dept_total_hours += emp_att[0]["total_hours"]
-        
-        num_days = ((end_date - start_date).days + 1) * len(dept_emps)
-        avg_att = round((dept_attendance_days / num_days) * 100, 2) if num_days > 0 else 0
-        avg_hours = round(dept_total_hours / len(dept_emps), 2) if dept_emps else 0
-
-        department_summary.append({
-            "name": dept.name,
-            "avg_attendance": avg_att,
-            "avg_hours": avg_hours
-        })
 
     # ------------------------------
     # Render template
@@ -216,125 +166,19 @@ def attendance_report_word():
     else:
         end_date = date.today()
 
-    total_days = (end_date - start_date).days + 1
-
-    # -----------------------------
-    # Fetch employees (optional filter by department)
-    # -----------------------------
-    employees = Employee.query.filter(Employee.archived == False)
-    if department_id:
-        employees = employees.filter(Employee.department_id == department_id)
-    employees = employees.all()
-
-    # -----------------------------
-    # Create Word Document
-    # -----------------------------
-    doc = Document()
-
-    # Header
-    header = doc.add_paragraph()
-    header.alignment = 1  # center
-    header.add_run("MUNICIPALITY OF NORZAGARAY\n").bold = True
-    header.add_run("Attendance Report\n").bold = True
-    header.add_run(f"From {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}\n").italic = True
-
-    # Table header
-    table = doc.add_table(rows=1, cols=5)
-    table.style = 'Table Grid'
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = "Employee Name"
-    hdr_cells[1].text = "Department"
-    hdr_cells[2].text = "Days Present"
-    hdr_cells[3].text = "Days Absent"
-    hdr_cells[4].text = "Total Hours Worked"
-
-    # Attendance data
-    for emp in employees:
-        emp_att = Attendance.query.filter(
-            Attendance.employee_id == emp.id,
-            Attendance.date >= start_date,
-            Attendance.date <= end_date
-        ).all()
-
-        days_present = sum(1 for a in emp_att if a.status in ["Present", "Late"])
-        days_absent = sum(1 for a in emp_att if a.status == "Absent")
-        total_hours = sum(a.working_hours for a in emp_att)
-
-        row_cells = table.add_row().cells
-        row_cells[0].text = emp.get_full_name()
-        row_cells[1].text = emp.department.name if emp.department else "N/A"
-        row_cells[2].text = str(days_present)
-        row_cells[3].text = str(days_absent)
-        row_cells[4].text = f"{total_hours:.2f}"
-
-    # -----------------------------
-    # Insights Section
-    # -----------------------------
-    doc.add_paragraph('\nOverall Insights', style='Heading 2')
-
-    if employees:
-        total_attendance_days = sum(
-            sum(1 for a in Attendance.query.filter(
-                Attendance.employee_id == emp.id,
-                Attendance.date >= start_date,
-                Attendance.date <= end_date
-            ).all() if a.status in ["Present", "Late"]) for emp in employees
-        )
-        total_possible_days = total_days * len(employees)
-        avg_attendance = round((total_attendance_days / total_possible_days) * 100, 2) if total_possible_days > 0 else 0
-
-        total_working_hours = sum(
-            sum(a.working_hours for a in Attendance.query.filter(
-                Attendance.employee_id == emp.id,
-                Attendance.date >= start_date,
-                Attendance.date <= end_date
-            ).all()) for emp in employees
-        )
-        avg_hours_per_employee = round(total_working_hours / len(employees), 2)
-
-        doc.add_paragraph(f"Total Employees: {len(employees)}")
-        doc.add_paragraph(f"Average Attendance: {avg_attendance}%")
-        doc.add_paragraph(f"Average Hours Worked per Employee: {avg_hours_per_employee} hrs")
-
-    # Department-wise insights
-    doc.add_paragraph('\nDepartment-wise Insights', style='Heading 2')
-    departments = Department.query.all()
-    for dept in departments:
-        dept_emps = [e for e in employees if e.department_id == dept.id]
-        if not dept_emps:
-            continue
-
-        dept_attendance_days = 0
-        dept_total_hours = 0
-
-        for emp in dept_emps:
-            emp_att = Attendance.query.filter(
-                Attendance.employee_id == emp.id,
-                Attendance.date >= start_date,
-                Attendance.date <= end_date
-            ).all()
-            dept_attendance_days += sum(1 for a in emp_att if a.status in ["Present", "Late"])
-            dept_total_hours += sum(a.working_hours for a in emp_att)
-
-        num_days = total_days * len(dept_emps)
-        avg_att = round((dept_attendance_days / num_days) * 100, 2) if num_days > 0 else 0
-        avg_hours = round(dept_total_hours / len(dept_emps), 2) if dept_emps else 0
-
-        doc.add_paragraph(f"{dept.name}: Avg Attendance: {avg_att}%, Avg Hours: {avg_hours}")
-
     # -----------------------------
-    # Return as Word file
+    # Built by a background job; the status page offers the download
     # -----------------------------
-    file_stream = BytesIO()
-    doc.save(file_stream)
-    file_stream.seek(0)
-
-    return send_file(
-        file_stream,
-        as_attachment=True,
-        download_name=f"Attendance_Report_{start_date}_{end_date}.docx",
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    job_id = enqueue_job(
+        "attendance_report_word",
+        {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "department_id": int(department_id) if department_id else None
+        },
+        user_id=current_user.id
     )
+    return redirect(url_for('jobs_bp.job_status', job_id=job_id))
 
 
 
@@ -1,11 +1,10 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from datetime import date
 
 from main_app.helpers.decorators import employee_required
-from main_app.models.hr_models import LeaveType
-from main_app.helpers.utils import get_leave_balance, get_attendance_chart_data, get_attendance_summary
 from main_app.extensions import db
+from main_app.services.employee_summary import employee_summary
 
 from main_app.blueprints.hr_system.routes.employee import hr_employee_bp
 
@@ -20,19 +19,11 @@ def dashboard():
         flash('Employee record not found. Please contact HR.', 'error')
         return redirect(url_for('hr_auth.logout'))
 
-    today = date.today()
-    start_date = today.replace(day=1)
-    end_date = today
-
-    attendance_summary = get_attendance_summary(employee.id, start_date, end_date)
-    attendance_chart = get_attendance_chart_data(employee.id, start_date, end_date) or {}
-    attendance_chart.setdefault("dates", [])
-    attendance_chart.setdefault("present_counts", [])
-    attendance_chart.setdefault("absent_counts", [])
-    attendance_chart.setdefault("late_counts", [])
-
-    leave_types = LeaveType.query.all()
-    leave_balances = {lt.name: get_leave_balance(employee.id, lt.name) for lt in leave_types}
+    # Balances, attendance counts and chart series: cached per employee/day
+    summary = employee_summary(employee.id)
+    attendance_summary = summary["attendance"]
+    attendance_chart = summary["chart"]
+    leave_balances = summary["leave_balances"]
 
     working_duration = employee.get_working_duration()
 
@@ -47,6 +38,19 @@ def dashboard():
     )
 
 
+@hr_employee_bp.route('/api/summary')
+@login_required
+@employee_required
+def summary_api():
+    """Self-service summary as JSON: leave balances, attendance counts, chart series."""
+    employee = current_user.employee_profile
+
+    if not employee:
+        return jsonify({'error': 'Employee record not found'}), 404
+
+    return jsonify(employee_summary(employee.id))
+
+
 @hr_employee_bp.route("/profile")
 @login_required
 @employee_required
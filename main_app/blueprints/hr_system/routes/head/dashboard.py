@@ -1,17 +1,48 @@
-from flask import render_template, request, flash, redirect, url_for
+from flask import render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
 from types import SimpleNamespace
-from collections import defaultdict
+from datetime import date
+from sqlalchemy import func, select
 
 from main_app.extensions import db
 from main_app.models.hr_models import Department, Employee, Attendance, Leave
 from main_app.helpers.decorators import dept_head_required
-from main_app.helpers.utils import get_department_attendance_summary, get_current_month_range
+from main_app.services.attendance_rollup import HEATMAP_STATUSES, month_heatmap
 
 from main_app.blueprints.hr_system.routes.head import hr_head_bp
 
 
 
+def _head_department():
+    """Department the logged-in head manages (assigned or headed)."""
+    if current_user.department_id:
+        return Department.query.get(current_user.department_id)
+    return Department.query.filter_by(head_id=current_user.id).first()
+
+
+def _parse_day(value):
+    try:
+        return date.fromisoformat((value or "")[:10])
+    except ValueError:
+        return None
+
+
+def _months_between(start, end):
+    """(year, month) of every month touching [start, end)."""
+    year, month = start.year, start.month
+    while date(year, month, 1) < end:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _heat_color(summary):
+    if summary["Absent"] > 0:
+        return "#dc2626"
+    if summary["Late"] > 0:
+        return "#f59e0b"
+    return "#16a34a"
+
+
 @hr_head_bp.route('/head-dashboard')
 @login_required
 @dept_head_required
@@ -22,14 +53,7 @@ def dashboard():
     # Determine Department
     # ============================================================
 
-    department = None
-
-    if current_user.department_id:
-        department = Department.query.get(current_user.department_id)
-    else:
-        department = Department.query.filter_by(
-            head_id=current_user.id
-        ).first()
+    department = _head_department()
 
     if not department:
         return render_template(
@@ -43,113 +67,30 @@ def dashboard():
         db.session.commit()
 
     # ============================================================
-    # Load Active Department Employees
-    # ============================================================
-
-    department_employees = Employee.query.filter_by(
-        department_id=department.id,
-        status="Active",
-        archived=False
-    ).all()
-
-    total_employees = len(department_employees)
-
-    # ============================================================
-    # Attendance Monthly Aggregation
-    # ============================================================
-
-    start_date, end_date = get_current_month_range()
-
-    attendances = Attendance.query.options(
-        db.joinedload(Attendance.employee)
-    ).join(Employee).filter(
-        Employee.department_id == department.id,
-        Attendance.date.between(start_date, end_date)
-    ).all()
-
-    # ============================================================
-    # Calendar Heatmap Summary
-    # ============================================================
-
-    calendar_summary = defaultdict(lambda: {
-        "Present": 0,
-        "Absent": 0,
-        "Late": 0,
-        "OnLeave": 0
-    })
-
-    # ⭐ THIS STRUCTURE MATCHES YOUR TEMPLATE JS
-    attendance_details = defaultdict(lambda: {
-        "Present": 0,
-        "Absent": 0,
-        "Late": 0,
-        "OnLeave": 0,
-        "records": []
-    })
-
-    total_present = 0
-    total_absent = 0
-    total_late = 0
-
-    # ============================================================
-    # Aggregation Loop
+    # Active Department Employees
     # ============================================================
 
-    VALID_STATUSES = {"Present", "Absent", "Late", "OnLeave"}
-
-    for record in attendances:
-
-        if not record.employee:
-            continue
-
-        date_str = record.date.strftime("%Y-%m-%d")
-
-        status = (record.status or "").strip()
-
-        if status not in VALID_STATUSES:
-            continue
-
-        # Update calendar summary counts
-        calendar_summary[date_str][status] += 1
-
-        # Global counters
-        if status == "Present":
-            total_present += 1
-        elif status == "Absent":
-            total_absent += 1
-        elif status == "Late":
-            total_late += 1
-
-        # Modal + mini legend structure
-        attendance_details[date_str][status] += 1
-
-        attendance_details[date_str]["records"].append({
-            "name": record.employee.get_full_name(),
-            "status": status,
-            "time_in": record.time_in.strftime("%I:%M %p") if record.time_in else "-",
-            "time_out": record.time_out.strftime("%I:%M %p") if record.time_out else "-"
-        })
+    total_employees = db.session.scalar(
+        select(func.count(Employee.id)).where(
+            Employee.department_id == department.id,
+            Employee.status == "Active",
+            Employee.archived == False
+        )
+    ) or 0
 
     # ============================================================
-    # Calendar Events Heat Legend
+    # Monthly Totals (cached per department/month heatmap)
     # ============================================================
 
-    attendance_events = []
-
-    for date_str, summary in calendar_summary.items():
+    # The calendar itself loads from dashboard_heatmap / day_attendance
+    today = date.today()
+    heatmap = month_heatmap(today.year, today.month, department.id)
 
-        if summary["Absent"] > 0:
-            color = "#dc2626"
-        elif summary["Late"] > 0:
-            color = "#f59e0b"
-        else:
-            color = "#16a34a"
-
-        attendance_events.append({
-            "title": f"P:{summary['Present']} A:{summary['Absent']} L:{summary['Late']}",
-            "start": date_str,
-            "color": color
-        })
+    attendance_summary = SimpleNamespace(
+        total_present=sum(day["Present"] for day in heatmap.values()),
+        total_absent=sum(day["Absent"] for day in heatmap.values()),
+        total_late=sum(day["Late"] for day in heatmap.values())
+    )
 
     # ============================================================
     # Recent Leaves
@@ -164,12 +105,6 @@ def dashboard():
         Leave.created_at.desc()
     ).limit(10).all()
 
-    attendance_summary = SimpleNamespace(
-        total_present=total_present,
-        total_absent=total_absent,
-        total_late=total_late
-    )
-
     # ============================================================
     # Render Template
     # ============================================================
@@ -179,13 +114,82 @@ def dashboard():
         not_assigned=False,
         department=department,
         total_employees=total_employees,
-        attendance_events=attendance_events,
-        attendance_details=dict(attendance_details),
         attendance_summary=attendance_summary,
         recent_leaves=recent_leaves
     )
 
 
+# ============================================================
+# CALENDAR HEATMAP API
+# ============================================================
+
+@hr_head_bp.route('/head-dashboard/heatmap')
+@login_required
+@dept_head_required
+def dashboard_heatmap():
+    """
+    Per-day status counts as FullCalendar events for [start, end).
+    Each month is served from the cached rollup heatmap.
+    """
+    department = _head_department()
+    if not department:
+        return jsonify([])
+
+    start = _parse_day(request.args.get('start'))
+    end = _parse_day(request.args.get('end'))
+    if not start or not end or end <= start or (end - start).days > 62:
+        return jsonify({"error": "Invalid date range."}), 400
+
+    events = []
+    for year, month in _months_between(start, end):
+        for day, summary in month_heatmap(year, month, department.id).items():
+            if not (start.isoformat() <= day < end.isoformat()):
+                continue
+            events.append({
+                "title": f"P:{summary['Present']} A:{summary['Absent']} "
+                         f"L:{summary['Late']} O:{summary['OnLeave']}",
+                "start": day,
+                "color": _heat_color(summary),
+                "extendedProps": summary
+            })
+
+    return jsonify(events)
+
+
+@hr_head_bp.route('/head-dashboard/attendance/<day>')
+@login_required
+@dept_head_required
+def day_attendance(day):
+    """Attendance records of the head's department for one day (modal)."""
+    department = _head_department()
+    day = _parse_day(day)
+    if not department or not day:
+        return jsonify({"error": "Invalid day."}), 400
+
+    records = db.session.query(
+        Attendance.status,
+        Attendance.time_in,
+        Attendance.time_out,
+        Employee.first_name,
+        Employee.middle_name,
+        Employee.last_name
+    ).join(Employee).filter(
+        Employee.department_id == department.id,
+        Attendance.date == day,
+        Attendance.status.in_(HEATMAP_STATUSES)
+    ).order_by(Employee.last_name, Employee.first_name).all()
+
+    return jsonify([
+        {
+            "name": f"{r.first_name} {r.middle_name or ''} {r.last_name}".strip(),
+            "status": r.status,
+            "time_in": r.time_in.strftime("%I:%M %p") if r.time_in else "-",
+            "time_out": r.time_out.strftime("%I:%M %p") if r.time_out else "-"
+        }
+        for r in records
+    ])
+
+
 
 # ----------------- EDIT PASSWORD ROUTE FOR DEPT HEAD -----------------
 @hr_head_bp.route('/edit_password', methods=['GET', 'POST'])
@@ -1,12 +1,14 @@
 from flask import request, render_template
 from flask_login import login_required
 from datetime import datetime
+from sqlalchemy import exists, select
 
 
 
 from main_app.extensions import db
-from main_app.models.hr_models import Department, Leave, LeaveType, Employee
+from main_app.models.hr_models import Department, Leave, LeaveType, Employee, LateComputation
 from main_app.helpers.decorators import leave_officer_required
+from main_app.services.leave_lookup import approved_leave_map, on_leave_clause
 
 
 from main_app.blueprints.hr_system.routes.leave_officer import leave_officer_bp
@@ -28,38 +30,51 @@ def attendance():
 
     selected_date_obj = datetime.strptime(selected_date, "%Y-%m-%d").date()
 
-    employees = Employee.query.filter_by(status="Active")
+    employees = Employee.query.options(
+        db.joinedload(Employee.department)
+    ).filter_by(status="Active")
 
     if department_id:
         employees = employees.filter(Employee.department_id == department_id)
 
-    records = []
+    # --- STATUS CHECKS (evaluated in SQL) ---
+    on_leave = on_leave_clause(selected_date_obj)
+    late = exists().where(
+        LateComputation.employee_id == Employee.id,
+        LateComputation.date == selected_date_obj
+    )
 
-    for emp in employees.all():
+    # FILTER STATUS
+    if status == "on_leave":
+        employees = employees.filter(on_leave)
+    elif status == "late":
+        employees = employees.filter(~on_leave, late)
+    elif status == "absent":
+        employees = employees.filter(~on_leave, ~late)
 
-        # --- CHECK LEAVE ---
-        leave = Leave.query.filter(
-            Leave.employee_id == emp.id,
-            Leave.status == "Approved",
-            Leave.start_date <= selected_date_obj,
-            Leave.end_date >= selected_date_obj
-        ).first()
+    pagination = employees.order_by(Employee.id).paginate(
+        page=page, per_page=10, error_out=False
+    )
+    page_ids = [emp.id for emp in pagination.items]
 
-        if leave:
-            record_status = "On Leave"
+    leaves = approved_leave_map(selected_date_obj, employee_ids=page_ids)
+    late_ids = set(db.session.scalars(
+        select(LateComputation.employee_id).where(
+            LateComputation.employee_id.in_(page_ids),
+            LateComputation.date == selected_date_obj
+        )
+    )) if page_ids else set()
 
-        else:
-            # ⚠️ Replace this with real attendance logic
-            attendance = getattr(emp, "attendance", None)
+    records = []
 
-            if attendance and attendance.late_minutes > 0:
-                record_status = "Late"
-            else:
-                record_status = "Absent"
+    for emp in pagination.items:
 
-        # FILTER STATUS
-        if status and record_status.lower().replace(" ", "_") != status:
-            continue
+        if emp.id in leaves:
+            record_status = "On Leave"
+        elif emp.id in late_ids:
+            record_status = "Late"
+        else:
+            record_status = "Absent"
 
         records.append({
             "employee": emp,
@@ -68,11 +83,8 @@ def attendance():
             "date": selected_date_obj
         })
 
-    # --- MANUAL PAGINATION ---
-    total = len(records)
-    start = (page - 1) * 10
-    end = start + 10
-    paginated = records[start:end]
+    total = pagination.total
+    paginated = records
 
     departments = Department.query.order_by(Department.name).all()
 
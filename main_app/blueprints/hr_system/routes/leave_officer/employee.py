@@ -6,6 +6,8 @@ from flask_login import login_required
 from main_app.models.hr_models import Employee, Leave, Department, LeaveCredit
 from main_app.helpers.decorators import leave_officer_required
 from main_app.helpers.functions import compute_monthly_leave_credit, convert_leave_to_points
+from main_app.services.employee_search import employee_search_clause, search_employees
+from main_app.services.leave_accrual import accrual_leave_types
 
 from main_app.blueprints.hr_system.routes.leave_officer import leave_officer_bp
 
@@ -29,11 +31,7 @@ def employees():
 
     # Search by name or employee_id
     if search:
-        query = query.filter(
-            (Employee.first_name.ilike(f"%{search}%"))
-            | (Employee.last_name.ilike(f"%{search}%"))
-            | (Employee.employee_id.ilike(f"%{search}%"))
-        )
+        query = search_employees(query, search, ("first_name", "last_name", "employee_id"))
 
     # Filter by department if selected
     if department:
@@ -86,16 +84,19 @@ def view_employee(employee_id):
     # Leave Credits Retrieval
     # ===============================
 
+    # Same VL/SL leave types the accrual credits (matched by name)
+    types = accrual_leave_types()
+
     # Vacation Leave
     vacation_credit = LeaveCredit.query.filter_by(
         employee_id=employee.id,
-        leave_type_id=1
+        leave_type_id=types["vl"]
     ).first()
 
     # Sick Leave
     sick_credit = LeaveCredit.query.filter_by(
         employee_id=employee.id,
-        leave_type_id=2
+        leave_type_id=types["sl"]
     ).first()
 
     total_vac = vacation_credit.total_credits if vacation_credit else 0
@@ -108,14 +109,14 @@ def view_employee(employee_id):
     used_vac = sum(
         l.days_requested for l in employee.leaves
         if l.status == "Approved"
-        and l.leave_type.name.lower() == "vacation"
+        and l.leave_type_id == types["vl"]
         and start_date <= l.start_date <= end_date
     )
 
     used_sick = sum(
         l.days_requested for l in employee.leaves
         if l.status == "Approved"
-        and l.leave_type.name.lower() == "sick"
+        and l.leave_type_id == types["sl"]
         and start_date <= l.start_date <= end_date
     )
 
@@ -191,9 +192,7 @@ def view_leaves():
     # Filter by employee name or ID
     if search:
         query = query.filter(
-            (Employee.first_name.ilike(f"%{search}%")) |
-            (Employee.last_name.ilike(f"%{search}%")) |
-            (Employee.employee_id.ilike(f"%{search}%"))
+            employee_search_clause(search, ("first_name", "last_name", "employee_id"))
         )
 
     # Filter by leave status
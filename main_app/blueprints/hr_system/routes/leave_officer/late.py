@@ -7,6 +7,7 @@ import calendar
 from main_app.extensions import db
 from main_app.models.hr_models import Department, Leave, LeaveType, Employee
 from main_app.helpers.decorators import leave_officer_required
+from main_app.services.late_matrix import get_late_matrix
 
 
 from main_app.blueprints.hr_system.routes.leave_officer import leave_officer_bp
@@ -21,33 +22,33 @@ def late_computation():
     # ----------------------------
     month = request.args.get("month", type=int, default=datetime.now().month)
     year = request.args.get("year", type=int, default=datetime.now().year)
+    department_id = request.args.get("department_id", type=int)
 
     days_in_month = calendar.monthrange(year, month)[1]
 
     # ----------------------------
-    # DATA (replace with real logic)
+    # DATA (cached per month + department)
     # ----------------------------
-    employees = Employee.query.all()
+    matrix = get_late_matrix(year, month, department_id)
+
+    employees = Employee.query.options(db.joinedload(Employee.employment_type))
+    if department_id:
+        employees = employees.filter(Employee.department_id == department_id)
 
     data = []
-    for emp in employees:
-        row = {
+    for emp in employees.order_by(Employee.last_name, Employee.first_name).all():
+        computed = matrix["rows"].get(emp.id, {})
+
+        data.append({
             "employee": emp,
-            "total_late_minutes": 0,
-            "total_undertime_minutes": 0,
-            "days": {}
-        }
-
-        # SAMPLE empty day data (prevents template errors)
-        for d in range(1, days_in_month + 1):
-            row["days"][d] = {
-                "time_in": "-",
-                "late": "-",
-                "time_out": "-",
-                "undertime": "-"
-            }
-
-        data.append(row)
+            "total_late_minutes": computed.get("total_late_minutes", 0),
+            "total_undertime_minutes": computed.get("total_undertime_minutes", 0),
+            "days_late": computed.get("days_late", 0),
+            "days_undertime": computed.get("days_undertime", 0),
+            "days": computed.get("days", {})
+        })
+
+    departments = Department.query.order_by(Department.name).all()
 
     # ----------------------------
     return render_template(
@@ -56,5 +57,7 @@ def late_computation():
         month=month,
         year=year,
         days_in_month=days_in_month,
+        departments=departments,
+        department_id=department_id,
         datetime=datetime
     )    
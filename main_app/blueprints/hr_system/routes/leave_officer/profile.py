@@ -7,6 +7,7 @@ from datetime import date
 from main_app.extensions import db
 from main_app.models.hr_models import Department, Leave, LeaveType, Employee
 from main_app.helpers.decorators import leave_officer_required
+from main_app.services.identity import current_employee
 
 
 from main_app.blueprints.hr_system.routes.leave_officer import leave_officer_bp
@@ -18,7 +19,7 @@ from main_app.blueprints.hr_system.routes.leave_officer import leave_officer_bp
 @login_required
 @leave_officer_required
 def profile():
-    employee = Employee.query.filter_by(user_id=current_user.id).first()
+    employee = current_employee()
 
     if not employee:
         abort(404)
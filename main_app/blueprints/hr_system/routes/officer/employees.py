@@ -5,6 +5,7 @@ from datetime import datetime, date
 from main_app.extensions import db
 from main_app.models.hr_models import Employee, Department, Position
 from main_app.helpers.decorators import hr_officer_required 
+from main_app.services.employee_search import search_employees
 
 from main_app.blueprints.hr_system.routes.officer import hr_officer_bp
 
@@ -23,11 +24,7 @@ def employees():
 
     # Search by name or employee_id
     if search:
-        query = query.filter(
-            (Employee.first_name.ilike(f"%{search}%"))
-            | (Employee.last_name.ilike(f"%{search}%"))
-            | (Employee.employee_id.ilike(f"%{search}%"))
-        )
+        query = search_employees(query, search, ("first_name", "last_name", "employee_id"))
 
     # Filter by department if selected
     if department:
@@ -0,0 +1,13 @@
+from flask import Blueprint
+
+
+
+jobs_bp = Blueprint(
+    'jobs_bp',
+    __name__,
+    template_folder='templates'
+    )
+
+
+
+from . import routes
@@ -0,0 +1,58 @@
+from io import BytesIO
+
+from flask import render_template, jsonify, abort, send_file
+from flask_login import login_required, current_user
+
+from main_app.extensions import db
+from main_app.models.job_models import BackgroundJob
+
+from main_app.blueprints.jobs import jobs_bp
+
+
+# Exception text stays in the job row and the server log (services/jobs.py)
+JOB_ERROR_MESSAGE = "An internal error occurred while running this job."
+
+
+def _get_own_job(job_id):
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None:
+        abort(404)
+    if job.created_by is not None and job.created_by != current_user.id:
+        abort(403)
+    return job
+
+
+# ----------------- STATUS PAGE (polls the JSON endpoint) -----------------
+@jobs_bp.route('/<job_id>')
+@login_required
+def job_status(job_id):
+    job = _get_own_job(job_id)
+    return render_template('main_app/job_status.html', job=job)
+
+
+# ----------------- STATUS JSON -----------------
+@jobs_bp.route('/<job_id>/status')
+@login_required
+def job_status_json(job_id):
+    job = _get_own_job(job_id)
+    data = job.to_dict()
+    if data["error"]:
+        data["error"] = JOB_ERROR_MESSAGE
+    return jsonify(data)
+
+
+# ----------------- RESULT DOWNLOAD -----------------
+@jobs_bp.route('/<job_id>/download')
+@login_required
+def job_download(job_id):
+    job = _get_own_job(job_id)
+    if job.status != "finished" or job.result is None:
+        abort(404)
+
+    # send_file quotes the name and RFC 5987-encodes non-ASCII characters
+    return send_file(
+        BytesIO(job.result),
+        mimetype=job.result_mimetype or "application/octet-stream",
+        as_attachment=True,
+        download_name=job.result_name or job.id
+    )
@@ -3,11 +3,16 @@ from main_app.models.payroll_models import PayrollPeriod, Payroll, Deduction, Pa
 from main_app.utils import payroll_admin_required
 from main_app.extensions import db
 from main_app.functions import generate_payslip
+from main_app.services.jobs import enqueue_job
+from main_app.services.payroll_insights import get_payroll_insights, local_report
+from main_app.services.payroll_stats import department_employee_counts
+from main_app.services.employee_search import search_employees
+from main_app.helpers.pagination import keyset_paginate
 
 from sqlalchemy import func, or_
 from sqlalchemy.orm import joinedload
 from datetime import date
-from flask import render_template, request, redirect, flash, url_for
+from flask import render_template, request, redirect, flash, url_for, jsonify
 from flask_login import login_required, current_user
 
 
@@ -130,6 +135,22 @@ def payroll_dashboard():
     )
 
 
+@payroll_admin_bp.route('/dashboard/insights')
+@payroll_admin_required
+@login_required
+def payroll_insights():
+    # Never blocks the page: "pending" until the background call finishes;
+    # the dashboard polls this and shows the local figures meanwhile
+    insights = get_payroll_insights(timeout=0)
+
+    return jsonify({
+        "status": insights["status"],
+        "report": insights["report"],
+        "fallback": None if insights["status"] == "ready" else local_report(insights["summary"]),
+        "fingerprint": insights["fingerprint"]
+    })
+
+
 
 
 @payroll_admin_bp.route('/payrolls')
@@ -139,7 +160,8 @@ def view_payrolls():
     search = request.args.get('search', '', type=str).strip()
     department_id = request.args.get('department_id', type=int)
     pay_period_id = request.args.get('pay_period_id', type=int)
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
+    direction = request.args.get('dir', 'next')
 
     # ================= BASE QUERY =================
     query = Payroll.query.join(Employee, Payroll.employee_id == Employee.id)
@@ -162,8 +184,8 @@ def view_payrolls():
     if pay_period_id:
         query = query.filter(Payroll.payroll_period_id == pay_period_id)
 
-    # ---------------- Pagination ----------------
-    payrolls = query.order_by(Payroll.id.desc()).paginate(page=page, per_page=10, error_out=False)
+    # ---------------- Pagination (keyset on id) ----------------
+    payrolls = keyset_paginate(query, [Payroll.id], cursor=cursor, direction=direction, per_page=10)
 
     # Dropdown Data
     departments = Department.query.all()
@@ -189,21 +211,8 @@ def view_payrolls():
 @payroll_admin_required
 @login_required
 def process_payroll():
-    # Get all active employees
-    employees = Employee.query.filter_by(status="Active").all()
-
-    # Get unique departments
-    departments = Department.query.all()
-
-    # Count employees per department
-    dept_data = []
-    for dept in departments:
-        count = Employee.query.filter_by(status="Active", department_id=dept.id).count()
-        dept_data.append({
-            "id": dept.id,
-            "name": dept.name,
-            "employee_count": count
-        })
+    # Active employees per department (one grouped query, cached)
+    dept_data = department_employee_counts("Active")
 
     return render_template(
         'payroll/admin/navigations/process_payroll.html',
@@ -229,12 +238,7 @@ def view_employees():
 
    
     if search:
-        query = query.filter(
-            (Employee.first_name.ilike(f"%{search}%")) |
-            (Employee.last_name.ilike(f"%{search}%")) |
-            (Employee.employee_id.ilike(f"%{search}%")) |
-            (Employee.email.ilike(f"%{search}%"))
-        )
+        query = search_employees(query, search)
 
     
     if department_id:
@@ -344,31 +348,23 @@ def generate_payslips_by_period():
     payroll_periods = PayrollPeriod.query.order_by(PayrollPeriod.start_date.desc()).all()
 
     if request.method == 'POST':
-        pay_period_id = request.form.get('pay_period_id')
+        pay_period_id = request.form.get('pay_period_id', type=int)
         if not pay_period_id:
             flash("Please select a payroll period.", "warning")
-            return redirect(url_for('payroll_admin.generate_payslips_by_period'))
-
-        # Fetch payrolls for selected period
-        payrolls = Payroll.query.filter_by(pay_period_id=pay_period_id).all()
-        if not payrolls:
-            flash("No payrolls found for this pay period.", "warning")
-            return redirect(url_for('payroll_admin.generate_payslips_by_period'))
-
-        generated_by_id = current_user.id
-        generated_count = 0
-
-        for payroll in payrolls:
-            existing = Payslip.query.filter_by(payroll_id=payroll.id).first()
-            if existing:
-                continue  # Skip if payslip already exists
-            payslip = generate_payslip(payroll, generated_by_id)
-            db.session.add(payslip)
-            generated_count += 1
-
-        db.session.commit()
-        flash(f"{generated_count} payslips successfully generated for the selected period.", "success")
-        return redirect(url_for('payroll_admin.view_payslips'))
+            return redirect(url_for('payroll_admin_bp.generate_payslips_by_period'))
+
+        if db.session.get(PayrollPeriod, pay_period_id) is None:
+            flash("Selected payroll period was not found.", "danger")
+            return redirect(url_for('payroll_admin_bp.generate_payslips_by_period'))
+
+        # Missing payslips are inserted in bulk by a background job
+        job_id = enqueue_job(
+            "generate_payslips",
+            {"period_id": pay_period_id},
+            user_id=current_user.id,
+            redirect_url=url_for('payroll_admin_bp.view_payslips')
+        )
+        return redirect(url_for('jobs_bp.job_status', job_id=job_id))
 
     # GET: Render selection form
     return render_template('payroll/admin/generate_payslips.html', payroll_periods=payroll_periods)
@@ -380,7 +376,8 @@ def generate_payslips_by_period():
 @payroll_admin_required
 @login_required
 def view_payslips():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
+    direction = request.args.get('dir', 'next')
     search = request.args.get('search', '', type=str)
     department_id = request.args.get('department_id', '', type=str)
     status = request.args.get('status', '', type=str)
@@ -416,8 +413,11 @@ def view_payslips():
     if period_id:
         query = query.filter(Payslip.payroll_id == period_id)
 
-    # Sort newest first
-    payslips = query.order_by(Payslip.generated_at.desc()).paginate(page=page, per_page=20, error_out=False)
+    # Newest first, keyset pagination on (generated_at, id)
+    payslips = keyset_paginate(
+        query, [Payslip.generated_at, Payslip.id],
+        cursor=cursor, direction=direction, per_page=20
+    )
 
     # Dropdown data
     departments = Department.query.order_by(Department.name.asc()).all()
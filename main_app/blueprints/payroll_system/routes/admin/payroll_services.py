@@ -1,5 +1,4 @@
-from main_app.services.docs import export_payroll_excel
-from main_app.models.payroll_models import Payroll
+from main_app.services.docs import export_payroll_csv, export_payroll_excel
 from main_app.utils import payroll_admin_required
 
 from flask import request
@@ -18,6 +17,8 @@ def export_payroll_excel_route():
     department_id = request.args.get('department_id')
     pay_period_id = request.args.get('pay_period_id')
 
-    query = Payroll.query.join(Payroll.employee)
+    # Both formats stream rows from the database instead of building a DataFrame
+    if request.args.get('format') == 'csv':
+        return export_payroll_csv(search, department_id, pay_period_id)
 
-    return export_payroll_excel(query)
\ No newline at end of file
+    return export_payroll_excel(search, department_id, pay_period_id)
\ No newline at end of file
@@ -4,9 +4,10 @@ from main_app.models.payroll_models import Payroll, PayrollPeriod
 from main_app.utils import payroll_admin_required
 from main_app.extensions import db
 from main_app.deductions import compute_regular_withholding_tax
+from main_app.services.jobs import enqueue_job
 
 from flask import render_template, request, url_for, flash, redirect
-from flask_login import login_required
+from flask_login import login_required, current_user
 from sqlalchemy import asc
 from datetime import datetime, timedelta
 
@@ -35,3 +36,34 @@ def department_employees(department_id):
     )
 
 
+
+
+@payroll_admin_bp.route('/payroll-periods/<int:period_id>/run', methods=['POST'])
+@payroll_admin_required
+@login_required
+def run_period_payroll_route(period_id):
+    PayrollPeriod.query.get_or_404(period_id)
+
+    # Runs in the background job pool; the status page polls for the result
+    job_id = enqueue_job(
+        "run_payroll",
+        {"period_id": period_id},
+        user_id=current_user.id,
+        redirect_url=url_for('payroll_admin_bp.view_payroll_periods')
+    )
+    return redirect(url_for('jobs_bp.job_status', job_id=job_id))
+
+
+@payroll_admin_bp.route('/payroll-periods/<int:period_id>/render-payslips', methods=['POST'])
+@payroll_admin_required
+@login_required
+def render_period_payslips_route(period_id):
+    PayrollPeriod.query.get_or_404(period_id)
+
+    job_id = enqueue_job(
+        "render_payslips",
+        {"period_id": period_id},
+        user_id=current_user.id,
+        redirect_url=url_for('payroll_admin_bp.view_payroll_periods')
+    )
+    return redirect(url_for('jobs_bp.job_status', job_id=job_id))
@@ -4,6 +4,7 @@ from main_app.models.hr_models import Employee, Department, Attendance
 from main_app.models.payroll_models import Payroll, PayrollPeriod
 from main_app.extensions import db
 from main_app.deductions import compute_regular_withholding_tax
+from main_app.services.work_calendar import department_working_days, employee_working_days
 
 from flask_login import login_required
 from flask import render_template, redirect, request, flash, url_for
@@ -66,10 +67,7 @@ def regular_worked_days():
         1 for a in attendances if a.status in ("Present", "Late")
     )
 
-    total_days = sum(
-        1 for i in range((end - start).days + 1)
-        if (start + timedelta(days=i)).weekday() < 5
-    )
+    total_days = employee_working_days(employee_id, start, end)
 
     return {
         "worked_days": worked_days,
@@ -103,10 +101,7 @@ def regular_payroll_preview(employee_id):
     ).all()
 
     worked_days = sum(1 for a in attendances if a.status in ("Present", "Late"))
-    total_days = sum(
-        1 for i in range((period.end_date - period.start_date).days + 1)
-        if (period.start_date + timedelta(days=i)).weekday() < 5
-    )
+    total_days = department_working_days(period.start_date, period.end_date, employee.department_id)
 
     # Check if payroll exists
     payroll = Payroll.query.filter_by(
@@ -1,10 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file
 from flask_login import login_required, current_user
 from main_app.models.users import PayrollUser
-from main_app.models.payroll_models import  Payroll, Payslip
+from main_app.models.payroll_models import  Payroll, Payslip, PayrollPeriod
 from main_app.models.hr_models import  Employee
 from main_app.forms import PayslipSearchForm
 from main_app.extensions import db
+from main_app.services.payslip_pdf import get_payslip_pdf
+from main_app.services.payroll_ledger import employee_ledger, employee_year_summary
+from main_app.services.identity import current_employee
 from datetime import datetime, date
 import os
 from random import randint
@@ -12,6 +15,9 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
 TEMPLATE_DIR = os.path.join(BASE_DIR, "templates")
 STATIC_DIR = os.path.join(BASE_DIR, "payroll_static")
 
+# Payroll periods plotted on the employee dashboard
+CHART_PERIODS = 24
+
 
 
 payroll_employee_bp = Blueprint(
@@ -24,23 +30,37 @@ payroll_employee_bp = Blueprint(
 @payroll_employee_bp.route('/dashboard')
 @login_required
 def dashboard():
-    employee = Employee.query.filter_by(user_id=current_user.id).first()
-    # Payroll stats
-    payrolls = Payroll.query.filter_by(employee_id=employee.id).order_by(Payroll.created_at.asc()).all()
+    employee = current_employee()
+    # Lifetime totals from the yearly ledger rows
+    ledger = employee_ledger(employee.id)
 
-    total_disbursed = sum((p.net_pay or 0) for p in payrolls)
-    total_deductions = sum((p.total_deductions or 0) for p in payrolls)
+    total_disbursed = sum(row.ytd_net for row in ledger)
+    total_deductions = sum(row.ytd_deductions for row in ledger)
     total_allowances = sum(
         (link.allowance.amount or 0)
         for link in employee.employee_allowances
         if link.allowance and link.allowance.active
     )
 
-    # Chart Data (per payroll period)
-    payroll_labels = [p.pay_period_start.strftime("%b %d") for p in payrolls]
-    gross_earnings = [p.gross_pay or 0 for p in payrolls]
-    deductions = [p.total_deductions or 0 for p in payrolls]
-    net_earnings = [p.net_pay or 0 for p in payrolls]
+    # Chart Data (latest payroll periods, oldest first)
+    chart_rows = (
+        db.session.query(
+            PayrollPeriod.start_date,
+            Payroll.gross_pay,
+            Payroll.total_deductions,
+            Payroll.net_pay
+        )
+        .join(PayrollPeriod, PayrollPeriod.id == Payroll.payroll_period_id)
+        .filter(Payroll.employee_id == employee.id)
+        .order_by(PayrollPeriod.start_date.desc())
+        .limit(CHART_PERIODS)
+        .all()
+    )[::-1]
+
+    payroll_labels = [start.strftime("%b %d") for start, _, _, _ in chart_rows]
+    gross_earnings = [gross or 0 for _, gross, _, _ in chart_rows]
+    deductions = [ded or 0 for _, _, ded, _ in chart_rows]
+    net_earnings = [net or 0 for _, _, _, net in chart_rows]
 
     # Recent payslips
     recent_payslips = Payslip.query.filter_by(employee_id=employee.id) \
@@ -67,7 +87,7 @@ def dashboard():
 @payroll_employee_bp.route('/profile')
 @login_required
 def profile():
-    employee = Employee.query.filter_by(email=current_user.email).first()
+    employee = current_employee()
     
     if not employee:
         flash('Employee record not found. Please contact HR.', 'error')
@@ -83,7 +103,7 @@ def profile():
 @login_required
 def payslips():
     # Fetch the employee record of the current user
-    employee = Employee.query.filter_by(user_id=current_user.id).first()
+    employee = current_employee()
 
     if not employee:
         flash("Employee record not found.", "warning")
@@ -119,7 +139,7 @@ def payslips():
 @payroll_employee_bp.route('/payslips/<int:payslip_id>')
 @login_required
 def view_payslip(payslip_id):
-    employee = Employee.query.filter_by(email=current_user.email).first()
+    employee = current_employee()
     
     if not employee:
         flash('Employee record not found. Please contact HR.', 'error')
@@ -132,7 +152,7 @@ def view_payslip(payslip_id):
 @payroll_employee_bp.route('/payslips/<int:payslip_id>/download')
 @login_required
 def download_payslip(payslip_id):
-    employee = Employee.query.filter_by(email=current_user.email).first()
+    employee = current_employee()
     
     if not employee:
         flash('Employee record not found. Please contact HR.', 'error')
@@ -140,19 +160,24 @@ def download_payslip(payslip_id):
     
     payslip = Payslip.query.filter_by(id=payslip_id, employee_id=employee.id).first_or_404()
     
-    # Update status to downloaded
-    payslip.status = 'Downloaded'
-    db.session.commit()
-    
-    # This would generate and return the PDF
-    flash('Payslip downloaded successfully!', 'success')
-    return redirect(url_for('payroll_employee.payslips'))
+    # Served from the on-disk cache; rendered only on first download
+    path = get_payslip_pdf(payslip.id)
+    if not path:
+        flash('Payslip could not be generated. Please contact HR.', 'error')
+        return redirect(url_for('payroll_employee.payslips'))
+
+    return send_file(
+        path,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f"{payslip.payslip_number or payslip.id}.pdf"
+    )
 
 
 @payroll_employee_bp.route('/payroll-history')
 @login_required
 def payroll_history():
-    employee = Employee.query.filter_by(email=current_user.email).first()
+    employee = current_employee()
     
     if not employee:
         flash('Employee record not found. Please contact HR.', 'error')
@@ -178,7 +203,7 @@ def payroll_history():
 @payroll_employee_bp.route('/payroll-summary')
 @login_required
 def payroll_summary():
-    employee = Employee.query.filter_by(email=current_user.email).first()
+    employee = current_employee()
     
     if not employee:
         flash('Employee record not found. Please contact HR.', 'error')
@@ -186,28 +211,11 @@ def payroll_summary():
     
     year = request.args.get('year', date.today().year, type=int)
     
-    # Get payroll summary for the year
-    payrolls = Payroll.query.filter(
-        Payroll.employee_id == employee.id,
-        Payroll.pay_period_start >= date(year, 1, 1),
-        Payroll.pay_period_start <= date(year, 12, 31)
-    ).all()
-    
-    summary = {
-        'total_gross_pay': sum(p.gross_pay for p in payrolls),
-        'total_deductions': sum(p.total_deductions for p in payrolls),
-        'total_net_pay': sum(p.net_pay for p in payrolls),
-        'total_sss': sum(p.sss_contribution for p in payrolls),
-        'total_philhealth': sum(p.philhealth_contribution for p in payrolls),
-        'total_pagibig': sum(p.pagibig_contribution for p in payrolls),
-        'total_tax': sum(p.tax_withheld for p in payrolls),
-        'payroll_count': len(payrolls)
-    }
-    
+    # Annual totals come from a single ledger row
+    summary = employee_year_summary(employee.id, year)
+
     # Get available years
-    years = db.session.query(Payroll.pay_period_start).filter_by(employee_id=employee.id).all()
-    years = list(set([p[0].year for p in years if p[0]]))
-    years.sort(reverse=True)
+    years = [row.year for row in employee_ledger(employee.id)]
     
     return render_template('payroll//employee/employee_summary.html', 
                          summary=summary, 
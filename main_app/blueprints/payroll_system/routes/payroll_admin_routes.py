@@ -18,6 +18,11 @@ from main_app.deductions import (
 
 )
 from main_app.functions import generate_payslip
+from main_app.services.payroll_engine import run_period_payroll
+from main_app.services.payslip_pipeline import generate_period_payslips
+from main_app.services.deduction_rules import invalidate_deduction_rules
+from main_app.services.payroll_stats import department_employee_counts
+from main_app.services.work_calendar import employee_working_days
 
 from main_app.forms import (
     PayrollPeriodForm, PayrollForm, PayslipForm,
@@ -65,18 +70,8 @@ payroll_admin_bp = Blueprint(
 @payroll_admin_bp.route('/departments')
 @payroll_admin_required
 def payroll_departments():
-    # Get all departments
-    departments = Department.query.all()
-
-    # Count active employees in each department
-    dept_list = []
-    for dept in departments:
-        employee_count = Employee.query.filter_by(status="Active", department_id=dept.id).count()
-        dept_list.append({
-            "id": dept.id,
-            "name": dept.name,
-            "employee_count": employee_count
-        })
+    # Active employees per department (one grouped query, cached)
+    dept_list = department_employee_counts("Active")
 
     return render_template(
         'payroll/admin/payroll_departments.html',
@@ -101,11 +96,8 @@ def get_the_working_days_for_a_month():
     start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
     end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
 
-    # Count all working days in the period (Mon-Fri)
-    total_working_days = sum(
-        1 for d in (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
-        if d.weekday() < 5
-    )
+    # Working days on the employee's shift calendar (weekends and holidays off)
+    total_working_days = employee_working_days(employee_id, start_date, end_date)
 
     # Count absences from Attendance table
     attendances = Attendance.query.filter(
@@ -357,25 +349,13 @@ def generate_payslips_by_period():
             flash("Please select a payroll period.", "warning")
             return redirect(url_for('payroll_admin.generate_payslips_by_period'))
 
-        # Fetch payrolls for selected period
-        payrolls = Payroll.query.filter_by(pay_period_id=pay_period_id).all()
-        if not payrolls:
+        # Missing payslips are found and inserted in bulk
+        stats = generate_period_payslips(int(pay_period_id))
+        if not stats["payrolls"]:
             flash("No payrolls found for this pay period.", "warning")
             return redirect(url_for('payroll_admin.generate_payslips_by_period'))
 
-        generated_by_id = current_user.id
-        generated_count = 0
-
-        for payroll in payrolls:
-            existing = Payslip.query.filter_by(payroll_id=payroll.id).first()
-            if existing:
-                continue  # Skip if payslip already exists
-            payslip = generate_payslip(payroll, generated_by_id)
-            db.session.add(payslip)
-            generated_count += 1
-
-        db.session.commit()
-        flash(f"{generated_count} payslips successfully generated for the selected period.", "success")
+        flash(f"{stats['created']} payslips successfully generated for the selected period.", "success")
         return redirect(url_for('payroll_admin.view_payslips'))
 
     # GET: Render selection form
@@ -519,6 +499,7 @@ def create_deduction():
         deduction = Deduction(name=name)
         db.session.add(deduction)
         db.session.commit()
+        invalidate_deduction_rules()
         flash('Deduction created successfully!', 'success')
         return redirect(url_for('payroll_admin.deductions'))
 
@@ -541,6 +522,7 @@ def edit_deduction(deduction_id):
 
         deduction.name = name
         db.session.commit()
+        invalidate_deduction_rules()
         flash('Deduction updated successfully!', 'success')
         return redirect(url_for('payroll_admin.deductions'))
 
@@ -556,6 +538,7 @@ def delete_deduction(deduction_id):
     deduction = Deduction.query.get_or_404(deduction_id)
     db.session.delete(deduction)
     db.session.commit()
+    invalidate_deduction_rules()
     flash('Deduction deleted successfully!', 'success')
     return redirect(url_for('payroll_admin.deductions'))
 
@@ -923,54 +906,18 @@ def generate_payrolls():
 
     if not payroll_period:
         payroll_period = PayrollPeriod(
+            period_name=f"{start_date.strftime('%B %Y')} Payroll",
             start_date=start_date,
             end_date=end_date,
-            description=f"{start_date.strftime('%B %Y')} Payroll"
+            pay_date=end_date
         )
         db.session.add(payroll_period)
         db.session.commit()
 
-    # ✅ Step 3: Generate payrolls for each employee
-    employees = Employee.query.all()
-    generated_count = 0
-
-    for emp in employees:
-        logs = Attendance.query.filter(
-            Attendance.employee_id == emp.id,
-            Attendance.date >= start_date,
-            Attendance.date <= end_date
-        ).all()
-
-        total_hours = 0
-        for log in logs:
-            if log.time_in and log.time_out:
-                delta = log.time_out - log.time_in
-                total_hours += delta.total_seconds() / 3600
-
-        if total_hours <= 0:
-            continue
+    # ✅ Step 3: Generate payrolls for the whole period in one batch
+    stats = run_period_payroll(payroll_period.id)
+    generated_count = stats["created"]
 
-        existing_payroll = Payroll.query.filter_by(
-            employee_id=emp.id,
-            pay_period_id=payroll_period.id
-        ).first()
-
-        if existing_payroll:
-            continue  # skip if already generated
-
-        payroll = Payroll(
-            employee_id=emp.id,
-            pay_period_id=payroll_period.id,
-            pay_period_start=start_date,
-            pay_period_end=end_date,
-            basic_salary=emp.basic_salary or 0,
-            working_hours=total_hours
-        )
-        payroll.calculate_earnings()
-        db.session.add(payroll)
-        generated_count += 1
-
-    db.session.commit()
     flash(f"Payroll generated for {generated_count} employees for {start_date.strftime('%B %Y')}.", "success")
     return redirect(url_for('payroll_admin.earnings_report'))
 
@@ -1159,6 +1106,7 @@ def save_deduction():
 
     db.session.add(deduction)
     db.session.commit()
+    invalidate_deduction_rules()
 
     flash("Deduction saved", "success")
 
@@ -1178,6 +1126,7 @@ def delete_deduction(id):
 
     db.session.delete(deduction)
     db.session.commit()
+    invalidate_deduction_rules()
 
     flash("Deleted", "warning")
 
@@ -15,6 +15,12 @@ from sqlalchemy import case, func, asc
 import random
 from main_app.models.user import User
 from main_app.models.hr_models import Attendance, Department, Position, EmploymentType, Employee
+from main_app.services.attendance_rollup import daily_status_counts
+from main_app.services.work_calendar import employee_working_days
+from main_app.services.payslip_pipeline import payslip_values
+from main_app.services.jobs import enqueue_job
+from main_app.helpers.pagination import keyset_paginate
+from main_app.services.docs import export_payroll_csv, export_payroll_excel as export_payroll_excel_file
 
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
@@ -72,20 +78,13 @@ def dashboard():
     month_start = today.replace(day=1)
     month_end = today.replace(day=monthrange(today.year, today.month)[1])
 
-    attendances = db.session.query(
-        Attendance.date,
-        func.sum(case((Attendance.status == "Present", 1), else_=0)).label("present_count"),
-        func.sum(case((Attendance.status == "Absent", 1), else_=0)).label("absent_count"),
-        func.sum(case((Attendance.status == "Late", 1), else_=0)).label("late_count")
-    ).filter(
-        Attendance.date >= month_start,
-        Attendance.date <= month_end
-    ).group_by(Attendance.date).order_by(Attendance.date).all()
-
-    monthly_dates = [a.date.strftime("%Y-%m-%d") for a in attendances]
-    monthly_present_counts = [a.present_count for a in attendances]
-    monthly_absent_counts = [a.absent_count for a in attendances]
-    monthly_late_counts = [a.late_count for a in attendances]
+    daily_counts = daily_status_counts(month_start, month_end)
+    days = sorted(daily_counts)
+
+    monthly_dates = [d.strftime("%Y-%m-%d") for d in days]
+    monthly_present_counts = [daily_counts[d].get("Present", 0) for d in days]
+    monthly_absent_counts = [daily_counts[d].get("Absent", 0) for d in days]
+    monthly_late_counts = [daily_counts[d].get("Late", 0) for d in days]
 
     return render_template(
         'payroll/staff/staff_dashboard.html',
@@ -152,7 +151,8 @@ def view_payrolls():
     search = request.args.get('search', '', type=str).strip()
     department_id = request.args.get('department_id', type=int)
     pay_period_id = request.args.get('pay_period_id', type=int)
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
+    direction = request.args.get('dir', 'next')
 
     # Base query
     query = Payroll.query.join(Employee)
@@ -173,8 +173,11 @@ def view_payrolls():
     if pay_period_id:
         query = query.filter(Payroll.pay_period_id == pay_period_id)
 
-    # Paginate results
-    payrolls = query.order_by(Payroll.created_at.desc()).paginate(page=page, per_page=10)
+    # Keyset pagination on (created_at, id)
+    payrolls = keyset_paginate(
+        query, [Payroll.created_at, Payroll.id],
+        cursor=cursor, direction=direction, per_page=10
+    )
 
     # Get department list for dropdown
     from main_app.models.hr_models import Department
@@ -206,89 +209,11 @@ def export_payroll_excel():
     department_id = request.args.get('department_id')
     pay_period_id = request.args.get('pay_period_id')
 
-    # Base query with eager loading for related data
-    query = Payroll.query.options(
-        joinedload(Payroll.employee)
-            .joinedload(Employee.employee_deductions)
-            .joinedload(EmployeeDeduction.deduction),
-        joinedload(Payroll.employee)
-            .joinedload(Employee.employee_allowances)
-            .joinedload(EmployeeAllowance.allowance),
-        joinedload(Payroll.employee)
-            .joinedload(Employee.department)
-    ).join(Payroll.employee)
-
-    # Apply filters
-    if search:
-        query = query.filter(
-            (Payroll.employee.first_name.ilike(f"%{search}%")) |
-            (Payroll.employee.last_name.ilike(f"%{search}%"))
-        )
-    if department_id:
-        query = query.filter(Payroll.employee.department_id == department_id)
-    if pay_period_id:
-        query = query.filter(Payroll.pay_period_id == pay_period_id)
-
-    payrolls = query.all()
+    # Rows are streamed from the database (XLSX via a temp file, CSV directly)
+    if request.args.get('format') == 'csv':
+        return export_payroll_csv(search, department_id, pay_period_id)
 
-    # Build DataFrame
-    data = []
-    for p in payrolls:
-        # Safely compute linked deductions and allowances
-        total_linked_deductions = sum(
-            (ed.deduction.amount or 0)
-            for ed in getattr(p.employee, 'employee_deductions', [])
-            if ed.deduction and ed.deduction.active
-        )
-        total_allowances = sum(
-            (ea.allowance.amount or 0)
-            for ea in getattr(p.employee, 'employee_allowances', [])
-            if ea.allowance and ea.allowance.active
-        )
-
-        # Compute totals
-        total_deductions = (p.total_deductions or 0) + total_linked_deductions
-        gross_pay_with_allowances = (p.gross_pay or 0) + total_allowances
-
-        data.append({
-            "Employee ID": p.employee.employee_id,
-            "Name": f"{p.employee.first_name} {p.employee.last_name}",
-            "Department": p.employee.department.name if p.employee.department else "-",
-            "Basic Salary": p.basic_salary or 0,
-            "Overtime Hours": p.overtime_hours or 0,
-            "Overtime Pay": p.overtime_pay or 0,
-            "Holiday Pay": p.holiday_pay or 0,
-            "Night Differential": p.night_differential or 0,
-            "Allowances": total_allowances,
-            "Gross Pay": gross_pay_with_allowances,
-            "SSS": p.sss_contribution or 0,
-            "PhilHealth": p.philhealth_contribution or 0,
-            "Pag-IBIG": p.pagibig_contribution or 0,
-            "Tax Withheld": p.tax_withheld or 0,
-            "Other Deductions": p.other_deductions or 0,
-            "Linked Deductions": total_linked_deductions,
-            "Total Deductions": total_deductions,
-            "Net Pay": p.net_pay or 0,
-            "Status": p.status,
-            "Pay Period": f"{p.pay_period_start} - {p.pay_period_end}"
-        })
-
-    df = pd.DataFrame(data)
-
-    # Save to Excel in memory
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Payroll')
-    output.seek(0)
-
-    # Send file to user
-    filename = f"Payroll_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    return send_file(
-        output,
-        download_name=filename,
-        as_attachment=True,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
+    return export_payroll_excel_file(search, department_id, pay_period_id)
 
 @payroll_staff_bp.route('/process', methods=['GET'])
 @login_required
@@ -587,11 +512,8 @@ def get_the_working_days_for_a_month():
     start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
     end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
 
-    # Count all working days in the period (Mon-Fri)
-    total_working_days = sum(
-        1 for d in (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
-        if d.weekday() < 5
-    )
+    # Working days on the employee's shift calendar (weekends and holidays off)
+    total_working_days = employee_working_days(employee_id, start_date, end_date)
 
     # Count absences from Attendance table
     attendances = Attendance.query.filter(
@@ -749,7 +671,8 @@ def get_worked_days():
 @login_required
 @staff_required
 def view_payslips():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
+    direction = request.args.get('dir', 'next')
     search = request.args.get('search', '', type=str)
     department_id = request.args.get('department_id', '', type=str)
     status = request.args.get('status', '', type=str)
@@ -785,8 +708,11 @@ def view_payslips():
     if period_id:
         query = query.filter(Payslip.payroll_id == period_id)
 
-    # Sort newest first
-    payslips = query.order_by(Payslip.generated_at.desc()).paginate(page=page, per_page=20, error_out=False)
+    # Newest first, keyset pagination on (generated_at, id)
+    payslips = keyset_paginate(
+        query, [Payslip.generated_at, Payslip.id],
+        cursor=cursor, direction=direction, per_page=20
+    )
 
     # Dropdown data
     departments = Department.query.order_by(Department.name.asc()).all()
@@ -830,25 +756,7 @@ def distribute_payslip(payslip_id):
 # HELPER FUNCTION
 # =========================================================
 def generate_payslip(payroll, generated_by_id=None):
-    payslip = Payslip(
-        employee_id=payroll.employee_id,
-        payroll_id=payroll.id,
-        payslip_number=f"PS-{payroll.id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
-        pay_period_start=payroll.pay_period_start,
-        pay_period_end=payroll.pay_period_end,
-        basic_salary=payroll.basic_salary,
-        overtime_pay=payroll.overtime_pay,
-        holiday_pay=payroll.holiday_pay,
-        night_differential=payroll.night_differential,
-        gross_pay=payroll.gross_pay,
-        sss_contribution=payroll.sss_contribution,
-        philhealth_contribution=payroll.philhealth_contribution,
-        pagibig_contribution=payroll.pagibig_contribution,
-        tax_withheld=payroll.tax_withheld,
-        total_deductions=payroll.total_deductions,
-        net_pay=payroll.net_pay,
-        generated_by=generated_by_id
-    )
+    payslip = Payslip(**payslip_values(payroll))
     db.session.add(payslip)
     return payslip
 
@@ -864,31 +772,23 @@ def generate_payslips_by_period():
     payroll_periods = PayrollPeriod.query.order_by(PayrollPeriod.start_date.desc()).all()
 
     if request.method == 'POST':
-        pay_period_id = request.form.get('pay_period_id')
+        pay_period_id = request.form.get('pay_period_id', type=int)
         if not pay_period_id:
             flash("Please select a payroll period.", "warning")
             return redirect(url_for('payroll_staff.generate_payslips_by_period'))
 
-        # Fetch payrolls for selected period
-        payrolls = Payroll.query.filter_by(pay_period_id=pay_period_id).all()
-        if not payrolls:
-            flash("No payrolls found for this pay period.", "warning")
+        if db.session.get(PayrollPeriod, pay_period_id) is None:
+            flash("Selected payroll period was not found.", "danger")
             return redirect(url_for('payroll_staff.generate_payslips_by_period'))
 
-        generated_by_id = current_user.id
-        generated_count = 0
-
-        for payroll in payrolls:
-            existing = Payslip.query.filter_by(payroll_id=payroll.id).first()
-            if existing:
-                continue  # Skip if payslip already exists
-            payslip = generate_payslip(payroll, generated_by_id)
-            db.session.add(payslip)
-            generated_count += 1
-
-        db.session.commit()
-        flash(f"{generated_count} payslips successfully generated for the selected period.", "success")
-        return redirect(url_for('payroll_staff.view_payslips'))
+        # Missing payslips are inserted in bulk by a background job
+        job_id = enqueue_job(
+            "generate_payslips",
+            {"period_id": pay_period_id},
+            user_id=current_user.id,
+            redirect_url=url_for('payroll_staff.view_payslips')
+        )
+        return redirect(url_for('jobs_bp.job_status', job_id=job_id))
 
     # GET: Render selection form
     return render_template('payroll/staff/generate_payslips.html', payroll_periods=payroll_periods)
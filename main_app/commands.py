@@ -0,0 +1,126 @@
+import click
+from datetime import datetime
+
+
+# ============================================================
+# FLASK CLI COMMANDS
+# ============================================================
+
+def _parse_cli_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def register_commands(app):
+
+    @app.cli.command("rebuild-late-ledger")
+    @click.option("--start", "start", help="First attendance date (YYYY-MM-DD).")
+    @click.option("--end", "end", help="Last attendance date (YYYY-MM-DD).")
+    def rebuild_late_ledger_command(start, end):
+        """Recompute LateComputation rows from attendance for a date range."""
+        from main_app.services.late_ledger import rebuild_late_ledger
+
+        stats = rebuild_late_ledger(_parse_cli_date(start), _parse_cli_date(end))
+        click.echo(
+            f"Checked {stats['attendance']} attendance row(s): "
+            f"{stats['late']} late, {stats['cleared']} ledger row(s) cleared."
+        )
+
+
+    @app.cli.command("rebuild-attendance-rollup")
+    @click.option("--start", "start", help="First attendance date (YYYY-MM-DD).")
+    @click.option("--end", "end", help="Last attendance date (YYYY-MM-DD).")
+    def rebuild_attendance_rollup_command(start, end):
+        """Backfill daily_attendance_rollup from attendance for a date range."""
+        from main_app.services.attendance_rollup import rebuild_attendance_rollup
+
+        stats = rebuild_attendance_rollup(_parse_cli_date(start), _parse_cli_date(end))
+        click.echo(f"Rebuilt {stats['buckets']} rollup row(s).")
+
+    @app.cli.command("recompute-working-hours")
+    @click.option("--start", "start", help="First attendance date (YYYY-MM-DD).")
+    @click.option("--end", "end", help="Last attendance date (YYYY-MM-DD).")
+    def recompute_working_hours_command(start, end):
+        """Recompute attendance working hours with the batch kernel."""
+        from main_app.services.attendance_ingest import recompute_working_hours
+
+        stats = recompute_working_hours(_parse_cli_date(start), _parse_cli_date(end))
+        click.echo(
+            f"Checked {stats['checked']} attendance row(s), updated {stats['updated']} "
+            f"in {stats['seconds']}s."
+        )
+
+    @app.cli.command("rebuild-work-calendar")
+    @click.option("--start", "start", help="First calendar date (YYYY-MM-DD, default 2000-01-01).")
+    @click.option("--end", "end", help="Last calendar date (YYYY-MM-DD, default 2040-12-31).")
+    def rebuild_work_calendar_command(start, end):
+        """Regenerate the working_day table for every shift calendar."""
+        from main_app.services.work_calendar import rebuild_work_calendar
+
+        stats = rebuild_work_calendar(_parse_cli_date(start), _parse_cli_date(end))
+        click.echo(f"Wrote {stats['rows']} day(s) for {stats['calendars']} calendar(s).")
+
+    @app.cli.command("add-holiday")
+    @click.argument("day")
+    @click.argument("name")
+    @click.option("--type", "holiday_type", default="Regular", show_default=True,
+                  type=click.Choice(["Regular", "Special", "Special Working"]))
+    def add_holiday_command(day, name, holiday_type):
+        """Add or update a holiday (the working-day table follows on commit)."""
+        from main_app.extensions import db
+        from main_app.models.hr_models import Holiday
+
+        holiday_date = _parse_cli_date(day)
+        holiday = Holiday.query.filter_by(date=holiday_date).first() or Holiday(date=holiday_date)
+        holiday.name = name
+        holiday.holiday_type = holiday_type
+        db.session.add(holiday)
+        db.session.commit()
+        click.echo(f"{holiday_type} holiday {holiday_date} ({name}) saved.")
+
+    @app.cli.command("rebuild-payroll-ledger")
+    def rebuild_payroll_ledger_command():
+        """Recompute payroll_ledger (per-employee yearly totals) from payrolls."""
+        from main_app.services.payroll_ledger import rebuild_payroll_ledger
+
+        stats = rebuild_payroll_ledger()
+        click.echo(f"Rebuilt {stats['rows']} ledger row(s).")
+
+    @app.cli.command("rebuild-employee-search")
+    def rebuild_employee_search_command():
+        """Create (if needed) and re-index the employee search FTS5 table."""
+        from main_app.services.employee_search import rebuild_employee_search
+
+        stats = rebuild_employee_search()
+        if not stats["fts"]:
+            click.echo("FTS5 search needs SQLite; searches use ilike on this database.")
+            return
+        click.echo(f"Indexed {stats['indexed']} employee(s).")
+
+    @app.cli.command("accrue-leave-credits")
+    @click.option("--as-of", "as_of", help="Accrue for this date's month (YYYY-MM-DD, default today).")
+    def accrue_leave_credits_command(as_of):
+        """Monthly VL/SL accrual for every active employee (safe to re-run)."""
+        from main_app.services.leave_accrual import run_leave_accrual
+
+        stats = run_leave_accrual(_parse_cli_date(as_of))
+        click.echo(
+            f"Accrued {stats['period']:%Y-%m} for {stats['employees']} employee(s), "
+            f"{stats['credited']} credited."
+        )
+
+    @app.cli.command("purge-jobs")
+    @click.option("--days", default=7, show_default=True, help="Keep jobs newer than this many days.")
+    def purge_jobs_command(days):
+        """Fail jobs orphaned by dead workers, then delete old finished/failed jobs."""
+        from main_app.services.jobs import fail_interrupted_jobs, purge_old_jobs
+
+        click.echo(f"Marked {fail_interrupted_jobs()} interrupted job(s) as failed.")
+        click.echo(f"Deleted {purge_old_jobs(days)} job(s).")
+
+    @app.cli.command("purge-attendance-imports")
+    @click.option("--hours", default=24, show_default=True, help="Keep staged imports newer than this many hours.")
+    def purge_attendance_imports_command(hours):
+        """Delete staged attendance imports that were never confirmed."""
+        from main_app.services.attendance_import import purge_stale_imports
+
+        click.echo(f"Deleted {purge_stale_imports(hours)} staged row(s).")
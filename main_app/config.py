@@ -19,6 +19,22 @@ class Config:
     # API Configuration
     API_TIMEOUT = 30
 
+    # Payslip PDF cache (rendered once per payslip content)
+    PAYSLIP_PDF_DIR = os.path.join(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), 'instance')),
+        'payslips'
+    )
+    PAYSLIP_PDF_WORKERS = None  # None = one process per CPU
+
+    # Background jobs (in-process thread pool, no external broker)
+    JOB_WORKERS = 2
+    JOBS_SYNCHRONOUS = False  # run jobs inline, e.g. in tests
+
+    # Payroll AI insights ("g4f" or the local "stub" backend for tests)
+    PAYROLL_INSIGHTS_BACKEND = 'g4f'
+    PAYROLL_INSIGHTS_MODEL = 'gpt-4.1'
+    PAYROLL_INSIGHTS_TIMEOUT = 20  # seconds a page waits before showing "pending"
+
     # Mail Configuration
     MAIL_SERVER = 'smtp.gmail.com'
     MAIL_PORT = 465
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# ============================================================
+# IN-PROCESS TTL CACHE
+# ============================================================
+
+class TTLCache:
+    """
+    Small thread-safe key/value cache with per-entry expiry and an LRU
+    size cap. Values live in this worker process only.
+    """
+
+    def __init__(self, ttl=300, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Cached value for key, computing it with factory() on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.set(key, factory(), ttl)
+        return value
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only keys for which predicate(key) is true."""
+        with self._lock:
+            if predicate is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
@@ -1,6 +1,7 @@
 from functools import wraps
 from flask import jsonify, abort, redirect, url_for, flash
 from flask_login import current_user
+from main_app.services.identity import current_identity
 
 # ------------------------
 # Role-based decorators
@@ -10,10 +11,11 @@ def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
 
-        if not current_user.is_authenticated:
+        identity = current_identity()
+        if identity is None:
             return redirect(url_for('hr_auth_bp.login'))
 
-        role = current_user.role.lower()
+        role = identity.role.lower()
 
         if role not in ['hr_admin', 'admin']:
             flash("Admin access required.", "error")
@@ -27,7 +29,8 @@ def hr_officer_required(f):
     """Decorator to require HR officer role or higher"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role not in ['hr_admin', 'officer']:
+        identity = current_identity()
+        if identity is None or identity.role not in ['hr_admin', 'officer']:
             return jsonify({'error': 'HR Officer access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -37,7 +40,8 @@ def leave_officer_required(f):
     """Decorator to require HR officer role or higher"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role not in ['hr_admin', 'officer', 'leave_officer']:
+        identity = current_identity()
+        if identity is None or identity.role not in ['hr_admin', 'officer', 'leave_officer']:
             return jsonify({'error': 'Leave Officer access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -46,7 +50,8 @@ def dept_head_required(f):
     """Decorator to require department head role or higher"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role not in ['hr_admin', 'officer', 'leave_officer', 'dept_head']:
+        identity = current_identity()
+        if identity is None or identity.role not in ['hr_admin', 'officer', 'leave_officer', 'dept_head']:
             return jsonify({'error': 'Department Head access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -55,7 +60,8 @@ def employee_required(f):
     """Decorator to require employee or staff role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role not in ['employee', 'staff']:
+        identity = current_identity()
+        if identity is None or identity.role not in ['employee', 'staff']:
             return jsonify({'error': 'Employee access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -66,7 +72,8 @@ def payroll_admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role != 'payroll_admin':
+        identity = current_identity()
+        if identity is None or identity.role != 'payroll_admin':
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -74,7 +81,8 @@ def payroll_admin_required(f):
 def staff_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role.lower() not in ["staff", "officer", "dept_head", "admin"]:
+        identity = current_identity()
+        if identity is None or identity.role.lower() not in ["staff", "officer", "dept_head", "admin"]:
             abort(403)
         return f(*args, **kwargs)
     return decorated_function
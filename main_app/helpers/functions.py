@@ -25,60 +25,23 @@ MONTHLY_SL = 1.25
 def compute_monthly_leave_credit(employee: Employee):
     """
     Auto compute leave credits based on service duration.
+    Runs the monthly accrual for this one employee (no-op once accrued).
     """
+    from sqlalchemy.exc import IntegrityError
+
+    from main_app.services.leave_accrual import run_leave_accrual
 
     if not employee.date_hired:
         return
 
-    today = date.today()
-
-    # Working duration
-    years = today.year - employee.date_hired.year
-    months = today.month - employee.date_hired.month
-
-    total_months = (years * 12) + months
+    try:
+        run_leave_accrual(employee_ids=[employee.id])
+    except IntegrityError:
+        # A concurrent request accrued this month first (leave_accrual /
+        # leave_credit unique constraints); its credits are the same
+        db.session.rollback()
 
-    if total_months <= 0:
-        return
 
-    # Total credit earned
-    total_vl = total_months * MONTHLY_VL
-    total_sl = total_months * MONTHLY_SL
-
-    # Update or create leave credit record
-    vl = LeaveCredit.query.filter_by(
-        employee_id=employee.id,
-        leave_type_id=1   # ← assume 1 = Vacation Leave
-    ).first()
-
-    sl = LeaveCredit.query.filter_by(
-        employee_id=employee.id,
-        leave_type_id=2   # ← assume 2 = Sick Leave
-    ).first()
-
-    if vl:
-        vl.total_credits = total_vl
-    else:
-        db.session.add(
-            LeaveCredit(
-                employee_id=employee.id,
-                leave_type_id=1,
-                total_credits=total_vl
-            )
-        )
-
-    if sl:
-        sl.total_credits = total_sl
-    else:
-        db.session.add(
-            LeaveCredit(
-                employee_id=employee.id,
-                leave_type_id=2,
-                total_credits=total_sl
-            )
-        )
-
-    db.session.commit()
 class ServiceRegistry:
     """
     Central registry for HR document services
@@ -0,0 +1,114 @@
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import tuple_
+
+
+# ============================================================
+# CURSOR TOKENS
+# ============================================================
+
+def encode_cursor(values):
+    """Opaque URL-safe token for a row's sort key."""
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append(["dt", value.isoformat()])
+        elif isinstance(value, date):
+            payload.append(["d", value.isoformat()])
+        else:
+            payload.append(["v", value])
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Sort key from a token; raises ValueError when it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = []
+        for kind, value in payload:
+            if kind == "dt":
+                value = datetime.fromisoformat(value)
+            elif kind == "d":
+                value = date.fromisoformat(value)
+            values.append(value)
+        return tuple(values)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid page cursor.") from e
+
+
+# ============================================================
+# KEYSET (SEEK) PAGINATION
+# ============================================================
+
+class KeysetPage:
+    """One page of a keyset-paginated query plus cursors to its neighbours."""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(query, columns, cursor=None, direction="next", per_page=20, descending=True):
+    """
+    Page through query ordered by columns (which must end in a unique
+    column such as the primary key). Each page seeks past the cursor row
+    with an indexed row-value comparison instead of OFFSET, so deep pages
+    cost the same as the first one. A bad cursor restarts at page one.
+    """
+    key = tuple_(*columns)
+
+    values = None
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+        except ValueError:
+            values = None
+        if values is not None and len(values) != len(columns):
+            values = None
+
+    backwards = values is not None and direction == "prev"
+    # Walking backwards flips both the comparison and the sort order
+    newest_first = descending != backwards
+
+    if values is not None:
+        query = query.filter(key < tuple_(*values) if newest_first else key > tuple_(*values))
+
+    query = query.order_by(*[c.desc() if newest_first else c.asc() for c in columns])
+    rows = query.limit(per_page + 1).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(row):
+        return encode_cursor([getattr(row, c.key) for c in columns])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if backwards or more:
+            next_cursor = cursor_for(rows[-1])
+        if (values is not None and not backwards) or (backwards and more):
+            prev_cursor = cursor_for(rows[0])
+
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor)
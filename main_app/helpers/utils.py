@@ -24,21 +24,11 @@ from twilio.rest import Client
 # Date & Leave Utilities
 # ------------------------
 
-def calculate_working_days(start_date, end_date):
-    """Calculate working days between two dates (excluding weekends)"""
-    if start_date > end_date:
-        return 0
-    
-    working_days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Monday = 0, Sunday = 6
-        if current_date.weekday() < 5:
-            working_days += 1
-        current_date += timedelta(days=1)
-    
-    return working_days
+def calculate_working_days(start_date, end_date, department_id=None):
+    """Calculate working days between two dates (excluding weekends and holidays)"""
+    from main_app.services.work_calendar import department_working_days
+
+    return department_working_days(start_date, end_date, department_id)
 
 def generate_employee_id(department_id):
     dept = Department.query.get(department_id)
@@ -152,43 +142,25 @@ def get_attendance_chart_data(employee_id=None, start_date=None, end_date=None):
 
 def get_department_attendance_summary(department_id, start_date, end_date):
     """Get aggregated attendance summary for a department in a date range"""
-    from ..models.hr_models import Attendance, Employee
+    from ..services.attendance_rollup import daily_status_counts
 
-    query = Attendance.query.join(Employee).filter(
-        Employee.department_id == department_id,
-        Attendance.date >= start_date,
-        Attendance.date <= end_date
-    )
+    daily_counts = daily_status_counts(start_date, end_date, department_id=department_id)
+    days = sorted(daily_counts)
 
     # Totals
-    total_present = query.filter(Attendance.status == "Present").count()
-    total_absent = query.filter(Attendance.status == "Absent").count()
-    total_late = query.filter(Attendance.status == "Late").count()
-    total_half_day = query.filter(Attendance.status == "Half Day").count()
+    def total(status):
+        return sum(counts.get(status, 0) for counts in daily_counts.values())
 
     # Daily breakdown for charts
-    daily_records = (
-        query.with_entities(
-            Attendance.date,
-            func.sum(case((Attendance.status == "Present", 1), else_=0)),
-            func.sum(case((Attendance.status == "Absent", 1), else_=0)),
-            func.sum(case((Attendance.status == "Late", 1), else_=0))
-        )
-        .group_by(Attendance.date)
-        .order_by(Attendance.date)
-        .all()
-    )
-
-
     return {
-        "total_present": total_present,
-        "total_absent": total_absent,
-        "total_late": total_late,
-        "total_half_day": total_half_day,
-        "dates": [str(r[0]) for r in daily_records],
-        "present_counts": [int(r[1]) for r in daily_records],
-        "absent_counts": [int(r[2]) for r in daily_records],
-        "late_counts": [int(r[3]) for r in daily_records],
+        "total_present": total("Present"),
+        "total_absent": total("Absent"),
+        "total_late": total("Late"),
+        "total_half_day": total("Half Day"),
+        "dates": [str(d) for d in days],
+        "present_counts": [daily_counts[d].get("Present", 0) for d in days],
+        "absent_counts": [daily_counts[d].get("Absent", 0) for d in days],
+        "late_counts": [daily_counts[d].get("Late", 0) for d in days],
     }
 
 
@@ -809,74 +781,13 @@ def send_payslip_notification(employee_email, payslip_number):
 
 def get_payroll_summary():
     """Return summary stats and department data."""
-    total_employees = Employee.query.count()
-    total_payrolls = Payroll.query.count()
-    total_net_pay = Payroll.query.with_entities(func.sum(Payroll.net_pay)).scalar() or 0
-    pending = Payroll.query.filter_by(status="Pending").count()
-    approved = Payroll.query.filter_by(status="Approved").count()
-    rejected = Payroll.query.filter_by(status="Rejected").count()
-
-    dept_data = []
-    departments = Department.query.all()
-    for dept in departments:
-        dept_payrolls = Payroll.query.join(Employee).filter(Employee.department_id == dept.id).count()
-        dept_net = Payroll.query.join(Employee).filter(Employee.department_id == dept.id).with_entities(func.sum(Payroll.net_pay)).scalar() or 0
-        dept_data.append({'department': dept.name, 'payrolls': dept_payrolls, 'net_pay': dept_net})
-
-    summary = {
-        'total_employees': total_employees,
-        'total_payrolls': total_payrolls,
-        'total_net_pay': total_net_pay,
-        'pending': pending,
-        'approved': approved,
-        'rejected': rejected,
-        'departments': dept_data
-    }
-    return summary
+    from ..services.payroll_insights import payroll_summary
+    return payroll_summary()
 
 def generate_ai_report(summary):
-    """Use g4f client to generate AI insights."""
-    client = Client()
-    dept_summary = ", ".join([f"{d['department']} ({d['payrolls']} payrolls, ₱{d['net_pay']:,.2f})" for d in summary['departments']])
-    features = """
-    Features:
-    - Dashboard overview
-    - Employee Payroll Details
-    - Add Employee Payroll
-    - Payroll Period Management
-    - Process Payroll
-    - View Payroll History
-    - Manage Deductions & Allowances
-    - Generate, Approve, Distribute Payslips
-    - Payroll Reports
-    """
-
-    prompt = f"""
-    Payroll Stats:
-    Total employees: {summary['total_employees']}
-    Total payroll entries: {summary['total_payrolls']}
-    Total net pay: ₱{summary['total_net_pay']:,.2f}
-    Pending: {summary['pending']}
-    Approved: {summary['approved']}
-    Rejected: {summary['rejected']}
-    Department summary: {dept_summary}
-
-    Based on the payroll system features:
-    {features}
-
-    Generate a management report with:
-    1. Insights and trends
-    2. Department highlights
-    3. Suggestions for improvement
-    4. Key takeaways
-    """
-
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}],
-        web_search=False
-    )
-    return response.choices[0].message.content
+    """AI insights for summary (cached per summary, generated off-thread)."""
+    from ..services.payroll_insights import get_payroll_insights
+    return get_payroll_insights(summary)["report"]
 
 def generate_department_chart(summary):
     """Generate bar chart for departments' net pay."""
@@ -895,72 +806,9 @@ def generate_department_chart(summary):
     return buf
 
 
-
-
-
 def generate_payroll_insights():
-    client = Client()
-
-    # Aggregate payroll data
-    total_employees = Employee.query.count()
-    total_payrolls = Payroll.query.count()
-    total_net_pay = Payroll.query.with_entities(func.sum(Payroll.net_pay)).scalar() or 0
-    pending_payslips = Payroll.query.filter_by(status="Pending").count()
-    approved_payslips = Payroll.query.filter_by(status="Approved").count()
-    rejected_payslips = Payroll.query.filter_by(status="Rejected").count()
-
-    # Department level summary
-    dept_summary = []
-    departments = Department.query.all()
-    for dept in departments:
-        dept_payrolls = Payroll.query.join(Employee).filter(Employee.department_id == dept.id).count()
-        dept_net_pay = Payroll.query.join(Employee).filter(Employee.department_id == dept.id).with_entities(func.sum(Payroll.net_pay)).scalar() or 0
-        dept_summary.append(f"{dept.name}: {dept_payrolls} payrolls, ₱{dept_net_pay:,.2f} net pay")
-
-    # Features/Functions context
-    features = """
-    Features to consider in insights:
-    - Dashboard: overview and quick insights
-    - View Employee Payroll Details: search/filter by employee
-    - Add Employees Payroll: manual input for salary, deductions, allowances
-    - Payroll Period Management: cutoff periods
-    - Process Payroll: auto compute salaries
-    - View Payroll History: reference and audit past payrolls
-    - Manage Deductions & Allowances: SSS, PhilHealth, Pag-IBIG, bonuses
-    - Generate, Approve, Distribute Payslips
-    - Payroll reports: summary, leave, earnings, deduction, compliance
-    """
-
-    prompt = f"""
-    I have payroll data with the following stats:
-    - Total employees: {total_employees}
-    - Total payroll entries: {total_payrolls}
-    - Total net pay disbursed: ₱{total_net_pay:,.2f}
-    - Pending payslips: {pending_payslips}
-    - Approved payslips: {approved_payslips}
-    - Rejected payslips: {rejected_payslips}
-    - Department summary:
-      {', '.join(dept_summary)}
-
-    Based on the payroll system features:
-    {features}
-
-    Generate a concise management report with:
-    1. Insights and trends on payroll efficiency
-    2. Departmental highlights
-    3. Suggestions for improvement
-    4. Key takeaways for management
-    """
-
-    # Generate AI report
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}],
-        web_search=False
-    )
-
-    insights = response.choices[0].message.content
-    return insights
+    from ..services.payroll_insights import get_payroll_insights
+    return get_payroll_insights()["report"]
 
 def get_current_payroll_period():
     """Get current payroll period"""
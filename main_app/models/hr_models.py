@@ -1,6 +1,7 @@
 from main_app.extensions import db
 from datetime import datetime, date, time
 from sqlalchemy import event
+from sqlalchemy.orm import object_session
 # =========================================================
 # HR MODELS
 # =========================================================
@@ -118,6 +119,10 @@ class Employee(db.Model):
 # =========================================================
 class Attendance(db.Model):
     __tablename__ = "attendance"
+    __table_args__ = (
+        db.UniqueConstraint("employee_id", "date", name="uq_attendance_employee_date"),
+        db.Index("ix_attendance_date_id", "date", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
@@ -134,56 +139,28 @@ class Attendance(db.Model):
     def __repr__(self):
         return f"<Attendance {self.employee_id} - {self.date}>"
 
+    def work_schedule(self):
+        """Schedule of the employee's department shift (8:00-17:00 by default)."""
+        from main_app.services.work_calendar import attendance_schedule
+
+        return attendance_schedule(self)
+
     def check_late(self):
-        """Automatically mark as late if time_in is after 8:00 AM."""
-        if self.time_in and self.time_in > time(8, 0):  # 8:00 AM cutoff
+        """Automatically mark as late if time_in is after the shift start (8:00 AM by default)."""
+        if self.time_in and self.time_in > self.work_schedule().start:
             self.status = "Late"
             self.remarks = f"Late - Time In: {self.time_in.strftime('%I:%M %p')}"
         else:
             self.status = "Present"
-    def calculate_working_hours(self):
+    def calculate_working_hours(self, schedule=None):
         """
-        Compute total working hours between 8:00 AM and 5:00 PM only,
-        minus 1 hour for lunch if applicable.
+        Compute total working hours within the shift (8:00 AM to 5:00 PM by
+        default), minus lunch if applicable (services/working_hours.py).
         """
-        if self.status == "Absent" or not self.time_in or not self.time_out:
-            self.working_hours = 0.0
-            return
-
-        # Convert strings to datetime.time if needed
-        if isinstance(self.time_in, str):
-            h, m = map(int, self.time_in.split(":"))
-            actual_time_in = time(hour=h, minute=m)
-        else:
-            actual_time_in = self.time_in
-
-        if isinstance(self.time_out, str):
-            h, m = map(int, self.time_out.split(":"))
-            actual_time_out = time(hour=h, minute=m)
-        else:
-            actual_time_out = self.time_out
-
-        # Official working hours
-        work_start = datetime.combine(self.date, time(8, 0))
-        work_end = datetime.combine(self.date, time(17, 0))
-
-        # Combine date + actual time_in/out
-        actual_in = datetime.combine(self.date, actual_time_in)
-        actual_out = datetime.combine(self.date, actual_time_out)
-
-        # Clamp the time within the 8AM–5PM range
-        start = max(actual_in, work_start)
-        end = min(actual_out, work_end)
-
-        # Ensure no negative duration
-        if end <= start:
-            self.working_hours = 0.0
-            return
+        from main_app.services.working_hours import working_hours_for
 
-        total_hours = (end - start).total_seconds() / 3600
-
-        # Subtract 1 hour for lunch if total > 4 hours
-        self.working_hours = round(total_hours - 1, 2) if total_hours > 4 else round(total_hours, 2)
+        schedule = schedule or self.work_schedule()
+        self.working_hours = working_hours_for(self.time_in, self.time_out, self.status, schedule)
 
 # =========================================================
 # EVENT LISTENERS: Auto calculate hours before save
@@ -195,13 +172,73 @@ def calculate_hours_before_save(mapper, connection, target):
     Automatically calculate working hours before saving Attendance record.
     This ensures the working_hours field is always up-to-date.
     """
-    target.calculate_working_hours()
+    from main_app.services.work_calendar import attendance_schedule
+
+    # Resolved once per flush (work_calendar before_flush); rows it could
+    # not see, e.g. an employee inserted in the same flush, fall back to
+    # a lookup on the flush connection
+    target.calculate_working_hours(attendance_schedule(target, connection))
+
+# =========================================================
+# DAILY ATTENDANCE ROLLUP (maintained by services/attendance_rollup.py)
+# =========================================================
+class DailyAttendanceRollup(db.Model):
+    """Attendance counts and hour sums per day, department and status."""
+    __tablename__ = "daily_attendance_rollup"
+    __table_args__ = (
+        db.UniqueConstraint("date", "department_id", "status", name="uq_daily_attendance_rollup"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False)
+    # 0 = employee without a department
+    department_id = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(50), nullable=False, default="")
+
+    attendance_count = db.Column(db.Integer, nullable=False, default=0)
+    hours_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DailyAttendanceRollup {self.date} dept:{self.department_id} {self.status}={self.attendance_count}>"
+
+# =========================================================
+# ATTENDANCE IMPORT STAGING
+# =========================================================
+class AttendanceImportRow(db.Model):
+    """Parsed biometric punch waiting for preview/confirmation, grouped by import_id."""
+    __tablename__ = "attendance_import_row"
+    __table_args__ = (
+        db.Index("ix_attendance_import_row_import_row", "import_id", "row_no"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    import_id = db.Column(db.String(32), nullable=False)
+    row_no = db.Column(db.Integer, nullable=False)
+
+    raw_employee_id = db.Column(db.String(50))
+    employee_id = db.Column(db.Integer)
+    name = db.Column(db.String(150))
+    department = db.Column(db.String(100))
+    day = db.Column(db.String(50))
+    time_in = db.Column(db.String(20))
+    time_out = db.Column(db.String(20))
+    matched = db.Column(db.Boolean, default=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AttendanceImportRow {self.import_id}#{self.row_no}>"
 
 # =========================================================
 # LEAVE
 # =========================================================
 class Leave(db.Model):
     __tablename__ = "leave"
+    __table_args__ = (
+        db.Index("ix_leave_status_dates", "status", "start_date", "end_date"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
@@ -235,9 +272,11 @@ class Department(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text)
     head_id = db.Column(db.Integer, db.ForeignKey("user.id", name="fk_department_head_id"))
+    shift_id = db.Column(db.Integer, db.ForeignKey("work_shift.id", name="fk_department_shift_id"))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     head = db.relationship("User", back_populates="managed_department", foreign_keys=[head_id])
+    shift = db.relationship("WorkShift", back_populates="departments")
     employees = db.relationship("Employee", back_populates="department", lazy=True)
     positions = db.relationship("Position", back_populates="department", lazy=True)
 
@@ -245,6 +284,60 @@ class Department(db.Model):
         return f"<Department {self.name}>"
 
 
+# ============================================================
+# WORK SCHEDULES & CALENDAR (see services/work_calendar.py)
+# ============================================================
+
+class WorkShift(db.Model):
+    """Official hours, lunch policy and work week assigned to departments."""
+    __tablename__ = "work_shift"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    start_time = db.Column(db.Time, nullable=False, default=time(8, 0))
+    end_time = db.Column(db.Time, nullable=False, default=time(17, 0))
+    lunch_hours = db.Column(db.Float, nullable=False, default=1.0)
+    lunch_after_hours = db.Column(db.Float, nullable=False, default=4.0)
+    workdays = db.Column(db.String(7), nullable=False, default="1111100")   # Mon..Sun, 1 = working day
+    is_default = db.Column(db.Boolean, nullable=False, default=False)       # used by departments without a shift
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    departments = db.relationship("Department", back_populates="shift", lazy=True)
+
+    def __repr__(self):
+        return f"<WorkShift {self.name}>"
+
+
+class Holiday(db.Model):
+    __tablename__ = "holiday"
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, unique=True, nullable=False)
+    name = db.Column(db.String(150), nullable=False)
+    holiday_type = db.Column(db.String(50), nullable=False, default="Regular")   # Regular / Special / Special Working
+
+    def __repr__(self):
+        return f"<Holiday {self.date} {self.name}>"
+
+
+class WorkingDay(db.Model):
+    """
+    Precomputed calendar: one row per day per shift calendar with a running
+    count of working days, so any range's count is two lookups.
+    """
+    __tablename__ = "working_day"
+    __table_args__ = (
+        db.UniqueConstraint("calendar_id", "date", name="uq_working_day_calendar_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    calendar_id = db.Column(db.Integer, nullable=False)   # work_shift.id, 0 = standard calendar
+    date = db.Column(db.Date, nullable=False)
+    is_workday = db.Column(db.Boolean, nullable=False)
+    holiday_type = db.Column(db.String(50))
+    workdays_through = db.Column(db.Integer, nullable=False)   # working days from calendar start to this date
+
+
 class Position(db.Model):
     __tablename__ = "position"
 
@@ -294,6 +387,9 @@ class EmploymentType(db.Model):
 
 class LeaveCredit(db.Model):
     __tablename__ = "leave_credit"
+    __table_args__ = (
+        db.UniqueConstraint("employee_id", "leave_type_id", name="uq_leave_credit_employee_type"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
@@ -314,6 +410,32 @@ class LeaveCredit(db.Model):
         self.used_credits += amount
 
 
+# ============================================================
+# LEAVE ACCRUAL LEDGER (one row per employee per month, see services/leave_accrual.py)
+# ============================================================
+
+class LeaveAccrual(db.Model):
+    __tablename__ = "leave_accrual"
+    __table_args__ = (
+        db.UniqueConstraint("employee_id", "period", name="uq_leave_accrual_employee_period"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    employee_id = db.Column(
+        db.Integer,
+        db.ForeignKey("employee.id", name="fk_leave_accrual_employee"),
+        nullable=False
+    )
+    period = db.Column(db.Date, nullable=False)   # first day of the accrual month
+
+    service_months = db.Column(db.Integer, nullable=False, default=0)
+    vl_credits = db.Column(db.Float, nullable=False, default=0)
+    sl_credits = db.Column(db.Float, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 
 # =========================================================
 # CONSTANTS (MATCHES EXCEL FILE)
@@ -376,15 +498,16 @@ def compute_late_day_equivalent(days=0, hours=0, minutes=0):
 def extract_late_from_attendance(attendance: Attendance):
     """
     Converts time-in to late hours/minutes
-    Official time-in: 8:00 AM
+    Official time-in: shift start (8:00 AM by default)
     """
     if not attendance.time_in:
         return None
 
-    if attendance.time_in <= time(8, 0):
+    shift_start = attendance.work_schedule().start
+    if attendance.time_in <= shift_start:
         return None
 
-    official = datetime.combine(attendance.date, time(8, 0))
+    official = datetime.combine(attendance.date, shift_start)
     actual = datetime.combine(attendance.date, attendance.time_in)
 
     total_minutes = int((actual - official).total_seconds() / 60)
@@ -403,34 +526,16 @@ def extract_late_from_attendance(attendance: Attendance):
 
 
 # =========================================================
-# EVENT LISTENER – AUTO CREATE / UPDATE LATE RECORD
+# EVENT LISTENER – QUEUE LATE RECORD FOR COMMIT-TIME SYNC
 # =========================================================
 @event.listens_for(Attendance, "after_insert")
 @event.listens_for(Attendance, "after_update")
 def generate_late_computation(mapper, connection, target):
-    late_data = extract_late_from_attendance(target)
-
-    if not late_data:
-        return
-
-    existing = LateComputation.query.filter_by(attendance_id=target.id).first()
-
-    if existing:
-        existing.late_hours = late_data["late_hours"]
-        existing.late_minutes = late_data["late_minutes"]
-        existing.day_equivalent = late_data["day_equivalent"]
-        existing.remarks = "Updated from attendance"
-    else:
-        record = LateComputation(
-            employee_id=target.employee_id,
-            attendance_id=target.id,
-            date=target.date,
-            late_days=0,
-            late_hours=late_data["late_hours"],
-            late_minutes=late_data["late_minutes"],
-            day_equivalent=late_data["day_equivalent"],
-            remarks="Auto-generated from attendance"
-        )
-        db.session.add(record)
-
-    db.session.commit()
+    """
+    Only remembers the attendance id. LateComputation rows for everything
+    touched in the unit of work are upserted together when the session
+    commits (see services/late_ledger.py).
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("late_ledger_pending", set()).add(target.id)
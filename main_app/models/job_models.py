@@ -0,0 +1,65 @@
+from main_app.extensions import db
+from datetime import datetime
+import json
+
+
+# =========================================================
+# BACKGROUND JOB (run by services/jobs.py)
+# =========================================================
+class BackgroundJob(db.Model):
+    __tablename__ = "background_job"
+    __table_args__ = (
+        db.Index("ix_background_job_status_created", "status", "created_at"),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+
+    # queued -> running -> finished | failed
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    progress = db.Column(db.Integer, default=0)
+    message = db.Column(db.String(255))
+
+    params = db.Column(db.Text)
+    error = db.Column(db.Text)
+
+    # Optional downloadable output
+    result = db.Column(db.LargeBinary)
+    result_name = db.Column(db.String(150))
+    result_mimetype = db.Column(db.String(100))
+    # Where the status page sends the user when the job is done
+    redirect_url = db.Column(db.String(255))
+
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id", name="fk_background_job_created_by"))
+    # Worker process (host:pid) running the job and its last sign of life
+    owner = db.Column(db.String(100))
+    heartbeat_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def done(self):
+        return self.status in ("finished", "failed")
+
+    def get_params(self):
+        return json.loads(self.params) if self.params else {}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress or 0,
+            "message": self.message or "",
+            "error": self.error,
+            "has_result": self.result is not None,
+            "result_name": self.result_name,
+            "redirect_url": self.redirect_url,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f"<BackgroundJob {self.id} {self.kind} {self.status}>"
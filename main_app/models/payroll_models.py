@@ -52,8 +52,17 @@ class PayrollDeduction(db.Model):
 # PAYROLL
 # ============================================================
 
+def compute_overtime_pay(basic_salary, overtime_hours):
+    """Overtime at 125% of the hourly rate (basic salary / 160 hours)."""
+    hourly_rate = basic_salary / 160 if basic_salary else 0
+    return round(hourly_rate * 1.25 * (overtime_hours or 0), 2)
+
+
 class Payroll(db.Model):
     __tablename__ = "payroll"
+    __table_args__ = (
+        db.Index("ix_payroll_created_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -109,7 +118,7 @@ class Payroll(db.Model):
 
     @property
     def overtime_pay(self):
-        return round(self.hourly_rate * 1.25 * self.overtime_hours, 2)
+        return compute_overtime_pay(self.basic_salary, self.overtime_hours)
 
     @property
     def allowance_total(self):
@@ -182,12 +191,51 @@ class Payroll(db.Model):
         return self.net_pay
 
 
+# ============================================================
+# PAYROLL LEDGER (per employee per year, see services/payroll_ledger.py)
+# ============================================================
+
+class PayrollLedger(db.Model):
+    __tablename__ = "payroll_ledger"
+    __table_args__ = (
+        db.UniqueConstraint("employee_id", "year", name="uq_payroll_ledger_employee_year"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    employee_id = db.Column(
+        db.Integer,
+        db.ForeignKey("employee.id", name="fk_payroll_ledger_employee"),
+        nullable=False
+    )
+    year = db.Column(db.Integer, nullable=False)
+
+    payroll_count = db.Column(db.Integer, nullable=False, default=0)
+
+    ytd_gross = db.Column(db.Float, nullable=False, default=0)
+    ytd_deductions = db.Column(db.Float, nullable=False, default=0)
+    ytd_net = db.Column(db.Float, nullable=False, default=0)
+
+    # Employee shares of the government contributions
+    ytd_sss = db.Column(db.Float, nullable=False, default=0)
+    ytd_philhealth = db.Column(db.Float, nullable=False, default=0)
+    ytd_pagibig = db.Column(db.Float, nullable=False, default=0)
+    ytd_gsis = db.Column(db.Float, nullable=False, default=0)
+    ytd_tax = db.Column(db.Float, nullable=False, default=0)
+
+    last_period_end = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 # ============================================================
 # PAYSLIP
 # ============================================================
 
 class Payslip(db.Model):
     __tablename__ = "payslip"
+    __table_args__ = (
+        db.Index("ix_payslip_generated_id", "generated_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -317,70 +365,87 @@ class EmployeeDeduction(db.Model):
 
     def calculate(self):
 
+        from main_app.services.deduction_rules import get_deduction_rules
+
         salary = self.employee.salary or 0
 
         if self.override_amount is not None:
-            return dict(employee_share=self.override_amount,
-                        employer_share=0,
-                        ec=0)
+            return compute_deduction_shares(None, salary, self.override_amount)
+
+        rule = get_deduction_rules().get(self.deduction_id)
+        if rule is not None:
+            return rule.compute_one(salary)
+
+        return compute_deduction_shares(self.deduction, salary)
+
 
-        if not self.deduction:
-            return dict(employee_share=0, employer_share=0, ec=0)
+# ============================================================
+# DEDUCTION SHARE COMPUTATION
+# ============================================================
 
-        d = self.deduction
+def compute_deduction_shares(d, salary, override_amount=None):
+    """Employee/employer/EC shares of deduction ``d`` for a monthly salary."""
 
-        # FIXED
-        if d.calculation_type == "fixed":
-            return dict(employee_share=d.rate or 0,
-                        employer_share=0,
-                        ec=0)
+    if override_amount is not None:
+        return dict(employee_share=override_amount,
+                    employer_share=0,
+                    ec=0)
 
-        # PERCENTAGE
-        if d.calculation_type == "percentage":
+    if not d:
+        return dict(employee_share=0, employer_share=0, ec=0)
 
-            base = salary
+    # FIXED
+    if d.calculation_type == "fixed":
+        return dict(employee_share=d.rate or 0,
+                    employer_share=0,
+                    ec=0)
 
-            if d.ceiling:
-                base = min(base, d.ceiling)
+    # PERCENTAGE
+    if d.calculation_type == "percentage":
 
-            if d.floor:
-                base = max(base, d.floor)
+        base = salary
 
-            return dict(
-                employee_share=round(base * (d.rate or 0), 2),
-                employer_share=0,
-                ec=0
-            )
+        if d.ceiling:
+            base = min(base, d.ceiling)
 
-        # BRACKET
-        if d.calculation_type == "bracket":
+        if d.floor:
+            base = max(base, d.floor)
 
-            for b in d.brackets:
-                if b.salary_from <= salary <= b.salary_to:
+        return dict(
+            employee_share=round(base * (d.rate or 0), 2),
+            employer_share=0,
+            ec=0
+        )
 
-                    return dict(
-                        employee_share=b.employee_share or 0,
-                        employer_share=b.employer_share or 0,
-                        ec=b.ec or 0
-                    )
+    # BRACKET
+    if d.calculation_type == "bracket":
 
-        # PROGRESSIVE
-        if d.calculation_type == "progressive":
+        for b in d.brackets:
+            if b.salary_from <= salary <= b.salary_to:
 
-            for b in d.brackets:
-                if b.salary_from <= salary <= b.salary_to:
+                return dict(
+                    employee_share=b.employee_share or 0,
+                    employer_share=b.employer_share or 0,
+                    ec=b.ec or 0
+                )
 
-                    return dict(
-                        employee_share=round(
-                            salary * (b.rate or 0) +
-                            (b.fixed_amount or 0),
-                            2
-                        ),
-                        employer_share=0,
-                        ec=0
-                    )
+    # PROGRESSIVE
+    if d.calculation_type == "progressive":
 
-        return dict(employee_share=0, employer_share=0, ec=0)
+        for b in d.brackets:
+            if b.salary_from <= salary <= b.salary_to:
+
+                return dict(
+                    employee_share=round(
+                        salary * (b.rate or 0) +
+                        (b.fixed_amount or 0),
+                        2
+                    ),
+                    employer_share=0,
+                    ec=0
+                )
+
+    return dict(employee_share=0, employer_share=0, ec=0)
 
 
 # ============================================================
@@ -0,0 +1,311 @@
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from openpyxl import load_workbook
+from sqlalchemy import insert, select
+
+from main_app.extensions import db
+from main_app.models.hr_models import Employee, Department, AttendanceImportRow
+from main_app.services.attendance_ingest import INGEST_CHUNK_SIZE, bulk_ingest_attendance
+
+
+STAGE_CHUNK_SIZE = 1000
+
+# Staged imports older than this were abandoned before being confirmed
+STALE_IMPORT_HOURS = 24
+
+
+# ============================================================
+# READING THE DEVICE EXPORT
+# ============================================================
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    text = str(value)
+    return "" if text == "nan" else text
+
+
+def iter_sheet_rows(filepath):
+    """
+    Yield each row of the first sheet as a tuple of cell values.
+    .xlsx files are streamed with openpyxl read-only mode; legacy .xls files
+    fall back to pandas.
+    """
+    if filepath.lower().endswith(".xls"):
+        import pandas as pd
+        df = pd.read_excel(filepath, header=None)
+        for row in df.itertuples(index=False, name=None):
+            yield row
+        return
+
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def parse_device_rows(rows):
+    """
+    Turn raw biometric export rows into punch records:
+    {"employee_id", "name", "department", "day", "time_in", "time_out"}.
+    """
+    current_id, current_name, current_dept = None, None, None
+    attendance_date = None
+
+    for row in rows:
+        line = " ".join(t for t in (_cell_text(x) for x in row) if t).strip()
+        if not line or "tabling date" in line.lower():
+            continue
+
+        if "Attendance date:" in line:
+            attendance_date = line.split(":")[-1].strip()
+            continue
+
+        if "User ID" in line and "Name" in line:
+            uid_part = line.split("User ID:")[-1]
+            name_part = uid_part.split("Name:")
+            id_value = name_part[0].strip() if len(name_part) > 0 else None
+
+            if len(name_part) > 1:
+                name_dept_part = name_part[1].split("Department:")
+                name = name_dept_part[0].strip()
+                dept = name_dept_part[1].strip() if len(name_dept_part) > 1 else "Unknown"
+            else:
+                name, dept = "Unknown", "Unknown"
+
+            current_id, current_name, current_dept = id_value, name, dept
+            continue
+
+        if ":" in line:
+            times = line.split()
+            yield {
+                "employee_id": current_id,
+                "name": current_name,
+                "department": current_dept,
+                "day": attendance_date or datetime.now().date().isoformat(),
+                "time_in": times[0] if len(times) > 0 else None,
+                "time_out": times[1] if len(times) > 1 else None,
+            }
+
+
+def _to_employee_pk(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================
+# STAGING
+# ============================================================
+
+def _load_employee_map():
+    """{employee pk: (full name, department name, is active)} in one query."""
+    rows = db.session.execute(
+        select(Employee.id, Employee.first_name, Employee.middle_name, Employee.last_name,
+               Employee.status, Employee.archived, Department.name)
+        .outerjoin(Department, Department.id == Employee.department_id)
+    ).all()
+
+    employee_map = {}
+    for emp_id, first, middle, last, status, archived, dept in rows:
+        name = f"{first} {middle or ''} {last}".strip()
+        employee_map[emp_id] = (name, dept or "N/A", status == "Active" and not archived)
+    return employee_map
+
+
+def stage_attendance_import(filepath):
+    """
+    Parse a device export and stage every punch in attendance_import_row.
+    Active employees with no punch are staged as unmatched rows so the
+    preview shows them as absent.
+
+    Returns (import_id, stats).
+    """
+    import_id = uuid.uuid4().hex
+    employee_map = _load_employee_map()
+
+    # Abandoned previews go away with the next upload
+    purge_stale_imports(commit=False)
+
+    seen_ids = set()
+    last_day = None
+    buffer = []
+    stats = {"rows": 0, "matched": 0}
+
+    def flush():
+        if buffer:
+            db.session.execute(insert(AttendanceImportRow), buffer)
+            buffer.clear()
+
+    def stage(row):
+        stats["rows"] += 1
+        stats["matched"] += 1 if row["matched"] else 0
+        buffer.append(dict(import_id=import_id, row_no=stats["rows"], **row))
+        if len(buffer) >= STAGE_CHUNK_SIZE:
+            flush()
+
+    for record in parse_device_rows(iter_sheet_rows(filepath)):
+        emp_pk = _to_employee_pk(record["employee_id"])
+        emp = employee_map.get(emp_pk)
+        matched = emp is not None
+        last_day = record["day"]
+
+        if matched:
+            seen_ids.add(emp_pk)
+
+        stage(dict(
+            raw_employee_id=record["employee_id"],
+            employee_id=emp_pk if matched else None,
+            name=emp[0] if matched else record["name"] or "Unknown",
+            department=emp[1] if matched else "Unknown",
+            day=record["day"],
+            time_in=record["time_in"] if matched else None,
+            time_out=record["time_out"] if matched else None,
+            matched=matched
+        ))
+
+    day = last_day or datetime.now().date().isoformat()
+    for emp_pk, (name, dept, active) in employee_map.items():
+        if active and emp_pk not in seen_ids:
+            stage(dict(
+                raw_employee_id=str(emp_pk),
+                employee_id=emp_pk,
+                name=name,
+                department=dept,
+                day=day,
+                time_in=None,
+                time_out=None,
+                matched=False
+            ))
+
+    flush()
+    db.session.commit()
+    return import_id, stats
+
+
+def get_import_preview(import_id, page=1, per_page=50):
+    """One page of staged rows for the preview table."""
+    return (
+        AttendanceImportRow.query
+        .filter_by(import_id=import_id)
+        .order_by(AttendanceImportRow.row_no)
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+
+
+# ============================================================
+# CONFIRM
+# ============================================================
+
+@lru_cache(maxsize=1024)
+def _parse_day(value):
+    import pandas as pd
+    parsed = pd.to_datetime(value.strip(), errors='coerce')
+    return None if pd.isna(parsed) else parsed.date()
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(value):
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M:%S %p"):
+        try:
+            return datetime.strptime(value.strip(), fmt).time()
+        except ValueError:
+            continue
+    import pandas as pd
+    parsed = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(parsed) else parsed.time()
+
+
+def expand_import_days(day):
+    """Dates covered by a staged day value ("YYYY-MM-DD" or "start ~ end")."""
+    if not day or "Tabling" in str(day):
+        return []
+
+    if "~" in day:
+        start_str, end_str = day.split("~", 1)
+        start_date, end_date = _parse_day(start_str), _parse_day(end_str)
+        if not start_date or not end_date:
+            return []
+        return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+    single_date = _parse_day(day)
+    return [single_date] if single_date else []
+
+
+def _import_pages(import_id, page_size=STAGE_CHUNK_SIZE):
+    """Staged rows with an employee, one keyset page (by row_no) at a time."""
+    last_row_no = 0
+    while True:
+        rows = db.session.execute(
+            select(AttendanceImportRow.row_no, AttendanceImportRow.employee_id, AttendanceImportRow.day,
+                   AttendanceImportRow.time_in, AttendanceImportRow.time_out)
+            .where(AttendanceImportRow.import_id == import_id, AttendanceImportRow.row_no > last_row_no)
+            .order_by(AttendanceImportRow.row_no)
+            .limit(page_size)
+        ).all()
+        if not rows:
+            return
+        last_row_no = rows[-1].row_no
+        yield [r for r in rows if r.employee_id]
+
+
+def commit_attendance_import(import_id, chunk_size=INGEST_CHUNK_SIZE):
+    """
+    Write a staged import into attendance through the bulk ingest path,
+    one page of staged rows at a time so memory stays bounded.
+    """
+    totals = {"received": 0, "inserted": 0, "skipped": 0, "late": 0, "seconds": 0.0}
+
+    def ingest(records):
+        stats = bulk_ingest_attendance(records, commit=False)
+        for key in totals:
+            totals[key] += stats[key]
+        records.clear()
+
+    records = []
+    for page in _import_pages(import_id):
+        for row in page:
+            time_in = _parse_time(row.time_in) if row.time_in else None
+            time_out = _parse_time(row.time_out) if row.time_out else None
+
+            for att_date in expand_import_days(row.day):
+                records.append(dict(
+                    employee_id=row.employee_id,
+                    date=att_date,
+                    time_in=time_in,
+                    time_out=time_out,
+                    status="Present" if time_in else "Absent",
+                    remarks=""
+                ))
+                if len(records) >= chunk_size:
+                    ingest(records)
+    if records:
+        ingest(records)
+
+    AttendanceImportRow.query.filter_by(import_id=import_id).delete(synchronize_session=False)
+    db.session.commit()
+    totals["seconds"] = round(totals["seconds"], 4)
+    return totals
+
+
+def discard_import(import_id):
+    AttendanceImportRow.query.filter_by(import_id=import_id).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def purge_stale_imports(max_age_hours=STALE_IMPORT_HOURS, commit=True):
+    """Remove staged imports that were never confirmed."""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    deleted = (
+        AttendanceImportRow.query
+        .filter(AttendanceImportRow.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    if commit:
+        db.session.commit()
+    return deleted
@@ -0,0 +1,193 @@
+import time as _time
+from datetime import date as date_cls
+
+from sqlalchemy import insert, select, update
+
+from main_app.extensions import db
+from main_app.models.hr_models import Attendance
+from main_app.services.attendance_rollup import refresh_attendance_rollup
+from main_app.services.employee_summary import invalidate_employee_summary_on_commit
+from main_app.services.late_ledger import sync_late_computations
+from main_app.services.work_calendar import row_schedules
+from main_app.services.working_hours import compute_working_hours_batch
+
+
+INGEST_CHUNK_SIZE = 1000
+RECOMPUTE_CHUNK_SIZE = 5000
+EXISTING_LOOKUP_CHUNK_SIZE = 500
+
+
+# ============================================================
+# INSERT HELPERS
+# ============================================================
+
+def insert_ignore(table, dialect_name):
+    """INSERT that silently skips rows hitting a unique constraint."""
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing()
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_nothing()
+    if dialect_name in ("mysql", "mariadb"):
+        return insert(table).prefix_with("IGNORE")
+    return insert(table)
+
+
+def _existing_pairs(employee_ids, start, end):
+    """(employee_id, date) pairs already stored for these employees in [start, end]."""
+    ids = sorted(employee_ids)
+    existing = set()
+    for i in range(0, len(ids), EXISTING_LOOKUP_CHUNK_SIZE):
+        chunk = ids[i:i + EXISTING_LOOKUP_CHUNK_SIZE]
+        existing.update(db.session.execute(
+            select(Attendance.employee_id, Attendance.date)
+            .where(Attendance.employee_id.in_(chunk), Attendance.date.between(start, end))
+        ).tuples())
+    return existing
+
+
+# ============================================================
+# BULK INGEST
+# ============================================================
+
+def bulk_ingest_attendance(records, chunk_size=INGEST_CHUNK_SIZE, commit=True):
+    """
+    Insert many attendance rows at once.
+
+    ``records`` are dicts with employee_id, date, time_in, time_out and
+    optionally status/remarks. Existing (employee_id, date) pairs are
+    skipped with one range query per chunk of employee ids, working hours
+    are computed in batch, rows are written with INSERT ... ON CONFLICT DO
+    NOTHING per chunk, and the late ledger and daily rollup are synced for
+    the new rows. Returns a stats dict.
+    """
+    started = _time.perf_counter()
+
+    unique = {}
+    for r in records:
+        unique.setdefault((r["employee_id"], r["date"]), r)
+
+    stats = {"received": len(records), "inserted": 0, "skipped": 0, "late": 0}
+    if not unique:
+        stats["seconds"] = round(_time.perf_counter() - started, 4)
+        return stats
+
+    dates = [day for _, day in unique]
+    existing = _existing_pairs({emp_id for emp_id, _ in unique}, min(dates), max(dates))
+    rows = [r for key, r in unique.items() if key not in existing]
+
+    time_ins = [r.get("time_in") for r in rows]
+    statuses = [r.get("status") or ("Present" if r.get("time_in") else "Absent") for r in rows]
+    schedules = row_schedules([r["employee_id"] for r in rows])
+    hours = compute_working_hours_batch(time_ins, [r.get("time_out") for r in rows], statuses, schedules)
+
+    payload = [
+        dict(
+            employee_id=r["employee_id"],
+            date=r["date"],
+            time_in=r.get("time_in"),
+            time_out=r.get("time_out"),
+            status=statuses[i],
+            remarks=r.get("remarks", ""),
+            working_hours=hours[i]
+        )
+        for i, r in enumerate(rows)
+    ]
+
+    dialect_name = db.session.get_bind().dialect.name
+    table = Attendance.__table__
+    stmt = insert_ignore(table, dialect_name)
+    use_returning = dialect_name in ("sqlite", "postgresql")
+    if use_returning:
+        stmt = stmt.returning(table.c.id, table.c.employee_id, table.c.date)
+
+    inserted = []
+    for start in range(0, len(payload), chunk_size):
+        chunk = payload[start:start + chunk_size]
+        result = db.session.execute(stmt, chunk)
+        if use_returning:
+            inserted.extend(result.all())
+        else:
+            stats["inserted"] += result.rowcount
+
+    if not use_returning:
+        # No RETURNING support: look the new ids up in one query
+        wanted = {(r["employee_id"], r["date"]) for r in payload}
+        inserted = [
+            row for row in db.session.execute(
+                select(Attendance.id, Attendance.employee_id, Attendance.date)
+                .where(Attendance.date.between(min(dates), max(dates)))
+            ).all()
+            if (row.employee_id, row.date) in wanted
+        ]
+    else:
+        stats["inserted"] = len(inserted)
+
+    late_stats = sync_late_computations([row[0] for row in inserted])
+    refresh_attendance_rollup({row[2] for row in inserted})
+    # Core inserts bypass the ORM hooks that drop cached dashboard summaries
+    invalidate_employee_summary_on_commit({row[1] for row in inserted})
+
+    if commit:
+        db.session.commit()
+
+    stats["late"] = late_stats["late"]
+    stats["skipped"] = stats["received"] - stats["inserted"]
+    stats["seconds"] = round(_time.perf_counter() - started, 4)
+    return stats
+
+
+# ============================================================
+# BULK RECOMPUTE
+# ============================================================
+
+def recompute_working_hours(start_date=None, end_date=None, schedule=None,
+                            chunk_size=RECOMPUTE_CHUNK_SIZE):
+    """
+    Recompute Attendance.working_hours for a date range with the batch
+    kernel (e.g. after a shift change). Each row uses its department's
+    shift unless one schedule is given for all. Only rows whose hours
+    change are written, by primary key, and the rollup is refreshed for
+    their days. Commits.
+    """
+    started = _time.perf_counter()
+    start_date = start_date or date_cls.min
+    end_date = end_date or date_cls.max
+
+    stats = {"checked": 0, "updated": 0}
+    changed_days = set()
+    last_id = 0
+
+    while True:
+        rows = db.session.execute(
+            select(
+                Attendance.id, Attendance.employee_id, Attendance.date, Attendance.time_in,
+                Attendance.time_out, Attendance.status, Attendance.working_hours
+            )
+            .where(Attendance.date.between(start_date, end_date), Attendance.id > last_id)
+            .order_by(Attendance.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        schedules = schedule or row_schedules([r.employee_id for r in rows])
+        hours = compute_working_hours_batch(
+            [r.time_in for r in rows], [r.time_out for r in rows], [r.status for r in rows], schedules
+        )
+        changed = [(r, h) for r, h in zip(rows, hours) if r.working_hours != h]
+        if changed:
+            db.session.execute(update(Attendance), [{"id": r.id, "working_hours": h} for r, h in changed])
+            changed_days.update(r.date for r, _ in changed)
+
+        stats["checked"] += len(rows)
+        stats["updated"] += len(changed)
+
+    refresh_attendance_rollup(changed_days)
+    db.session.commit()
+
+    stats["seconds"] = round(_time.perf_counter() - started, 4)
+    return stats
+
@@ -0,0 +1,260 @@
+import calendar
+from collections import defaultdict
+from datetime import date as date_cls
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE, NEVER_SET
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Attendance, DailyAttendanceRollup, Employee
+from main_app.services.late_matrix import invalidate_late_matrix
+
+
+# Attendance dates touched in the current unit of work, kept in session.info
+PENDING_KEY = "attendance_rollup_pending"
+# Employees moved to another department; all their days are re-bucketed
+MOVED_KEY = "attendance_rollup_moved"
+# Refreshed days whose cached heatmaps/late matrices are dropped after commit
+STALE_KEY = "attendance_rollup_stale"
+REFRESH_CHUNK_SIZE = 200
+
+NO_DEPARTMENT = 0
+
+HEATMAP_STATUSES = ("Present", "Absent", "Late", "OnLeave")
+HEATMAP_TTL = 300
+
+_heatmap_cache = TTLCache(ttl=HEATMAP_TTL, maxsize=256)
+
+
+# ============================================================
+# ROLLUP REFRESH
+# ============================================================
+
+def _bucket_select(dates=None, start_date=None, end_date=None):
+    department = func.coalesce(Employee.department_id, NO_DEPARTMENT)
+    status = func.coalesce(Attendance.status, "")
+
+    stmt = (
+        select(
+            Attendance.date,
+            department,
+            status,
+            func.count(Attendance.id),
+            func.coalesce(func.sum(Attendance.working_hours), 0)
+        )
+        .join(Employee, Employee.id == Attendance.employee_id)
+        .group_by(Attendance.date, department, status)
+    )
+    if dates is not None:
+        stmt = stmt.where(Attendance.date.in_(dates))
+    if start_date is not None:
+        stmt = stmt.where(Attendance.date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Attendance.date <= end_date)
+    return stmt
+
+
+def _replace_buckets(session, delete_where, select_stmt):
+    session.execute(
+        delete(DailyAttendanceRollup)
+        .where(*delete_where)
+        .execution_options(synchronize_session=False)
+    )
+    payload = [
+        dict(
+            date=day,
+            department_id=dept_id,
+            status=status,
+            attendance_count=count,
+            hours_sum=round(float(hours or 0), 2)
+        )
+        for day, dept_id, status, count, hours in session.execute(select_stmt)
+    ]
+    if payload:
+        session.execute(insert(DailyAttendanceRollup), payload)
+    return len(payload)
+
+
+def refresh_attendance_rollup(dates, session=None):
+    """
+    Recompute the rollup rows for the given attendance dates from one
+    GROUP BY per chunk of days. Does not commit; cached heatmaps and late
+    matrices of these months are dropped once the session commits.
+    """
+    session = session or db.session
+    days = sorted({d for d in dates if d is not None})
+    buckets = 0
+
+    for start in range(0, len(days), REFRESH_CHUNK_SIZE):
+        chunk = days[start:start + REFRESH_CHUNK_SIZE]
+        buckets += _replace_buckets(
+            session,
+            [DailyAttendanceRollup.date.in_(chunk)],
+            _bucket_select(dates=chunk)
+        )
+
+    # Invalidating now would let a concurrent request re-cache the
+    # pre-commit rows, so wait for after_commit
+    session.info.setdefault(STALE_KEY, set()).update(days)
+
+    return {"days": len(days), "buckets": buckets}
+
+
+def rebuild_attendance_rollup(start_date=None, end_date=None):
+    """Rebuild every rollup row in a date range from attendance."""
+    start_date = start_date or date_cls.min
+    end_date = end_date or date_cls.max
+
+    buckets = _replace_buckets(
+        db.session,
+        [DailyAttendanceRollup.date.between(start_date, end_date)],
+        _bucket_select(start_date=start_date, end_date=end_date)
+    )
+    db.session.commit()
+    invalidate_late_matrix()
+    invalidate_month_heatmap()
+    return {"buckets": buckets}
+
+
+# ============================================================
+# READERS
+# ============================================================
+
+def daily_status_counts(start_date, end_date, department_id=None):
+    """
+    {date: {status: count}} for a date range, optionally limited to one
+    department, read from the rollup table.
+    """
+    stmt = (
+        select(
+            DailyAttendanceRollup.date,
+            DailyAttendanceRollup.status,
+            func.sum(DailyAttendanceRollup.attendance_count)
+        )
+        .where(DailyAttendanceRollup.date.between(start_date, end_date))
+        .group_by(DailyAttendanceRollup.date, DailyAttendanceRollup.status)
+    )
+    if department_id is not None:
+        stmt = stmt.where(DailyAttendanceRollup.department_id == department_id)
+
+    days = defaultdict(dict)
+    for day, status, count in db.session.execute(stmt):
+        days[day][status] = int(count or 0)
+    return dict(days)
+
+
+def _month_heatmap(year, month, department_id):
+    start = date_cls(year, month, 1)
+    end = date_cls(year, month, calendar.monthrange(year, month)[1])
+
+    days = {}
+    for day, counts in daily_status_counts(start, end, department_id=department_id).items():
+        summary = {status: 0 for status in HEATMAP_STATUSES}
+        for status, count in counts.items():
+            status = (status or "").strip()
+            if status in summary:
+                summary[status] += count
+        if any(summary.values()):
+            days[day.isoformat()] = summary
+    return days
+
+
+def month_heatmap(year, month, department_id=None):
+    """
+    {"YYYY-MM-DD": {status: count}} for the calendar heatmap, one entry
+    per day with attendance. Cached per (year, month, department).
+    """
+    key = (year, month, department_id or None)
+    return _heatmap_cache.get_or_set(key, lambda: _month_heatmap(year, month, department_id))
+
+
+def invalidate_month_heatmap(days=None):
+    """Drop cached heatmaps, or only the months containing the given dates."""
+    if days is None:
+        _heatmap_cache.invalidate()
+        return
+    months = {(d.year, d.month) for d in days}
+    _heatmap_cache.invalidate(lambda key: (key[0], key[1]) in months)
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+def _mark_date(target, *days):
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(PENDING_KEY, set())
+    pending.update(d for d in days if d is not None)
+
+
+def _attendance_written(mapper, connection, target):
+    _mark_date(target, target.date)
+
+
+def _attendance_date_changed(target, value, oldvalue, initiator):
+    # A moved record leaves its old day stale as well
+    if oldvalue not in (NO_VALUE, NEVER_SET) and oldvalue != value:
+        _mark_date(target, oldvalue)
+
+
+def _employee_updated(mapper, connection, target):
+    # Rollup buckets are keyed by the employee's department
+    if inspect(target).attrs.department_id.history.has_changes():
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(MOVED_KEY, set()).add(target.id)
+
+
+def _moved_employee_dates(session, employee_ids):
+    ids = sorted(employee_ids)
+    days = set()
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        days.update(session.scalars(
+            select(Attendance.date)
+            .where(Attendance.employee_id.in_(ids[start:start + REFRESH_CHUNK_SIZE]))
+            .distinct()
+        ))
+    return days
+
+
+def _flush_attendance_rollup(session):
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+
+    moved = session.info.pop(MOVED_KEY, None)
+    if moved:
+        session.info.setdefault(PENDING_KEY, set()).update(_moved_employee_dates(session, moved))
+
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        refresh_attendance_rollup(pending, session=session)
+
+
+def _invalidate_on_commit(session):
+    stale = session.info.pop(STALE_KEY, None)
+    if stale:
+        invalidate_late_matrix(stale)
+        invalidate_month_heatmap(stale)
+
+
+def _discard_pending(session, *args):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(MOVED_KEY, None)
+    session.info.pop(STALE_KEY, None)
+
+
+def register_attendance_rollup():
+    """Keep daily_attendance_rollup in step with ORM attendance and department changes."""
+    if not event.contains(Session, "before_commit", _flush_attendance_rollup):
+        event.listen(Employee, "after_update", _employee_updated)
+        event.listen(Attendance, "after_insert", _attendance_written)
+        event.listen(Attendance, "after_update", _attendance_written)
+        event.listen(Attendance.date, "set", _attendance_date_changed, active_history=True)
+        event.listen(Attendance, "after_delete", _attendance_written)
+        event.listen(Session, "before_commit", _flush_attendance_rollup)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_pending)
@@ -0,0 +1,193 @@
+from sqlalchemy import and_, func, select
+
+from main_app.extensions import db
+from main_app.models.hr_models import Employee, Department, Attendance
+
+
+PRESENT_STATUSES = ("Present", "Late")
+
+
+# ============================================================
+# ATTENDANCE AGGREGATION
+# ============================================================
+
+def aggregate_attendance(start_date, end_date, *criteria):
+    """
+    Per-employee and per-department attendance totals for a date range
+    from a single GROUP BY (employee, status) query.
+
+    ``criteria`` are extra Employee filters, e.g.
+    ``Employee.status == "Active"`` or ``Employee.department_id == 3``.
+
+    Returns {"employees": [...], "departments": [...], "totals": {...}}.
+    """
+    rows = db.session.execute(
+        select(
+            Employee.id,
+            Employee.first_name,
+            Employee.middle_name,
+            Employee.last_name,
+            Employee.department_id,
+            Department.name,
+            Attendance.status,
+            func.count(Attendance.id),
+            func.coalesce(func.sum(Attendance.working_hours), 0)
+        )
+        .outerjoin(
+            Attendance,
+            and_(
+                Attendance.employee_id == Employee.id,
+                Attendance.date >= start_date,
+                Attendance.date <= end_date
+            )
+        )
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .where(*criteria)
+        .group_by(
+            Employee.id, Employee.first_name, Employee.middle_name, Employee.last_name,
+            Employee.department_id, Department.name, Attendance.status
+        )
+        .order_by(Employee.id)
+    ).all()
+
+    # -----------------------------------------------------
+    # Per employee
+    # -----------------------------------------------------
+    employees = {}
+    for emp_id, first, middle, last, dept_id, dept_name, status, count, hours in rows:
+        emp = employees.get(emp_id)
+        if emp is None:
+            emp = employees[emp_id] = {
+                "employee_id": emp_id,
+                "employee_name": f"{first} {middle or ''} {last}".strip(),
+                "department_id": dept_id,
+                "department_name": dept_name or "",
+                "days_present": 0,
+                "days_absent": 0,
+                "late_count": 0,
+                "total_hours": 0.0,
+            }
+
+        if status is None:
+            continue
+        if status in PRESENT_STATUSES:
+            emp["days_present"] += count
+        if status == "Absent":
+            emp["days_absent"] += count
+        if status == "Late":
+            emp["late_count"] += count
+        emp["total_hours"] += float(hours or 0)
+
+    # -----------------------------------------------------
+    # Per department + overall totals
+    # -----------------------------------------------------
+    total_days = (end_date - start_date).days + 1
+    departments = {}
+    totals = {"employees": len(employees), "days_present": 0, "total_hours": 0.0}
+
+    for emp in employees.values():
+        totals["days_present"] += emp["days_present"]
+        totals["total_hours"] += emp["total_hours"]
+
+        if emp["department_id"] is None:
+            continue
+        dept = departments.setdefault(emp["department_id"], {
+            "id": emp["department_id"],
+            "name": emp["department_name"],
+            "employees": 0,
+            "days_present": 0,
+            "total_hours": 0.0,
+        })
+        dept["employees"] += 1
+        dept["days_present"] += emp["days_present"]
+        dept["total_hours"] += emp["total_hours"]
+
+    for dept in departments.values():
+        possible = total_days * dept["employees"]
+        dept["avg_attendance"] = round(dept["days_present"] / possible * 100, 2) if possible else 0
+        dept["avg_hours"] = round(dept["total_hours"] / dept["employees"], 2) if dept["employees"] else 0
+        dept["total_hours"] = round(dept["total_hours"], 2)
+
+    possible = total_days * totals["employees"]
+    totals["avg_attendance"] = round(totals["days_present"] / possible * 100, 2) if possible else 0
+    totals["avg_hours"] = round(totals["total_hours"] / totals["employees"], 2) if totals["employees"] else 0
+    totals["total_hours"] = round(totals["total_hours"], 2)
+
+    for emp in employees.values():
+        emp["total_hours"] = round(emp["total_hours"], 2)
+
+    return {
+        "employees": list(employees.values()),
+        "departments": sorted(departments.values(), key=lambda d: d["id"]),
+        "totals": totals,
+    }
+
+
+# ============================================================
+# WORD REPORT
+# ============================================================
+
+def build_attendance_report_docx(start_date, end_date, department_id=None):
+    """Attendance report as .docx bytes (archived employees excluded)."""
+    from io import BytesIO
+    from docx import Document
+
+    # -----------------------------
+    # Aggregate attendance (optional filter by department)
+    # -----------------------------
+    criteria = [Employee.archived == False]
+    if department_id:
+        criteria.append(Employee.department_id == department_id)
+
+    summary = aggregate_attendance(start_date, end_date, *criteria)
+    employees = summary["employees"]
+
+    # -----------------------------
+    # Create Word Document
+    # -----------------------------
+    doc = Document()
+
+    # Header
+    header = doc.add_paragraph()
+    header.alignment = 1  # center
+    header.add_run("MUNICIPALITY OF NORZAGARAY\n").bold = True
+    header.add_run("Attendance Report\n").bold = True
+    header.add_run(f"From {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}\n").italic = True
+
+    # Table header
+    table = doc.add_table(rows=1, cols=5)
+    table.style = 'Table Grid'
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].text = "Employee Name"
+    hdr_cells[1].text = "Department"
+    hdr_cells[2].text = "Days Present"
+    hdr_cells[3].text = "Days Absent"
+    hdr_cells[4].text = "Total Hours Worked"
+
+    # Attendance data
+    for emp in employees:
+        row_cells = table.add_row().cells
+        row_cells[0].text = emp["employee_name"]
+        row_cells[1].text = emp["department_name"] or "N/A"
+        row_cells[2].text = str(emp["days_present"])
+        row_cells[3].text = str(emp["days_absent"])
+        row_cells[4].text = f"{emp['total_hours']:.2f}"
+
+    # -----------------------------
+    # Insights Section
+    # -----------------------------
+    doc.add_paragraph('\nOverall Insights', style='Heading 2')
+
+    if employees:
+        doc.add_paragraph(f"Total Employees: {len(employees)}")
+        doc.add_paragraph(f"Average Attendance: {summary['totals']['avg_attendance']}%")
+        doc.add_paragraph(f"Average Hours Worked per Employee: {summary['totals']['avg_hours']} hrs")
+
+    # Department-wise insights
+    doc.add_paragraph('\nDepartment-wise Insights', style='Heading 2')
+    for dept in summary["departments"]:
+        doc.add_paragraph(f"{dept['name']}: Avg Attendance: {dept['avg_attendance']}%, Avg Hours: {dept['avg_hours']}")
+
+    file_stream = BytesIO()
+    doc.save(file_stream)
+    return file_stream.getvalue()
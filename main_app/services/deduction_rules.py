@@ -0,0 +1,201 @@
+from bisect import bisect_left
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+
+from main_app.helpers.cache import TTLCache
+from main_app.models.payroll_models import Deduction, DeductionBracket
+
+
+# ============================================================
+# COMPILED DEDUCTION RULES
+# ============================================================
+# Each Deduction (and its brackets) is turned into sorted arrays once, so a
+# share lookup is a bisect instead of a linear walk over lazy-loaded rows.
+
+# Commits that touch deductions drop the cache; the TTL covers writes from
+# other processes
+RULES_TTL = 300
+
+# Set in session.info when a flush touches deductions or their brackets
+DIRTY_KEY = "deduction_rules_dirty"
+
+_rules_cache = TTLCache(ttl=RULES_TTL, maxsize=1)
+
+
+class CompiledDeduction:
+    """Array form of a Deduction master record and its brackets."""
+
+    def __init__(self, d):
+        self.id = d.id
+        self.name = d.name
+        self.calculation_type = d.calculation_type
+        self.rate = d.rate or 0
+        self.ceiling = d.ceiling
+        self.floor = d.floor
+        self.active = bool(d.active)
+
+        # Brackets tile the salary range, so salary_to is sorted as well
+        brackets = sorted(d.brackets, key=lambda b: (b.salary_from, b.salary_to))
+        self.salary_from = np.array([b.salary_from for b in brackets], dtype=float)
+        self.salary_to = np.array([b.salary_to for b in brackets], dtype=float)
+        self.employee_share = np.array([b.employee_share or 0 for b in brackets], dtype=float)
+        self.employer_share = np.array([b.employer_share or 0 for b in brackets], dtype=float)
+        self.ec = np.array([b.ec or 0 for b in brackets], dtype=float)
+        self.bracket_rate = np.array([b.rate or 0 for b in brackets], dtype=float)
+        self.fixed_amount = np.array([b.fixed_amount or 0 for b in brackets], dtype=float)
+        self._bounds = self.salary_to.tolist()
+
+    # -----------------------------------------------------
+    # SCALAR LOOKUP
+    # -----------------------------------------------------
+
+    def _bracket_index(self, salary):
+        # First bracket whose salary_to reaches the salary: on a shared
+        # boundary (one bracket's salary_to == the next one's salary_from)
+        # the lower bracket wins, like the old first-match walk.
+        i = bisect_left(self._bounds, salary)
+        if i == len(self._bounds) or salary < self.salary_from[i]:
+            return None
+        return i
+
+    def compute_one(self, salary):
+        """Shares for one salary, same result as the old bracket walk."""
+        salary = salary or 0
+
+        if self.calculation_type == "fixed":
+            return dict(employee_share=self.rate, employer_share=0, ec=0)
+
+        if self.calculation_type == "percentage":
+            base = salary
+            if self.ceiling:
+                base = min(base, self.ceiling)
+            if self.floor:
+                base = max(base, self.floor)
+            return dict(employee_share=round(base * self.rate, 2), employer_share=0, ec=0)
+
+        if self.calculation_type in ("bracket", "progressive"):
+            i = self._bracket_index(salary)
+            if i is None:
+                return dict(employee_share=0, employer_share=0, ec=0)
+
+            if self.calculation_type == "bracket":
+                return dict(
+                    employee_share=float(self.employee_share[i]),
+                    employer_share=float(self.employer_share[i]),
+                    ec=float(self.ec[i])
+                )
+
+            return dict(
+                employee_share=round(salary * float(self.bracket_rate[i]) + float(self.fixed_amount[i]), 2),
+                employer_share=0,
+                ec=0
+            )
+
+        return dict(employee_share=0, employer_share=0, ec=0)
+
+    # -----------------------------------------------------
+    # VECTOR LOOKUP
+    # -----------------------------------------------------
+
+    def compute(self, salaries):
+        """Shares for a whole salary vector; returns a dict of numpy arrays."""
+        salaries = np.nan_to_num(np.asarray(salaries, dtype=float))
+        zeros = np.zeros_like(salaries)
+
+        if self.calculation_type == "fixed":
+            return dict(employee_share=zeros + self.rate, employer_share=zeros, ec=zeros.copy())
+
+        if self.calculation_type == "percentage":
+            base = salaries
+            if self.ceiling:
+                base = np.minimum(base, self.ceiling)
+            if self.floor:
+                base = np.maximum(base, self.floor)
+            return dict(employee_share=np.round(base * self.rate, 2), employer_share=zeros, ec=zeros.copy())
+
+        if self.calculation_type in ("bracket", "progressive") and len(self.salary_from):
+            idx = np.searchsorted(self.salary_to, salaries, side="left")
+            safe = np.clip(idx, 0, len(self.salary_to) - 1)
+            hit = (idx < len(self.salary_to)) & (salaries >= self.salary_from[safe])
+
+            if self.calculation_type == "bracket":
+                return dict(
+                    employee_share=np.where(hit, self.employee_share[safe], 0.0),
+                    employer_share=np.where(hit, self.employer_share[safe], 0.0),
+                    ec=np.where(hit, self.ec[safe], 0.0)
+                )
+
+            share = np.round(salaries * self.bracket_rate[safe] + self.fixed_amount[safe], 2)
+            return dict(employee_share=np.where(hit, share, 0.0), employer_share=zeros, ec=zeros.copy())
+
+        return dict(employee_share=zeros, employer_share=zeros.copy(), ec=zeros.copy())
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+def _compile(query):
+    deductions = query.options(selectinload(Deduction.brackets)).all()
+    return {d.id: CompiledDeduction(d) for d in deductions}
+
+
+def get_deduction_rules():
+    """Compiled rules for every active deduction, keyed by deduction id."""
+    return _rules_cache.get_or_set(
+        "active", lambda: _compile(Deduction.query.filter(Deduction.active.is_(True)))
+    )
+
+
+def get_rules_for(deduction_ids):
+    """
+    Compiled rules for the given ids. Active rules come from the cache;
+    anything else (e.g. inactive masters still linked to employees) is
+    compiled in one extra query and not cached.
+    """
+    rules = get_deduction_rules()
+    wanted = set(deduction_ids)
+    found = {i: rules[i] for i in wanted if i in rules}
+
+    missing = wanted - found.keys()
+    if missing:
+        found.update(_compile(Deduction.query.filter(Deduction.id.in_(missing))))
+    return found
+
+
+def invalidate_deduction_rules():
+    """Drop the compiled rules (done automatically on Deduction/DeductionBracket commits)."""
+    _rules_cache.invalidate()
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+_WATCHED = (Deduction, DeductionBracket)
+
+
+def _mark_dirty(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _WATCHED):
+            session.info[DIRTY_KEY] = True
+            return
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop(DIRTY_KEY, False):
+        invalidate_deduction_rules()
+
+
+def _discard_dirty(session, *args):
+    session.info.pop(DIRTY_KEY, None)
+
+
+def register_deduction_rules():
+    """Drop the compiled deduction rules whenever a commit wrote deduction data."""
+    if not event.contains(Session, "after_commit", _invalidate_on_commit):
+        event.listen(Session, "before_flush", _mark_dirty)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_dirty)
@@ -1,125 +1,248 @@
+import csv
 import io
 import os
-import pandas as pd
+import tempfile
 from datetime import datetime
-from flask import send_file
+from flask import Response, stream_with_context
+from sqlalchemy import func, literal, select
 
+from openpyxl import Workbook
 from openpyxl.drawing.image import Image as OpenpyxlImage
 
-
-def safe_get(obj, attr, default=0):
-    return getattr(obj, attr, default) or default
-
-
-def export_payroll_excel(query):
-
-    payrolls = query.all()
-
-    data = []
-
-    for p in payrolls:
-
-        total_linked_deductions = sum(
-            (ed.deduction.rate or 0)
-            for ed in getattr(p.employee, "employee_deductions", [])
-            if ed.deduction and ed.deduction.active
+from main_app.extensions import db
+from main_app.models.hr_models import Department, Employee
+from main_app.models.payroll_models import (
+    Allowance, Deduction, EmployeeAllowance, EmployeeDeduction, Payroll, PayrollPeriod,
+    compute_overtime_pay
+)
+
+
+# Rows fetched from the database per round trip while exporting
+EXPORT_YIELD_PER = 1000
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "img", "garay.png")
+
+HEADER_LINES = [
+    "Republic of the Philippines",
+    "MUNICIPALITY OF NORZAGARAY",
+    "Province of Bulacan",
+    "",
+    "Municipal Hall of Norzagaray",
+    "Norzagaray, Bulacan, Philippines",
+    "",
+    "Payroll Summary Report"
+]
+
+EXPORT_COLUMNS = [
+    "Employee ID", "Name", "Department",
+    "Basic Salary", "Overtime Hours", "Overtime Pay", "Holiday Pay", "Night Differential",
+    "Allowances", "Gross Pay",
+    "SSS", "PhilHealth", "Pag-IBIG", "Tax Withheld", "Other Deductions",
+    "Linked Deductions", "Total Deductions", "Net Pay",
+    "Status", "Pay Period"
+]
+
+
+# ============================================================
+# ROW SOURCE
+# ============================================================
+
+def payroll_export_rows(search="", department_id=None, pay_period_id=None):
+    """
+    Yield one export row (a list in EXPORT_COLUMNS order) per payroll.
+
+    Linked deductions and allowances are summed per employee in grouped
+    subqueries, and rows are streamed with yield_per so memory stays flat
+    however many payrolls match.
+    """
+    linked_deductions = (
+        select(
+            EmployeeDeduction.employee_id,
+            func.sum(func.coalesce(Deduction.rate, 0)).label("amount")
         )
-
-        total_allowances = sum(
-            (ea.allowance.amount or 0)
-            for ea in getattr(p.employee, "employee_allowances", [])
-            if ea.allowance and ea.allowance.active
+        .join(Deduction, Deduction.id == EmployeeDeduction.deduction_id)
+        .where(Deduction.active.is_(True))
+        .group_by(EmployeeDeduction.employee_id)
+        .subquery()
+    )
+    linked_allowances = (
+        select(
+            EmployeeAllowance.employee_id,
+            func.sum(func.coalesce(Allowance.amount, 0)).label("amount")
         )
+        .join(Allowance, Allowance.id == EmployeeAllowance.allowance_id)
+        .where(Allowance.active.is_(True))
+        .group_by(EmployeeAllowance.employee_id)
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            Employee.employee_id,
+            Employee.first_name,
+            Employee.last_name,
+            Department.name,
+            Payroll.basic_salary,
+            Payroll.overtime_hours,
+            Payroll.holiday_pay,
+            Payroll.night_diff,
+            Payroll.gross_pay,
+            Payroll.total_deductions,
+            Payroll.net_pay,
+            Payroll.status,
+            PayrollPeriod.start_date,
+            PayrollPeriod.end_date,
+            func.coalesce(linked_allowances.c.amount, literal(0)),
+            func.coalesce(linked_deductions.c.amount, literal(0))
+        )
+        .join(Employee, Employee.id == Payroll.employee_id)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(PayrollPeriod, PayrollPeriod.id == Payroll.payroll_period_id)
+        .outerjoin(linked_allowances, linked_allowances.c.employee_id == Employee.id)
+        .outerjoin(linked_deductions, linked_deductions.c.employee_id == Employee.id)
+        .order_by(Payroll.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+
+    if search:
+        stmt = stmt.where(
+            Employee.first_name.ilike(f"%{search}%") | Employee.last_name.ilike(f"%{search}%")
+        )
+    if department_id:
+        stmt = stmt.where(Employee.department_id == department_id)
+    if pay_period_id:
+        stmt = stmt.where(Payroll.payroll_period_id == pay_period_id)
+
+    for (emp_code, first, last, dept, basic, ot_hours, holiday, night, gross, deductions,
+         net, status, start, end, allowances, linked) in db.session.execute(stmt):
+        yield [
+            emp_code,
+            f"{first} {last}",
+            dept or "-",
+            basic or 0,
+            ot_hours or 0,
+            compute_overtime_pay(basic, ot_hours),
+            holiday or 0,
+            night or 0,
+            allowances,
+            (gross or 0) + allowances,
+            0,
+            0,
+            0,
+            0,
+            0,
+            linked,
+            (deductions or 0) + linked,
+            net or 0,
+            status or 0,
+            f"{start or '-'} - {end or '-'}"
+        ]
 
-        total_deductions = safe_get(p, "total_deductions") + total_linked_deductions
-        gross_pay_with_allowances = safe_get(p, "gross_pay") + total_allowances
-
-        data.append({
-            "Employee ID": p.employee.employee_id,
-            "Name": f"{p.employee.first_name} {p.employee.last_name}",
-            "Department": p.employee.department.name if p.employee.department else "-",
-
-            "Basic Salary": safe_get(p, "basic_salary"),
-            "Overtime Hours": safe_get(p, "overtime_hours"),
-            "Overtime Pay": safe_get(p, "overtime_pay"),
-            "Holiday Pay": safe_get(p, "holiday_pay"),
-            "Night Differential": safe_get(p, "night_diff"),
-
-            "Allowances": total_allowances,
-            "Gross Pay": gross_pay_with_allowances,
 
-            "SSS": 0,
-            "PhilHealth": 0,
-            "Pag-IBIG": 0,
-            "Tax Withheld": safe_get(p, "tax_withheld"),
-            "Other Deductions": safe_get(p, "other_deductions"),
+# ============================================================
+# WRITERS
+# ============================================================
 
-            "Linked Deductions": total_linked_deductions,
-            "Total Deductions": total_deductions,
-            "Net Pay": safe_get(p, "net_pay"),
+def write_payroll_xlsx(rows, path):
+    """Write rows through a write-only worksheet; rows are never held in memory."""
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Payroll")
 
-            "Status": safe_get(p, "status"),
-            "Pay Period": f"{getattr(p.period, 'start_date', '-') } - {getattr(p.period, 'end_date', '-')}"
-        })
+    # ===============================
+    # ⭐ LOGO INSERTION
+    # ===============================
 
-    df = pd.DataFrame(data)
+    if os.path.exists(LOGO_PATH):
+        img = OpenpyxlImage(LOGO_PATH)
 
-    output = io.BytesIO()
+        img.width = 120
+        img.height = 120
 
-    # ✅ Write Excel file
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        worksheet.add_image(img, "A1")
 
-        df.to_excel(
-            writer,
-            index=False,
-            sheet_name="Payroll",
-            startrow=10   # ⭐ Leave space for header logo
-        )
+    # ===============================
+    # ⭐ Professional Government Header
+    # ===============================
 
-        workbook = writer.book
-        worksheet = writer.sheets["Payroll"]
+    worksheet.append([])
+    for text in HEADER_LINES:
+        worksheet.append([None, None, text])
+    worksheet.append([])
 
-        # ===============================
-        # ⭐ LOGO INSERTION
-        # ===============================
+    worksheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        worksheet.append(row)
 
-        logo_path = r"C:\Users\pc\Desktop\Thesis_final\main_app\static\img\garay.png"
+    workbook.save(path)
+    return path
 
-        if os.path.exists(logo_path):
-            img = OpenpyxlImage(logo_path)
 
-            img.width = 120
-            img.height = 120
+def _stream_temp_file(path, filename, mimetype, chunk_size=64 * 1024):
+    """Stream a file in chunks and delete it once fully sent (or aborted)."""
 
-            worksheet.add_image(img, "A1")
+    def generate():
+        try:
+            with open(path, "rb") as handle:
+                while True:
+                    chunk = handle.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
 
-        # ===============================
-        # ⭐ Professional Government Header
-        # ===============================
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(os.path.getsize(path))
+        }
+    )
 
-        header_lines = [
-            "Republic of the Philippines",
-            "MUNICIPALITY OF NORZAGARAY",
-            "Province of Bulacan",
-            "",
-            "Municipal Hall of Norzagaray",
-            "Norzagaray, Bulacan, Philippines",
-            "",
-            "Payroll Summary Report"
-        ]
 
-        row = 2
-        for text in header_lines:
-            worksheet.cell(row=row, column=3, value=text)
-            row += 1
+def export_payroll_excel(search="", department_id=None, pay_period_id=None):
+    """Stream a payroll XLSX built in a temp file (flat memory for large periods)."""
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
 
-    output.seek(0)
+    try:
+        write_payroll_xlsx(payroll_export_rows(search, department_id, pay_period_id), path)
+    except Exception:
+        os.remove(path)
+        raise
 
     filename = f"Payroll_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
-    return send_file(
-        output,
-        download_name=filename,
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
\ No newline at end of file
+    return _stream_temp_file(
+        path,
+        filename,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+
+def export_payroll_csv(search="", department_id=None, pay_period_id=None):
+    """Stream payroll rows as CSV straight from the cursor; the fastest export."""
+    rows = payroll_export_rows(search, department_id, pay_period_id)
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(EXPORT_COLUMNS)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % EXPORT_YIELD_PER == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+
+    filename = f"Payroll_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
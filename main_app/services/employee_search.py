@@ -0,0 +1,139 @@
+import re
+import threading
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+
+from main_app.extensions import db
+from main_app.models.hr_models import Employee
+
+
+SEARCH_FIELDS = ("first_name", "last_name", "email", "employee_id")
+
+FTS_TABLE = "employee_fts"
+
+# External-content FTS5 index over employee, kept in sync by triggers so
+# ORM writes, bulk inserts and archiving all update it.
+FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        first_name, last_name, email, employee_id,
+        content='employee', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON employee BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, email, employee_id)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.employee_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON employee BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, email, employee_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.employee_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF first_name, last_name, email, employee_id ON employee BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, first_name, last_name, email, employee_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.employee_id);
+        INSERT INTO {FTS_TABLE}(rowid, first_name, last_name, email, employee_id)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.employee_id);
+    END
+    """,
+]
+
+_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+
+_available = {}
+_available_lock = threading.Lock()
+
+
+# ============================================================
+# INDEX MANAGEMENT
+# ============================================================
+
+def fts_available():
+    """True when the FTS5 index exists on the current (SQLite) database."""
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+
+    key = str(engine.url)
+    if key not in _available:
+        with _available_lock:
+            _available[key] = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first() is not None
+    return _available[key]
+
+
+def rebuild_employee_search():
+    """Create the FTS5 index and triggers if needed and re-index every employee."""
+    if db.engine.dialect.name != "sqlite":
+        return {"indexed": 0, "fts": False}
+
+    for statement in FTS_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+
+    _available.pop(str(db.engine.url), None)
+    return {"indexed": db.session.scalar(select(func.count(Employee.id))) or 0, "fts": True}
+
+
+# ============================================================
+# QUERY BUILDING
+# ============================================================
+
+def _match_expression(term, fields):
+    """FTS5 query: every word of term as a prefix, within the given columns."""
+    words = re.findall(r"\w+", term or "", re.UNICODE)
+    if not words:
+        return None
+    phrases = " AND ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+    return "{%s} : (%s)" % (" ".join(fields), phrases)
+
+
+def _ilike_clause(term, fields):
+    return or_(*[getattr(Employee, f).ilike(f"%{term}%") for f in fields])
+
+
+def employee_search_clause(term, fields=SEARCH_FIELDS):
+    """
+    WHERE clause for employees matching term: ranked-prefix FTS5 lookup
+    when the index exists, otherwise the old ilike scan.
+    """
+    match = _match_expression(term, fields)
+    if match is None or not fts_available():
+        return _ilike_clause(term, fields)
+
+    return Employee.id.in_(
+        select(_fts.c.rowid).where(_fts.c[FTS_TABLE].op("MATCH")(match))
+    )
+
+
+def search_employees(query, term, fields=SEARCH_FIELDS):
+    """
+    Filter an Employee query by term with the best matches first (bm25).
+    Callers' own ORDER BY applies after the rank.
+    """
+    match = _match_expression(term, fields)
+    if match is None or not fts_available():
+        return query.filter(_ilike_clause(term, fields))
+
+    ranked = (
+        select(
+            _fts.c.rowid.label("employee_id"),
+            func.bm25(literal_column(FTS_TABLE)).label("rank")
+        )
+        .where(_fts.c[FTS_TABLE].op("MATCH")(match))
+        .subquery()
+    )
+    return (
+        query.join(ranked, ranked.c.employee_id == Employee.id)
+        .order_by(ranked.c.rank)
+    )
@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Attendance, Leave, LeaveCredit, LeaveType
+
+
+SUMMARY_TTL = 24 * 3600
+
+# Employees whose summary a commit makes stale, kept in session.info
+PENDING_KEY = "employee_summary_pending"
+
+_summary_cache = TTLCache(ttl=SUMMARY_TTL, maxsize=2048)
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _leave_balances(employee_id):
+    """Remaining credits for every leave type (0 when none) in one query."""
+    stmt = (
+        select(
+            LeaveType.name,
+            func.coalesce(func.sum(LeaveCredit.total_credits - LeaveCredit.used_credits), 0)
+        )
+        .outerjoin(
+            LeaveCredit,
+            and_(LeaveCredit.leave_type_id == LeaveType.id, LeaveCredit.employee_id == employee_id)
+        )
+        .group_by(LeaveType.id, LeaveType.name)
+        .order_by(LeaveType.id)
+    )
+    return {name: round(float(balance), 3) for name, balance in db.session.execute(stmt)}
+
+
+def _attendance(employee_id, start_date, end_date):
+    """Month-to-date counts and daily chart series from one query."""
+    statuses = dict(db.session.execute(
+        select(Attendance.date, Attendance.status).where(
+            Attendance.employee_id == employee_id,
+            Attendance.date.between(start_date, end_date)
+        )
+    ).all())
+
+    counts = {"Present": 0, "Absent": 0, "Late": 0, "Half Day": 0}
+    for status in statuses.values():
+        if status in counts:
+            counts[status] += 1
+
+    chart = {"dates": [], "present_counts": [], "absent_counts": [], "late_counts": [], "half_day_counts": []}
+    day = start_date
+    while day <= end_date:
+        # Same rule as get_attendance_chart_data(): no record counts as Absent
+        status = statuses.get(day, "Absent")
+        chart["dates"].append(day.strftime("%Y-%m-%d"))
+        chart["present_counts"].append(1 if status == "Present" else 0)
+        chart["absent_counts"].append(1 if status == "Absent" else 0)
+        chart["late_counts"].append(1 if status == "Late" else 0)
+        chart["half_day_counts"].append(1 if status == "Half Day" else 0)
+        day += timedelta(days=1)
+
+    summary = {
+        "total_days": len(statuses),
+        "total_present": counts["Present"],
+        "total_absent": counts["Absent"],
+        "total_late": counts["Late"],
+        "total_half_day": counts["Half Day"],
+    }
+    return summary, chart
+
+
+def _build_summary(employee_id, as_of):
+    start_date = as_of.replace(day=1)
+    attendance, chart = _attendance(employee_id, start_date, as_of)
+    return {
+        "employee_id": employee_id,
+        "as_of": as_of.isoformat(),
+        "start_date": start_date.isoformat(),
+        "leave_balances": _leave_balances(employee_id),
+        "attendance": attendance,
+        "chart": chart,
+    }
+
+
+# ============================================================
+# CACHED ACCESSOR
+# ============================================================
+
+def employee_summary(employee_id, as_of=None):
+    """
+    Leave balances plus month-to-date attendance counts and chart series
+    for the self-service dashboard. Cached per employee for the day.
+    """
+    as_of = as_of or date.today()
+    return _summary_cache.get_or_set(
+        (employee_id, as_of), lambda: _build_summary(employee_id, as_of)
+    )
+
+
+def invalidate_employee_summary(employee_ids=None):
+    """Drop cached summaries, or only those of the given employees."""
+    if employee_ids is None:
+        _summary_cache.invalidate()
+        return
+    employee_ids = set(employee_ids)
+    _summary_cache.invalidate(lambda key: key[0] in employee_ids)
+
+
+def invalidate_employee_summary_on_commit(employee_ids, session=None):
+    """Drop these employees' summaries once the session commits (for Core bulk writes)."""
+    session = session or db.session
+    session.info.setdefault(PENDING_KEY, set()).update(i for i in employee_ids if i is not None)
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+def _employee_written(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.employee_id is not None:
+        session.info.setdefault(PENDING_KEY, set()).add(target.employee_id)
+
+
+def _invalidate_on_commit(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        invalidate_employee_summary(pending)
+
+
+def _discard_pending(session, *args):
+    session.info.pop(PENDING_KEY, None)
+
+
+def register_employee_summary():
+    """Drop an employee's cached summary when their attendance, leaves or credits change."""
+    if not event.contains(Session, "after_commit", _invalidate_on_commit):
+        for model in (Attendance, Leave, LeaveCredit):
+            for fn_event in ("after_insert", "after_update", "after_delete"):
+                event.listen(model, fn_event, _employee_written)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_pending)
@@ -0,0 +1,181 @@
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Department, Employee
+from main_app.models.user import User
+
+
+IDENTITY_TTL = 60
+
+# Set in session.info when a flush touches users, employees or departments
+DIRTY_KEY = "identity_dirty"
+
+_identity_cache = TTLCache(ttl=IDENTITY_TTL, maxsize=1024)
+
+
+# ============================================================
+# IDENTITY
+# ============================================================
+
+class Identity:
+    """Who is making the request: user, linked employee, department and role."""
+
+    __slots__ = (
+        "user_id", "email", "role", "full_name",
+        "employee_id", "department_id", "department_name"
+    )
+
+    def __init__(self, user):
+        employee = user.employee_profile
+        department = (employee.department if employee else None) or user.department
+
+        self.user_id = user.id
+        self.email = user.email
+        self.role = user.role or ""
+        self.full_name = user.get_full_name()
+        self.employee_id = employee.id if employee else None
+        self.department_id = department.id if department else None
+        self.department_name = department.name if department else None
+
+    def has_role(self, *roles):
+        return self.role in roles
+
+
+def current_identity():
+    """Identity of the logged-in user for this request (None if anonymous)."""
+    if not has_request_context() or not current_user.is_authenticated:
+        return None
+    if "identity" not in g:
+        g.identity = Identity(current_user)
+    return g.identity
+
+
+def current_employee():
+    """
+    The Employee linked to the logged-in user, falling back to a match on
+    email like the older portal lookups. Resolved once per request.
+    """
+    if not has_request_context() or not current_user.is_authenticated:
+        return None
+    if "current_employee" not in g:
+        employee = current_user.employee_profile
+        if employee is None:
+            employee = Employee.query.filter_by(email=current_user.email).first()
+        g.current_employee = employee
+    return g.current_employee
+
+
+# ============================================================
+# USER LOADING (one joined query, cached across requests)
+# ============================================================
+
+def _snapshot(obj):
+    if obj is None:
+        return None
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def _restore(session, model, values):
+    """Attach a cached row to the session as a clean persistent object."""
+    if values is None:
+        return None
+
+    key = session.identity_key(model, values["id"])
+    existing = session.identity_map.get(key)
+    if existing is not None:
+        return existing
+
+    obj = inspect(model).class_manager.new_instance()
+    for name, value in values.items():
+        set_committed_value(obj, name, value)
+    make_transient_to_detached(obj)
+    session.add(obj)
+    return obj
+
+
+def _restore_user(snapshot):
+    session = db.session
+    user = _restore(session, User, snapshot["user"])
+    employee = _restore(session, Employee, snapshot["employee"])
+    employee_department = _restore(session, Department, snapshot["employee_department"])
+    user_department = _restore(session, Department, snapshot["user_department"])
+
+    set_committed_value(user, "employee_profile", employee)
+    set_committed_value(user, "department", user_department)
+    if employee is not None:
+        set_committed_value(employee, "user", user)
+        set_committed_value(employee, "department", employee_department)
+    return user
+
+
+def load_identity_user(user_id):
+    """
+    User for Flask-Login with its employee profile and departments. A
+    cache hit rebuilds them without touching the database; a miss loads
+    all of them in one joined query.
+    """
+    snapshot = _identity_cache.get(user_id)
+    if snapshot is not None:
+        return _restore_user(snapshot)
+
+    user = db.session.execute(
+        select(User)
+        .options(
+            joinedload(User.employee_profile).joinedload(Employee.department),
+            joinedload(User.department)
+        )
+        .where(User.id == user_id)
+    ).unique().scalar_one_or_none()
+
+    if user is not None:
+        employee = user.employee_profile
+        _identity_cache.set(user_id, {
+            "user": _snapshot(user),
+            "employee": _snapshot(employee),
+            "employee_department": _snapshot(employee.department if employee else None),
+            "user_department": _snapshot(user.department)
+        })
+    return user
+
+
+def invalidate_identity(user_id=None):
+    if user_id is None:
+        _identity_cache.invalidate()
+    else:
+        _identity_cache.invalidate(lambda key: key == user_id)
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+_WATCHED = (User, Employee, Department)
+
+
+def _mark_dirty(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _WATCHED):
+            session.info[DIRTY_KEY] = True
+            return
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop(DIRTY_KEY, False):
+        invalidate_identity()
+
+
+def _discard_dirty(session, *args):
+    session.info.pop(DIRTY_KEY, None)
+
+
+def register_identity_cache():
+    """Drop cached identities whenever a commit changed a profile or role."""
+    if not event.contains(Session, "after_commit", _invalidate_on_commit):
+        event.listen(Session, "before_flush", _mark_dirty)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_dirty)
@@ -0,0 +1,72 @@
+from datetime import date
+
+from main_app.services.jobs import job_handler
+
+
+# ============================================================
+# PAYROLL
+# ============================================================
+
+@job_handler("run_payroll")
+def run_payroll_job(ctx, period_id):
+    from main_app.services.payroll_engine import run_period_payroll
+
+    ctx.progress(5, "Computing payroll...")
+    stats = run_period_payroll(period_id)
+    return (
+        f"Payroll generated for {stats['created']} employees "
+        f"({stats['skipped']} skipped) in {stats['seconds']}s."
+    )
+
+
+@job_handler("generate_payslips")
+def generate_payslips_job(ctx, period_id):
+    from main_app.services.payslip_pipeline import generate_period_payslips
+
+    ctx.progress(5, "Generating payslips...")
+    stats = generate_period_payslips(period_id)
+    if not stats["payrolls"]:
+        return "No payrolls found for this pay period."
+    return f"{stats['created']} payslips successfully generated for the selected period."
+
+
+@job_handler("render_payslips")
+def render_payslips_job(ctx, period_id):
+    from main_app.services.payslip_pdf import render_period_payslips
+
+    ctx.progress(5, "Rendering payslip PDFs...")
+    stats = render_period_payslips(period_id)
+    return (
+        f"{stats['rendered']} payslip PDFs rendered "
+        f"({stats['cached']} already cached) in {stats['seconds']}s."
+    )
+
+
+# ============================================================
+# ATTENDANCE
+# ============================================================
+
+@job_handler("attendance_import")
+def attendance_import_job(ctx, import_id):
+    from main_app.services.attendance_import import commit_attendance_import
+
+    ctx.progress(5, "Importing attendance...")
+    stats = commit_attendance_import(import_id)
+    return f"Successfully imported {stats['inserted']} attendance record(s)."
+
+
+@job_handler("attendance_report_word")
+def attendance_report_word_job(ctx, start_date, end_date, department_id=None):
+    from main_app.services.attendance_stats import build_attendance_report_docx
+
+    start_date = date.fromisoformat(start_date)
+    end_date = date.fromisoformat(end_date)
+
+    ctx.progress(10, "Building attendance report...")
+    data = build_attendance_report_docx(start_date, end_date, department_id)
+    ctx.set_result(
+        data,
+        f"Attendance_Report_{start_date}_{end_date}.docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
+    return "Attendance report is ready."
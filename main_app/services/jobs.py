@@ -0,0 +1,235 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, update
+
+from main_app.extensions import db
+from main_app.models.job_models import BackgroundJob
+
+
+DEFAULT_WORKERS = 2
+
+# Worker processes touch their queued/running jobs this often; a job whose
+# owner has been silent for STALE_AFTER_SECONDS belongs to a dead process.
+HEARTBEAT_SECONDS = 30
+STALE_AFTER_SECONDS = 300
+
+_handlers = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# ============================================================
+# HANDLER REGISTRY
+# ============================================================
+
+def job_handler(kind):
+    """Register fn(ctx, **params) as the handler for a job kind."""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def _get_handler(kind):
+    if kind not in _handlers:
+        # Handlers register themselves on import
+        import main_app.services.job_handlers  # noqa: F401
+    return _handlers[kind]
+
+
+# ============================================================
+# JOB CONTEXT (passed to handlers)
+# ============================================================
+
+class JobContext:
+    """Lets a running handler report progress and store its output."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def _update(self, **values):
+        values.setdefault("heartbeat_at", datetime.utcnow())
+        db.session.execute(
+            update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(**values)
+        )
+        db.session.commit()
+
+    def progress(self, percent, message=None):
+        values = {"progress": max(0, min(100, int(percent)))}
+        if message is not None:
+            values["message"] = message[:255]
+        self._update(**values)
+
+    def set_result(self, data, filename, mimetype="application/octet-stream"):
+        self._update(result=data, result_name=filename, result_mimetype=mimetype)
+
+    def set_redirect(self, url):
+        self._update(redirect_url=url)
+
+
+# ============================================================
+# OWNERSHIP & HEARTBEAT
+# ============================================================
+
+def job_owner():
+    """host:pid of the current process (read per call: workers may be forked)."""
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+def touch_jobs():
+    """Refresh the heartbeat of this process's queued/running jobs."""
+    db.session.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.owner == job_owner(), BackgroundJob.status.in_(("queued", "running")))
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def fail_interrupted_jobs(stale_after=STALE_AFTER_SECONDS):
+    """
+    Fail queued/running jobs whose owning process stopped sending
+    heartbeats (it crashed or was restarted); they will never finish.
+    Jobs owned by this process are never touched.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    result = db.session.execute(
+        update(BackgroundJob)
+        .where(
+            BackgroundJob.status.in_(("queued", "running")),
+            func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.created_at) < cutoff,
+            or_(BackgroundJob.owner.is_(None), BackgroundJob.owner != job_owner())
+        )
+        .values(
+            status="failed",
+            message="Interrupted by a server restart.",
+            finished_at=datetime.utcnow()
+        )
+    )
+    db.session.commit()
+    return result.rowcount or 0
+
+
+def _heartbeat_loop(app):
+    # Runs in its own thread and session, starting when this process
+    # starts its worker pool
+    while True:
+        with app.app_context():
+            try:
+                touch_jobs()
+                fail_interrupted_jobs()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Background job heartbeat failed: {e}")
+            finally:
+                db.session.remove()
+        time.sleep(HEARTBEAT_SECONDS)
+
+
+# ============================================================
+# EXECUTION
+# ============================================================
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("JOB_WORKERS") or DEFAULT_WORKERS,
+                    thread_name_prefix="job"
+                )
+                threading.Thread(
+                    target=_heartbeat_loop, args=(app,), name="job-heartbeat", daemon=True
+                ).start()
+    return _executor
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        ctx = JobContext(job_id)
+        try:
+            job = db.session.get(BackgroundJob, job_id)
+            if job is None:
+                return
+            handler = _get_handler(job.kind)
+            params = job.get_params()
+
+            job.status = "running"
+            job.owner = job_owner()
+            job.started_at = job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+
+            message = handler(ctx, **params)
+
+            ctx._update(
+                status="finished",
+                progress=100,
+                message=(message or "Done.")[:255],
+                finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f"Background job {job_id} failed: {e}")
+            traceback.print_exc()
+            ctx._update(
+                status="failed",
+                message="The job failed. Please try again.",
+                error=str(e),
+                finished_at=datetime.utcnow()
+            )
+        finally:
+            db.session.remove()
+
+
+def enqueue_job(kind, params=None, user_id=None, redirect_url=None):
+    """
+    Store a job and hand it to the worker pool; returns the job id
+    immediately. With JOBS_SYNCHRONOUS set the job runs inline (tests).
+    """
+    app = current_app._get_current_object()
+    _get_handler(kind)
+
+    job = BackgroundJob(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        status="queued",
+        progress=0,
+        message="Waiting to start...",
+        params=json.dumps(params or {}, default=str),
+        redirect_url=redirect_url,
+        created_by=user_id,
+        owner=job_owner(),
+        heartbeat_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+
+    if app.config.get("JOBS_SYNCHRONOUS"):
+        _run_job(app, job_id)
+    else:
+        _get_executor(app).submit(_run_job, app, job_id)
+
+    return job_id
+
+
+def purge_old_jobs(days=7):
+    """Delete finished/failed jobs (and their result blobs) older than days."""
+    result = db.session.execute(
+        delete(BackgroundJob).where(
+            BackgroundJob.status.in_(("finished", "failed")),
+            BackgroundJob.created_at < datetime.utcnow() - timedelta(days=days)
+        )
+    )
+    db.session.commit()
+    return result.rowcount or 0
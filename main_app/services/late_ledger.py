@@ -0,0 +1,195 @@
+from datetime import date as date_cls
+
+import numpy as np
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+from main_app.extensions import db
+from main_app.models.hr_models import (
+    Attendance, LateComputation, compute_late_day_equivalent
+)
+from main_app.services.late_matrix import invalidate_late_matrix
+from main_app.services.work_calendar import row_schedules
+from main_app.services.working_hours import DEFAULT_SCHEDULE, compute_working_hours, time_seconds
+
+
+# Attendance ids touched in the current unit of work, kept in session.info
+PENDING_KEY = "late_ledger_pending"
+SYNC_CHUNK_SIZE = 500
+
+
+# ============================================================
+# BATCH LATE COMPUTATION
+# ============================================================
+
+def compute_late_batch(time_ins, schedules=None):
+    """
+    (late_hours, late_minutes, day_equivalent) for each time-in, or None
+    when on time. Same rule as extract_late_from_attendance(); schedules
+    is one WorkSchedule per row (default: 8:00 AM for all).
+    """
+    tin = time_seconds(time_ins)
+    punches = compute_working_hours(tin, np.full(len(tin), np.nan), schedule=schedules or DEFAULT_SCHEDULE)
+    late, late_minutes = punches["late"], punches["late_minutes"]
+
+    results = []
+    for is_late, total in zip(late.tolist(), late_minutes.tolist()):
+        if not is_late:
+            results.append(None)
+            continue
+        hours, minutes = divmod(int(total), 60)
+        results.append((hours, minutes, compute_late_day_equivalent(0, hours, minutes)))
+    return results
+
+
+def _upsert_statement(dialect_name):
+    table = LateComputation.__table__
+
+    if dialect_name in ("sqlite", "postgresql"):
+        if dialect_name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.attendance_id],
+            set_=dict(
+                employee_id=stmt.excluded.employee_id,
+                date=stmt.excluded.date,
+                late_hours=stmt.excluded.late_hours,
+                late_minutes=stmt.excluded.late_minutes,
+                day_equivalent=stmt.excluded.day_equivalent,
+                remarks="Updated from attendance"
+            )
+        )
+
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        return stmt.on_duplicate_key_update(
+            employee_id=stmt.inserted.employee_id,
+            date=stmt.inserted.date,
+            late_hours=stmt.inserted.late_hours,
+            late_minutes=stmt.inserted.late_minutes,
+            day_equivalent=stmt.inserted.day_equivalent,
+            remarks="Updated from attendance"
+        )
+
+    return None
+
+
+# ============================================================
+# LEDGER SYNC
+# ============================================================
+
+def sync_late_computations(attendance_ids, session=None):
+    """
+    Bring late_computation in line with the given attendance rows:
+    late rows are upserted in one statement per chunk, rows that are no
+    longer late lose their ledger entry. Does not commit.
+    """
+    session = session or db.session
+    ids = sorted({i for i in attendance_ids if i is not None})
+    dialect_name = session.get_bind().dialect.name
+    upsert = _upsert_statement(dialect_name)
+    stats = {"attendance": 0, "late": 0, "cleared": 0}
+
+    for start in range(0, len(ids), SYNC_CHUNK_SIZE):
+        chunk = ids[start:start + SYNC_CHUNK_SIZE]
+        rows = session.execute(
+            select(Attendance.id, Attendance.employee_id, Attendance.date, Attendance.time_in)
+            .where(Attendance.id.in_(chunk))
+        ).all()
+
+        late = compute_late_batch(
+            [r.time_in for r in rows], row_schedules([r.employee_id for r in rows], session)
+        )
+        payload = [
+            dict(
+                employee_id=r.employee_id,
+                attendance_id=r.id,
+                date=r.date,
+                late_days=0,
+                late_hours=item[0],
+                late_minutes=item[1],
+                day_equivalent=item[2],
+                remarks="Auto-generated from attendance"
+            )
+            for r, item in zip(rows, late) if item is not None
+        ]
+        on_time = [r.id for r, item in zip(rows, late) if item is None]
+
+        if payload:
+            if upsert is not None:
+                session.execute(upsert, payload)
+            else:
+                session.execute(
+                    delete(LateComputation)
+                    .where(LateComputation.attendance_id.in_([p["attendance_id"] for p in payload]))
+                )
+                session.execute(insert(LateComputation), payload)
+
+        if on_time:
+            result = session.execute(
+                delete(LateComputation)
+                .where(LateComputation.attendance_id.in_(on_time))
+                .execution_options(synchronize_session=False)
+            )
+            stats["cleared"] += result.rowcount or 0
+
+        stats["attendance"] += len(rows)
+        stats["late"] += len(payload)
+
+    return stats
+
+
+def rebuild_late_ledger(start_date=None, end_date=None):
+    """Recompute every LateComputation row for attendance in a date range."""
+    start_date = start_date or date_cls.min
+    end_date = end_date or date_cls.max
+
+    ids = db.session.scalars(
+        select(Attendance.id).where(Attendance.date.between(start_date, end_date))
+    ).all()
+    stats = sync_late_computations(ids)
+
+    # Ledger rows whose attendance no longer exists
+    orphaned = db.session.execute(
+        delete(LateComputation)
+        .where(
+            LateComputation.date.between(start_date, end_date),
+            ~LateComputation.attendance_id.in_(select(Attendance.id))
+        )
+        .execution_options(synchronize_session=False)
+    )
+    stats["cleared"] += orphaned.rowcount or 0
+
+    db.session.commit()
+    invalidate_late_matrix()
+    return stats
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+def _flush_late_ledger(session):
+    # before_commit fires ahead of commit's own flush; flush first so the
+    # attendance listeners have recorded every touched id
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        sync_late_computations(pending, session=session)
+
+
+def _discard_pending(session, *args):
+    session.info.pop(PENDING_KEY, None)
+
+
+def register_late_ledger():
+    """Attach the commit-time ledger sync to every ORM session."""
+    if not event.contains(Session, "before_commit", _flush_late_ledger):
+        event.listen(Session, "before_commit", _flush_late_ledger)
+        event.listen(Session, "after_rollback", _discard_pending)
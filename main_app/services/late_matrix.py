@@ -0,0 +1,138 @@
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Attendance, Employee, LateComputation
+from main_app.services.work_calendar import row_schedules
+from main_app.services.working_hours import compute_working_hours
+
+
+MATRIX_TTL = 300
+
+_matrix_cache = TTLCache(ttl=MATRIX_TTL, maxsize=64)
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def _load_month(start, end, department_id=None):
+    """Attendance for the month with any late ledger entry, in one query."""
+    stmt = (
+        select(
+            Attendance.employee_id,
+            Attendance.date,
+            Attendance.time_in,
+            Attendance.time_out,
+            Attendance.status,
+            LateComputation.late_hours,
+            LateComputation.late_minutes
+        )
+        .join(Employee, Employee.id == Attendance.employee_id)
+        .outerjoin(LateComputation, LateComputation.attendance_id == Attendance.id)
+        .where(Attendance.date.between(start, end))
+    )
+    if department_id:
+        stmt = stmt.where(Employee.department_id == department_id)
+
+    return pd.DataFrame(
+        db.session.execute(stmt).all(),
+        columns=["employee_id", "date", "time_in", "time_out", "status", "ledger_hours", "ledger_minutes"]
+    )
+
+
+def _fmt(t):
+    return t.strftime("%H:%M") if t is not None and not pd.isna(t) else "-"
+
+
+# ============================================================
+# MATRIX
+# ============================================================
+
+def compute_late_matrix(year, month, department_id=None):
+    """
+    Employee x day late/undertime minutes for a month.
+
+    Late minutes come from the late ledger when present, otherwise from
+    time-in against the employee's shift start (08:00 by default).
+    Undertime is time-out before the shift end on days that are not Absent. Returns plain data safe to cache:
+    {"days_in_month": n, "rows": {employee_id: {...}}}.
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    start = date(year, month, 1)
+    end = date(year, month, days_in_month)
+
+    df = _load_month(start, end, department_id)
+    if df.empty:
+        return {"days_in_month": days_in_month, "rows": {}}
+
+    # Same schedule as Attendance.calculate_working_hours()
+    absent = (df["status"] == "Absent").to_numpy()
+    schedules = row_schedules(df["employee_id"].tolist())
+    punches = compute_working_hours(df["time_in"].tolist(), df["time_out"].tolist(), absent, schedules)
+
+    computed_late = punches["late_minutes"]
+    has_ledger = df["ledger_hours"].notna().to_numpy()
+    ledger_late = (
+        df["ledger_hours"].fillna(0).to_numpy(dtype=float) * 60
+        + df["ledger_minutes"].fillna(0).to_numpy(dtype=float)
+    )
+    late = np.where(has_ledger, ledger_late, np.nan_to_num(computed_late))
+
+    undertime = punches["undertime_minutes"]
+
+    df["day"] = [d.day for d in df["date"]]
+    df["late"] = np.nan_to_num(late).astype(int)
+    df["undertime"] = np.nan_to_num(undertime).astype(int)
+
+    # -----------------------------------------------------
+    # Pivot to employee x day and total along the rows
+    # -----------------------------------------------------
+    columns = range(1, days_in_month + 1)
+    late_grid = df.pivot_table(index="employee_id", columns="day", values="late", aggfunc="sum", fill_value=0)
+    late_grid = late_grid.reindex(columns=columns, fill_value=0)
+    under_grid = df.pivot_table(index="employee_id", columns="day", values="undertime", aggfunc="sum", fill_value=0)
+    under_grid = under_grid.reindex(index=late_grid.index, columns=columns, fill_value=0)
+
+    late_values = late_grid.to_numpy()
+    under_values = under_grid.to_numpy()
+
+    rows = {}
+    for i, emp_id in enumerate(late_grid.index.tolist()):
+        rows[emp_id] = {
+            "total_late_minutes": int(late_values[i].sum()),
+            "total_undertime_minutes": int(under_values[i].sum()),
+            "days_late": int((late_values[i] > 0).sum()),
+            "days_undertime": int((under_values[i] > 0).sum()),
+            "days": {},
+        }
+
+    for r in df.itertuples(index=False):
+        rows[r.employee_id]["days"][r.day] = {
+            "time_in": _fmt(r.time_in),
+            "late": r.late or "-",
+            "time_out": _fmt(r.time_out),
+            "undertime": r.undertime or "-",
+        }
+
+    return {"days_in_month": days_in_month, "rows": rows}
+
+
+def get_late_matrix(year, month, department_id=None):
+    """compute_late_matrix() cached per (year, month, department)."""
+    key = (year, month, department_id or None)
+    return _matrix_cache.get_or_set(key, lambda: compute_late_matrix(year, month, department_id))
+
+
+def invalidate_late_matrix(days=None):
+    """Drop cached matrices, or only the months containing the given dates."""
+    if days is None:
+        _matrix_cache.invalidate()
+        return
+    months = {(d.year, d.month) for d in days}
+    _matrix_cache.invalidate(lambda key: (key[0], key[1]) in months)
@@ -0,0 +1,139 @@
+from datetime import date
+
+import numpy as np
+from sqlalchemy import and_, exists, func, insert, select, update
+
+from main_app.extensions import db
+from main_app.helpers.functions import MONTHLY_SL, MONTHLY_VL
+from main_app.models.hr_models import Employee, LeaveAccrual, LeaveCredit, LeaveType
+from main_app.services.employee_summary import invalidate_employee_summary
+
+
+ACCRUAL_CHUNK_SIZE = 500
+
+# Leave types credited each month, matched on name; the ids are the ones
+# the employee forms assign when no matching type exists.
+ACCRUAL_TYPES = {
+    "vl": ("%vacation%", 1),
+    "sl": ("%sick%", 2),
+}
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def accrual_leave_types():
+    """{"vl": leave_type_id, "sl": leave_type_id} resolved by name."""
+    resolved = {}
+    for key, (pattern, fallback_id) in ACCRUAL_TYPES.items():
+        type_id = db.session.scalar(
+            select(LeaveType.id)
+            .where(func.lower(LeaveType.name).like(pattern))
+            .order_by(LeaveType.id)
+            .limit(1)
+        )
+        resolved[key] = type_id or fallback_id
+    return resolved
+
+
+def service_months(hired_dates, as_of):
+    """
+    Whole calendar months between each hire date and as_of, for all of
+    them at once (same rule as the old per-employee computation).
+    """
+    hired = np.array(hired_dates, dtype="datetime64[D]").astype("datetime64[M]")
+    return (np.datetime64(as_of, "M") - hired).astype(np.int64)
+
+
+# ============================================================
+# MONTHLY ACCRUAL RUN
+# ============================================================
+
+def run_leave_accrual(as_of=None, employee_ids=None):
+    """
+    Set VL/SL total credits from service months for every active employee
+    (or only employee_ids) not yet accrued for as_of's month, and record
+    one leave_accrual row each. Re-running the same month is a no-op.
+    """
+    as_of = as_of or date.today()
+    period = as_of.replace(day=1)
+
+    already_accrued = exists().where(and_(
+        LeaveAccrual.employee_id == Employee.id,
+        LeaveAccrual.period == period
+    ))
+    stmt = (
+        select(Employee.id, Employee.date_hired)
+        .where(Employee.date_hired.isnot(None), ~already_accrued)
+        .order_by(Employee.id)
+    )
+    if employee_ids is not None:
+        stmt = stmt.where(Employee.id.in_(employee_ids))
+    else:
+        stmt = stmt.where(Employee.status == "Active", Employee.archived == False)
+
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return {"period": period, "employees": 0, "credited": 0}
+
+    ids = np.array([r.id for r in rows], dtype=np.int64)
+    months = service_months([r.date_hired for r in rows], as_of)
+    months = np.maximum(months, 0)
+    vl_totals = np.round(months * MONTHLY_VL, 3)
+    sl_totals = np.round(months * MONTHLY_SL, 3)
+
+    types = accrual_leave_types()
+    credited = 0
+
+    for start in range(0, len(ids), ACCRUAL_CHUNK_SIZE):
+        chunk = slice(start, start + ACCRUAL_CHUNK_SIZE)
+        entries = list(zip(
+            ids[chunk].tolist(), months[chunk].tolist(),
+            vl_totals[chunk].tolist(), sl_totals[chunk].tolist()
+        ))
+        chunk_ids = [entry[0] for entry in entries]
+
+        # Nothing earned yet: ledger entry only, like the old early return
+        totals = {}
+        for emp_id, m, vl, sl in entries:
+            if m > 0:
+                totals[(emp_id, types["vl"])] = vl
+                totals[(emp_id, types["sl"])] = sl
+
+        existing = {
+            (emp_id, type_id): credit_id
+            for credit_id, emp_id, type_id in db.session.execute(
+                select(LeaveCredit.id, LeaveCredit.employee_id, LeaveCredit.leave_type_id)
+                .where(
+                    LeaveCredit.employee_id.in_(chunk_ids),
+                    LeaveCredit.leave_type_id.in_(list(types.values()))
+                )
+            )
+        }
+
+        updates = [
+            {"id": existing[key], "total_credits": total}
+            for key, total in totals.items() if key in existing
+        ]
+        inserts = [
+            {"employee_id": key[0], "leave_type_id": key[1], "total_credits": total, "used_credits": 0}
+            for key, total in totals.items() if key not in existing
+        ]
+        if updates:
+            db.session.execute(update(LeaveCredit), updates)
+        if inserts:
+            db.session.execute(insert(LeaveCredit), inserts)
+
+        db.session.execute(insert(LeaveAccrual), [
+            dict(employee_id=emp_id, period=period, service_months=m, vl_credits=vl, sl_credits=sl)
+            for emp_id, m, vl, sl in entries
+        ])
+        credited += sum(1 for entry in entries if entry[1] > 0)
+
+    db.session.commit()
+
+    # Bulk writes skip the ORM hooks that normally drop cached summaries
+    invalidate_employee_summary(ids.tolist())
+
+    return {"period": period, "employees": len(ids), "credited": credited}
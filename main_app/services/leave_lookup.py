@@ -0,0 +1,61 @@
+from collections import defaultdict
+
+from sqlalchemy import and_, exists, select
+
+from main_app.extensions import db
+from main_app.models.hr_models import Employee, Leave, LeaveType
+
+
+APPROVED = "Approved"
+
+
+# ============================================================
+# INTERVAL QUERIES (served by ix_leave_status_dates)
+# ============================================================
+
+def overlapping_leave_criteria(start_date, end_date=None):
+    """Approved leave intersecting [start_date, end_date]."""
+    end_date = end_date or start_date
+    return and_(
+        Leave.status == APPROVED,
+        Leave.start_date <= end_date,
+        Leave.end_date >= start_date
+    )
+
+
+def on_leave_clause(start_date, end_date=None, employee_column=Employee.id):
+    """Correlated EXISTS for filtering employees that are on leave."""
+    return exists().where(
+        Leave.employee_id == employee_column,
+        overlapping_leave_criteria(start_date, end_date)
+    )
+
+
+def approved_leave_map(start_date, end_date=None, employee_ids=None):
+    """
+    {employee_id: [leave, ...]} for every approved leave overlapping the
+    date or window, from one query. Each leave row carries id,
+    leave_type, start_date and end_date.
+    """
+    stmt = (
+        select(
+            Leave.employee_id,
+            Leave.id,
+            LeaveType.name.label("leave_type"),
+            Leave.start_date,
+            Leave.end_date
+        )
+        .outerjoin(LeaveType, LeaveType.id == Leave.leave_type_id)
+        .where(overlapping_leave_criteria(start_date, end_date))
+        .order_by(Leave.employee_id, Leave.start_date)
+    )
+    if employee_ids is not None:
+        ids = list(employee_ids)
+        if not ids:
+            return {}
+        stmt = stmt.where(Leave.employee_id.in_(ids))
+
+    leaves = defaultdict(list)
+    for row in db.session.execute(stmt):
+        leaves[row.employee_id].append(row)
+    return dict(leaves)
@@ -0,0 +1,254 @@
+import time
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import func, insert, select
+
+from main_app.extensions import db
+from main_app.models.hr_models import Employee, Attendance
+from main_app.models.payroll_models import (
+    Payroll, PayrollPeriod, PayrollDeduction, Allowance, EmployeeAllowance,
+    EmployeeDeduction
+)
+from main_app.services.deduction_rules import get_rules_for
+from main_app.services.payroll_ledger import refresh_payroll_ledger
+from main_app.services.payroll_stats import invalidate_payroll_stats
+
+
+STANDARD_MONTHLY_HOURS = 160
+INSERT_CHUNK_SIZE = 500
+
+
+# ============================================================
+# PERIOD PAYROLL ENGINE
+# ============================================================
+
+class _PhaseTimer:
+    """Collects wall time and row counts for each engine phase."""
+
+    def __init__(self):
+        self.phases = []
+
+    def run(self, name, fn):
+        started = time.perf_counter()
+        result = fn()
+        self.phases.append({
+            "phase": name,
+            "seconds": round(time.perf_counter() - started, 4),
+            "rows": len(result) if hasattr(result, "__len__") else result,
+        })
+        return result
+
+
+def _load_employees(period):
+    """Active employees that have no payroll yet for this period."""
+    already_paid = (
+        select(Payroll.id)
+        .where(
+            Payroll.employee_id == Employee.id,
+            Payroll.payroll_period_id == period.id
+        )
+        .exists()
+    )
+
+    return db.session.execute(
+        select(Employee.id, Employee.salary)
+        .where(
+            Employee.status == "Active",
+            Employee.archived.is_not(True),
+            ~already_paid
+        )
+        .order_by(Employee.id)
+    ).all()
+
+
+def _load_hours(period):
+    """Total attendance hours per employee inside the period, one grouped query."""
+    rows = db.session.execute(
+        select(Attendance.employee_id, func.coalesce(func.sum(Attendance.working_hours), 0))
+        .where(Attendance.date.between(period.start_date, period.end_date))
+        .group_by(Attendance.employee_id)
+    ).all()
+    return {employee_id: float(hours or 0) for employee_id, hours in rows}
+
+
+def _load_allowances():
+    """Amount and salary limits for every active allowance link, one query."""
+    return db.session.execute(
+        select(
+            EmployeeAllowance.employee_id,
+            Allowance.amount,
+            Allowance.min_salary,
+            Allowance.max_salary
+        )
+        .join(Allowance, Allowance.id == EmployeeAllowance.allowance_id)
+        .where(Allowance.active.is_(True))
+    ).all()
+
+
+def _load_deductions():
+    """Active employee deduction links, one query."""
+    return db.session.execute(
+        select(
+            EmployeeDeduction.employee_id,
+            EmployeeDeduction.deduction_id,
+            EmployeeDeduction.override_amount
+        )
+        .where(EmployeeDeduction.active.is_(True))
+        .order_by(EmployeeDeduction.id)
+    ).all()
+
+
+def run_period_payroll(period_id, skip_without_attendance=True):
+    """
+    Generate Payroll and PayrollDeduction rows for every active employee of a
+    period using a fixed number of queries and bulk inserts.
+
+    Returns a stats dict with created/skipped counts and per-phase timings.
+    """
+    timer = _PhaseTimer()
+    started = time.perf_counter()
+
+    period = PayrollPeriod.query.get(period_id)
+    if period is None:
+        raise ValueError(f"Payroll period {period_id} not found.")
+
+    employees = timer.run("load_employees", lambda: _load_employees(period))
+    hours_by_emp = timer.run("load_attendance", lambda: _load_hours(period))
+    allowance_rows = timer.run("load_allowances", _load_allowances)
+    emp_deductions = timer.run("load_deductions", _load_deductions)
+
+    # -----------------------------------------------------
+    # COMPUTE (vectorised over the whole period)
+    # -----------------------------------------------------
+    breakdown = defaultdict(list)
+
+    def compute():
+        if skip_without_attendance:
+            rows = [e for e in employees if hours_by_emp.get(e.id, 0) > 0]
+        else:
+            rows = list(employees)
+        if not rows:
+            return []
+
+        ids = np.array([r.id for r in rows], dtype=np.int64)
+        salary = np.array([r.salary or 0 for r in rows], dtype=float)
+        hours = np.array([hours_by_emp.get(r.id, 0.0) for r in rows], dtype=float)
+        index = {emp_id: i for i, emp_id in enumerate(ids.tolist())}
+
+        allowance = np.zeros(len(rows))
+        for emp_id, amount, min_salary, max_salary in allowance_rows:
+            i = index.get(emp_id)
+            if i is None:
+                continue
+            if salary[i] >= (min_salary or 0) and (max_salary is None or salary[i] <= max_salary):
+                allowance[i] += amount or 0
+
+        gross = np.round(salary / STANDARD_MONTHLY_HOURS * hours + allowance, 2)
+
+        total_ded = np.zeros(len(rows))
+        links = [ed for ed in emp_deductions if ed.employee_id in index]
+        rules = get_rules_for({ed.deduction_id for ed in links})
+
+        by_deduction = defaultdict(list)
+        for ed in links:
+            by_deduction[ed.deduction_id].append(ed)
+
+        for deduction_id, group in by_deduction.items():
+            rule = rules.get(deduction_id)
+            pos = np.array([index[ed.employee_id] for ed in group], dtype=np.int64)
+            override = np.array(
+                [np.nan if ed.override_amount is None else ed.override_amount for ed in group],
+                dtype=float
+            )
+            has_override = ~np.isnan(override)
+
+            if rule is not None:
+                shares = rule.compute(salary[pos])
+            else:
+                shares = dict(employee_share=np.zeros(len(group)),
+                              employer_share=np.zeros(len(group)),
+                              ec=np.zeros(len(group)))
+
+            employee_share = np.where(has_override, override, shares["employee_share"])
+            employer_share = np.where(has_override, 0.0, shares["employer_share"])
+            ec = np.where(has_override, 0.0, shares["ec"])
+            np.add.at(total_ded, pos, employee_share)
+
+            name = rule.name if rule is not None else ""
+            for k, ed in enumerate(group):
+                breakdown[ed.employee_id].append(dict(
+                    deduction_name=name,
+                    employee_share=float(employee_share[k]),
+                    employer_share=float(employer_share[k]),
+                    ec=float(ec[k])
+                ))
+
+        total_ded = np.round(total_ded, 2)
+        net = np.round(gross - total_ded, 2)
+
+        payrolls = [
+            dict(
+                employee_id=int(ids[i]),
+                payroll_period_id=period.id,
+                basic_salary=float(salary[i]),
+                working_hours=float(hours[i]),
+                overtime_hours=0,
+                holiday_pay=0,
+                night_diff=0,
+                gross_pay=float(gross[i]),
+                total_deductions=float(total_ded[i]),
+                net_pay=float(net[i]),
+                status="Draft"
+            )
+            for i in range(len(rows))
+        ]
+        return payrolls
+
+    payroll_rows = timer.run("compute", compute)
+
+    # -----------------------------------------------------
+    # WRITE (single transaction, chunked bulk inserts)
+    # -----------------------------------------------------
+    def write_payrolls():
+        payroll_ids = {}
+        for start in range(0, len(payroll_rows), INSERT_CHUNK_SIZE):
+            chunk = payroll_rows[start:start + INSERT_CHUNK_SIZE]
+            result = db.session.execute(
+                insert(Payroll).returning(Payroll.id, Payroll.employee_id),
+                chunk
+            )
+            payroll_ids.update({emp_id: pid for pid, emp_id in result})
+        return payroll_ids
+
+    def write_deductions():
+        rows = [
+            dict(payroll_id=payroll_ids[emp_id], **item)
+            for emp_id, items in breakdown.items()
+            if emp_id in payroll_ids
+            for item in items
+        ]
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            db.session.execute(insert(PayrollDeduction), rows[start:start + INSERT_CHUNK_SIZE])
+        return rows
+
+    try:
+        payroll_ids = timer.run("insert_payrolls", write_payrolls)
+        timer.run("insert_deductions", write_deductions)
+        timer.run("refresh_ledger", lambda: refresh_payroll_ledger(payroll_ids)["rows"])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Bulk inserts bypass the ORM flush hooks (the ledger is refreshed above)
+    invalidate_payroll_stats()
+
+    return {
+        "period_id": period.id,
+        "employees": len(employees),
+        "created": len(payroll_ids),
+        "skipped": len(employees) - len(payroll_ids),
+        "seconds": round(time.perf_counter() - started, 4),
+        "phases": timer.phases,
+    }
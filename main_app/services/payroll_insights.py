@@ -0,0 +1,208 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+
+from main_app.helpers.cache import TTLCache
+from main_app.services.payroll_stats import (
+    department_payroll_totals, payroll_status_counts, total_employees
+)
+
+
+DEFAULT_BACKEND = "g4f"
+DEFAULT_MODEL = "gpt-4.1"
+DEFAULT_TIMEOUT = 20
+
+REPORT_TTL = 6 * 3600
+FAILURE_TTL = 60
+
+PENDING_MESSAGE = "Payroll insights are still being generated. Refresh in a moment."
+FAILED_MESSAGE = "Payroll insights are unavailable right now. Please try again later."
+
+FEATURES = """
+    Features to consider in insights:
+    - Dashboard: overview and quick insights
+    - View Employee Payroll Details: search/filter by employee
+    - Add Employees Payroll: manual input for salary, deductions, allowances
+    - Payroll Period Management: cutoff periods
+    - Process Payroll: auto compute salaries
+    - View Payroll History: reference and audit past payrolls
+    - Manage Deductions & Allowances: SSS, PhilHealth, Pag-IBIG, bonuses
+    - Generate, Approve, Distribute Payslips
+    - Payroll reports: summary, leave, earnings, deduction, compliance
+    """
+
+_backends = {}
+_reports = TTLCache(ttl=REPORT_TTL, maxsize=32)
+_failures = TTLCache(ttl=FAILURE_TTL, maxsize=32)
+_pending = {}
+_pending_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="insights")
+
+
+# ============================================================
+# SUMMARY
+# ============================================================
+
+def payroll_summary():
+    """Payroll totals, status counts and per-department figures."""
+    statuses = payroll_status_counts()
+
+    return {
+        "total_employees": total_employees(),
+        "total_payrolls": sum(s["count"] for s in statuses.values()),
+        "total_net_pay": round(sum(s["net_pay"] for s in statuses.values()), 2),
+        "pending": statuses.get("Pending", {}).get("count", 0),
+        "approved": statuses.get("Approved", {}).get("count", 0),
+        "rejected": statuses.get("Rejected", {}).get("count", 0),
+        "departments": [
+            {"department": d["department"], "payrolls": d["payrolls"], "net_pay": d["net_pay"]}
+            for d in department_payroll_totals()
+        ]
+    }
+
+
+def summary_fingerprint(summary, backend="", model=""):
+    """Stable hash of the summary; the report only changes when this does."""
+    payload = json.dumps([summary, backend, model], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_prompt(summary):
+    dept_summary = ", ".join(
+        f"{d['department']}: {d['payrolls']} payrolls, ₱{d['net_pay']:,.2f} net pay"
+        for d in summary["departments"]
+    )
+
+    return f"""
+    I have payroll data with the following stats:
+    - Total employees: {summary['total_employees']}
+    - Total payroll entries: {summary['total_payrolls']}
+    - Total net pay disbursed: ₱{summary['total_net_pay']:,.2f}
+    - Pending payslips: {summary['pending']}
+    - Approved payslips: {summary['approved']}
+    - Rejected payslips: {summary['rejected']}
+    - Department summary:
+      {dept_summary}
+
+    Based on the payroll system features:
+    {FEATURES}
+
+    Generate a concise management report with:
+    1. Insights and trends on payroll efficiency
+    2. Departmental highlights
+    3. Suggestions for improvement
+    4. Key takeaways for management
+    """
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+def insights_backend(name):
+    """Register fn(prompt, summary, model) -> str as a report backend."""
+    def decorator(fn):
+        _backends[name] = fn
+        return fn
+    return decorator
+
+
+@insights_backend("g4f")
+def _g4f_report(prompt, summary, model):
+    from g4f.client import Client
+
+    client = Client()
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        web_search=False
+    )
+    return response.choices[0].message.content
+
+
+@insights_backend("stub")
+def _stub_report(prompt, summary, model):
+    """Deterministic local report (tests / offline use)."""
+    lines = [
+        "Payroll Insights",
+        f"Employees: {summary['total_employees']}",
+        f"Payroll entries: {summary['total_payrolls']}",
+        f"Total net pay: ₱{summary['total_net_pay']:,.2f}",
+        f"Pending: {summary['pending']}, Approved: {summary['approved']}, "
+        f"Rejected: {summary['rejected']}",
+    ]
+    for d in sorted(summary["departments"], key=lambda d: -d["net_pay"]):
+        lines.append(f"- {d['department']}: {d['payrolls']} payrolls, ₱{d['net_pay']:,.2f}")
+    return "\n".join(lines)
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def _finish(fingerprint, future):
+    with _pending_lock:
+        _pending.pop(fingerprint, None)
+    try:
+        _reports.set(fingerprint, future.result())
+    except Exception as e:
+        print(f"Payroll insights generation failed: {e}")
+        _failures.set(fingerprint, str(e))
+
+
+def get_payroll_insights(summary=None, timeout=None):
+    """
+    Report for the current payroll summary as a dict with status
+    "ready", "pending" or "failed". The backend call runs in a worker
+    thread; callers wait at most timeout seconds (0 = don't wait) and a
+    report is cached per summary fingerprint, so repeat views are instant.
+    """
+    config = current_app.config
+    backend = config.get("PAYROLL_INSIGHTS_BACKEND") or DEFAULT_BACKEND
+    model = config.get("PAYROLL_INSIGHTS_MODEL") or DEFAULT_MODEL
+    if timeout is None:
+        timeout = config.get("PAYROLL_INSIGHTS_TIMEOUT", DEFAULT_TIMEOUT)
+
+    summary = summary or payroll_summary()
+    fingerprint = summary_fingerprint(summary, backend, model)
+    result = {"fingerprint": fingerprint, "summary": summary}
+
+    report = _reports.get(fingerprint)
+    if report is not None:
+        return {**result, "status": "ready", "report": report}
+
+    if _failures.get(fingerprint) is not None:
+        return {**result, "status": "failed", "report": FAILED_MESSAGE}
+
+    with _pending_lock:
+        future = _pending.get(fingerprint)
+        submitted = future is None
+        if submitted:
+            future = _executor.submit(_backends[backend], build_prompt(summary), summary, model)
+            _pending[fingerprint] = future
+
+    if submitted:
+        # Outside the lock: the callback runs inline if the call already finished
+        future.add_done_callback(lambda f: _finish(fingerprint, f))
+
+    try:
+        report = future.result(timeout=timeout)
+    except FutureTimeout:
+        return {**result, "status": "pending", "report": PENDING_MESSAGE}
+    except Exception:
+        return {**result, "status": "failed", "report": FAILED_MESSAGE}
+
+    return {**result, "status": "ready", "report": report}
+
+
+def local_report(summary):
+    """Plain figures from the stub backend, shown while a model report is not ready."""
+    return _backends["stub"](None, summary, None)
+
+
+def invalidate_payroll_insights():
+    _reports.invalidate()
+    _failures.invalidate()
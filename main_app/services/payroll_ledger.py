@@ -0,0 +1,224 @@
+from sqlalchemy import case, delete, event, extract, func, insert, or_, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE, NEVER_SET
+
+from main_app.extensions import db
+from main_app.models.payroll_models import (
+    Payroll, PayrollDeduction, PayrollLedger, PayrollPeriod
+)
+
+
+# Employees / payrolls / periods touched in the current unit of work
+PENDING_EMPLOYEES_KEY = "payroll_ledger_employees"
+PENDING_PAYROLLS_KEY = "payroll_ledger_payrolls"
+PENDING_PERIODS_KEY = "payroll_ledger_periods"
+
+REFRESH_CHUNK_SIZE = 500
+
+# Ledger column -> deduction name patterns (matched case-insensitively)
+CONTRIBUTION_PATTERNS = {
+    "ytd_sss": ("%sss%",),
+    "ytd_philhealth": ("%philhealth%", "%phic%"),
+    "ytd_pagibig": ("%pag-ibig%", "%pagibig%", "%hdmf%"),
+    "ytd_gsis": ("%gsis%",),
+    "ytd_tax": ("%tax%",),
+}
+
+_YEAR = extract("year", PayrollPeriod.start_date)
+
+
+# ============================================================
+# LEDGER REFRESH
+# ============================================================
+
+def _ledger_rows(session, employee_ids=None):
+    """One ledger dict per (employee, year), from two grouped queries."""
+    totals = (
+        select(
+            Payroll.employee_id,
+            _YEAR,
+            func.count(Payroll.id),
+            func.coalesce(func.sum(Payroll.gross_pay), 0),
+            func.coalesce(func.sum(Payroll.total_deductions), 0),
+            func.coalesce(func.sum(Payroll.net_pay), 0),
+            func.max(PayrollPeriod.end_date)
+        )
+        .join(PayrollPeriod, PayrollPeriod.id == Payroll.payroll_period_id)
+        .group_by(Payroll.employee_id, _YEAR)
+    )
+
+    name = func.lower(PayrollDeduction.deduction_name)
+    contributions = (
+        select(
+            Payroll.employee_id,
+            _YEAR,
+            *[
+                func.coalesce(func.sum(case(
+                    (or_(*[name.like(p) for p in patterns]), PayrollDeduction.employee_share),
+                    else_=0
+                )), 0)
+                for patterns in CONTRIBUTION_PATTERNS.values()
+            ]
+        )
+        .join(Payroll, Payroll.id == PayrollDeduction.payroll_id)
+        .join(PayrollPeriod, PayrollPeriod.id == Payroll.payroll_period_id)
+        .group_by(Payroll.employee_id, _YEAR)
+    )
+
+    if employee_ids is not None:
+        totals = totals.where(Payroll.employee_id.in_(employee_ids))
+        contributions = contributions.where(Payroll.employee_id.in_(employee_ids))
+
+    rows = {}
+    for emp_id, year, count, gross, deductions, net, last_end in session.execute(totals):
+        rows[(emp_id, int(year))] = dict(
+            employee_id=emp_id,
+            year=int(year),
+            payroll_count=count,
+            ytd_gross=round(float(gross), 2),
+            ytd_deductions=round(float(deductions), 2),
+            ytd_net=round(float(net), 2),
+            last_period_end=last_end,
+            **{column: 0.0 for column in CONTRIBUTION_PATTERNS}
+        )
+
+    for emp_id, year, *amounts in session.execute(contributions):
+        row = rows.get((emp_id, int(year)))
+        if row is not None:
+            row.update({
+                column: round(float(amount), 2)
+                for column, amount in zip(CONTRIBUTION_PATTERNS, amounts)
+            })
+
+    return list(rows.values())
+
+
+def refresh_payroll_ledger(employee_ids, session=None):
+    """
+    Recompute every ledger year of the given employees from their payroll
+    rows. Does not commit.
+    """
+    session = session or db.session
+    ids = sorted({i for i in employee_ids if i is not None})
+    written = 0
+
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        chunk = ids[start:start + REFRESH_CHUNK_SIZE]
+        session.execute(
+            delete(PayrollLedger)
+            .where(PayrollLedger.employee_id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        payload = _ledger_rows(session, chunk)
+        if payload:
+            session.execute(insert(PayrollLedger), payload)
+        written += len(payload)
+
+    return {"employees": len(ids), "rows": written}
+
+
+def rebuild_payroll_ledger():
+    """Rebuild the whole ledger from payroll history."""
+    db.session.execute(delete(PayrollLedger))
+    payload = _ledger_rows(db.session)
+    if payload:
+        db.session.execute(insert(PayrollLedger), payload)
+    db.session.commit()
+    return {"rows": len(payload)}
+
+
+# ============================================================
+# READERS
+# ============================================================
+
+def employee_ledger(employee_id):
+    """Ledger rows of one employee, newest year first."""
+    return (
+        PayrollLedger.query
+        .filter_by(employee_id=employee_id)
+        .order_by(PayrollLedger.year.desc())
+        .all()
+    )
+
+
+def employee_year_summary(employee_id, year):
+    """Annual totals of one employee (BIR / portal summary) from one row."""
+    row = PayrollLedger.query.filter_by(employee_id=employee_id, year=year).first()
+
+    return {
+        "total_gross_pay": row.ytd_gross if row else 0,
+        "total_deductions": row.ytd_deductions if row else 0,
+        "total_net_pay": row.ytd_net if row else 0,
+        "total_sss": row.ytd_sss if row else 0,
+        "total_philhealth": row.ytd_philhealth if row else 0,
+        "total_pagibig": row.ytd_pagibig if row else 0,
+        "total_gsis": row.ytd_gsis if row else 0,
+        "total_tax": row.ytd_tax if row else 0,
+        "payroll_count": row.payroll_count if row else 0
+    }
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+def _mark(session, key, value):
+    if session is not None and value is not None:
+        session.info.setdefault(key, set()).add(value)
+
+
+def _payroll_written(mapper, connection, target):
+    _mark(object_session(target), PENDING_EMPLOYEES_KEY, target.employee_id)
+
+
+def _payroll_employee_changed(target, value, oldvalue, initiator):
+    # A reassigned payroll leaves the previous employee's ledger stale too
+    if oldvalue not in (NO_VALUE, NEVER_SET) and oldvalue != value:
+        _mark(object_session(target), PENDING_EMPLOYEES_KEY, oldvalue)
+
+
+def _deduction_written(mapper, connection, target):
+    _mark(object_session(target), PENDING_PAYROLLS_KEY, target.payroll_id)
+
+
+def _period_updated(mapper, connection, target):
+    # A moved start date can shift payrolls into another year
+    _mark(object_session(target), PENDING_PERIODS_KEY, target.id)
+
+
+def _flush_payroll_ledger(session):
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+
+    employees = session.info.pop(PENDING_EMPLOYEES_KEY, set())
+    payrolls = session.info.pop(PENDING_PAYROLLS_KEY, None)
+    periods = session.info.pop(PENDING_PERIODS_KEY, None)
+
+    if payrolls:
+        employees.update(session.scalars(
+            select(Payroll.employee_id).where(Payroll.id.in_(payrolls))
+        ))
+    if periods:
+        employees.update(session.scalars(
+            select(Payroll.employee_id).where(Payroll.payroll_period_id.in_(periods))
+        ))
+
+    if employees:
+        refresh_payroll_ledger(employees, session=session)
+
+
+def _discard_pending(session, *args):
+    for key in (PENDING_EMPLOYEES_KEY, PENDING_PAYROLLS_KEY, PENDING_PERIODS_KEY):
+        session.info.pop(key, None)
+
+
+def register_payroll_ledger():
+    """Keep payroll_ledger in step with ORM payroll writes."""
+    if not event.contains(Session, "before_commit", _flush_payroll_ledger):
+        for fn_event in ("after_insert", "after_update", "after_delete"):
+            event.listen(Payroll, fn_event, _payroll_written)
+            event.listen(PayrollDeduction, fn_event, _deduction_written)
+        event.listen(Payroll.employee_id, "set", _payroll_employee_changed, active_history=True)
+        event.listen(PayrollPeriod, "after_update", _period_updated)
+        event.listen(Session, "before_commit", _flush_payroll_ledger)
+        event.listen(Session, "after_rollback", _discard_pending)
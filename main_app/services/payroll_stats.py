@@ -0,0 +1,129 @@
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Department, Employee
+from main_app.models.payroll_models import Payroll
+
+
+STATS_TTL = 60
+
+# Set in session.info when a flush touches payroll/employee/department rows
+DIRTY_KEY = "payroll_stats_dirty"
+
+_stats_cache = TTLCache(ttl=STATS_TTL, maxsize=64)
+
+
+# ============================================================
+# GROUPED QUERIES
+# ============================================================
+
+def _status_counts():
+    stmt = (
+        select(
+            Payroll.status,
+            func.count(Payroll.id),
+            func.coalesce(func.sum(Payroll.net_pay), 0)
+        )
+        .group_by(Payroll.status)
+    )
+    return {
+        status: {"count": count, "net_pay": float(net)}
+        for status, count, net in db.session.execute(stmt)
+    }
+
+
+def _department_payrolls():
+    stmt = (
+        select(
+            Department.id,
+            Department.name,
+            func.count(Payroll.id),
+            func.coalesce(func.sum(Payroll.net_pay), 0)
+        )
+        .outerjoin(Employee, Employee.department_id == Department.id)
+        .outerjoin(Payroll, Payroll.employee_id == Employee.id)
+        .group_by(Department.id, Department.name)
+        .order_by(Department.id)
+    )
+    return [
+        {"id": dept_id, "department": name, "payrolls": count, "net_pay": round(float(net), 2)}
+        for dept_id, name, count, net in db.session.execute(stmt)
+    ]
+
+
+def _department_employees(status):
+    stmt = (
+        select(Department.id, Department.name, func.count(Employee.id))
+        .outerjoin(
+            Employee,
+            (Employee.department_id == Department.id) & (Employee.status == status)
+        )
+        .group_by(Department.id, Department.name)
+        .order_by(Department.id)
+    )
+    return [
+        {"id": dept_id, "name": name, "employee_count": count}
+        for dept_id, name, count in db.session.execute(stmt)
+    ]
+
+
+# ============================================================
+# CACHED ACCESSORS
+# ============================================================
+
+def payroll_status_counts():
+    """{status: {"count", "net_pay"}} over every payroll (one GROUP BY)."""
+    return _stats_cache.get_or_set("status", _status_counts)
+
+
+def department_payroll_totals():
+    """Payroll count and net pay per department, zero rows included."""
+    return _stats_cache.get_or_set("departments", _department_payrolls)
+
+
+def department_employee_counts(status="Active"):
+    """Employees with the given status per department, zero rows included."""
+    return _stats_cache.get_or_set(("employees", status), lambda: _department_employees(status))
+
+
+def total_employees():
+    return _stats_cache.get_or_set(
+        "employees_total", lambda: db.session.scalar(select(func.count(Employee.id))) or 0
+    )
+
+
+def invalidate_payroll_stats():
+    _stats_cache.invalidate()
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+_WATCHED = (Payroll, Employee, Department)
+
+
+def _mark_dirty(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _WATCHED):
+            session.info[DIRTY_KEY] = True
+            return
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop(DIRTY_KEY, False):
+        invalidate_payroll_stats()
+
+
+def _discard_dirty(session, *args):
+    session.info.pop(DIRTY_KEY, None)
+
+
+def register_payroll_stats():
+    """Drop cached payroll statistics whenever a commit wrote payroll data."""
+    if not event.contains(Session, "after_commit", _invalidate_on_commit):
+        event.listen(Session, "before_flush", _mark_dirty)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_dirty)
@@ -0,0 +1,256 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from sqlalchemy import select
+
+from main_app.extensions import db
+from main_app.models.hr_models import Department, Employee
+from main_app.models.payroll_models import Payroll, PayrollDeduction, PayrollPeriod, Payslip
+
+
+# Below this many missing PDFs a process pool costs more than it saves
+POOL_THRESHOLD = 8
+BATCH_SIZE = 25
+
+
+# ============================================================
+# PAYSLIP CONTENT
+# ============================================================
+
+def load_payslip_contexts(payslip_ids=None, period_id=None):
+    """
+    Plain dicts with everything printed on each payslip, from two
+    queries. Dicts are picklable so they can cross into worker processes.
+    """
+    stmt = (
+        select(
+            Payslip.id,
+            Payslip.payslip_number,
+            Payslip.gross_pay,
+            Payslip.total_deductions,
+            Payslip.net_pay,
+            Payroll.id.label("payroll_id"),
+            Payroll.basic_salary,
+            Payroll.working_hours,
+            Employee.employee_id.label("employee_code"),
+            Employee.first_name,
+            Employee.middle_name,
+            Employee.last_name,
+            Department.name.label("department"),
+            PayrollPeriod.period_name,
+            PayrollPeriod.start_date,
+            PayrollPeriod.end_date,
+            PayrollPeriod.pay_date
+        )
+        .join(Payroll, Payroll.id == Payslip.payroll_id)
+        .join(Employee, Employee.id == Payslip.employee_id)
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(PayrollPeriod, PayrollPeriod.id == Payroll.payroll_period_id)
+        .order_by(Payslip.id)
+    )
+    if payslip_ids is not None:
+        stmt = stmt.where(Payslip.id.in_(list(payslip_ids)))
+    if period_id is not None:
+        stmt = stmt.where(Payroll.payroll_period_id == period_id)
+
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return []
+
+    breakdown = defaultdict(list)
+    for payroll_id, name, share in db.session.execute(
+        select(PayrollDeduction.payroll_id, PayrollDeduction.deduction_name, PayrollDeduction.employee_share)
+        .where(PayrollDeduction.payroll_id.in_([r.payroll_id for r in rows]))
+        .order_by(PayrollDeduction.payroll_id, PayrollDeduction.id)
+    ):
+        breakdown[payroll_id].append([name or "", round(share or 0, 2)])
+
+    contexts = []
+    for r in rows:
+        contexts.append({
+            "payslip_id": r.id,
+            "payslip_number": r.payslip_number or f"PS-{r.id}",
+            "employee_code": r.employee_code,
+            "employee_name": f"{r.first_name} {r.middle_name or ''} {r.last_name}".strip(),
+            "department": r.department or "",
+            "period_name": r.period_name or "",
+            "period": f"{r.start_date} to {r.end_date}" if r.start_date else "",
+            "pay_date": str(r.pay_date or ""),
+            "basic_salary": round(r.basic_salary or 0, 2),
+            "working_hours": round(r.working_hours or 0, 2),
+            "gross_pay": round(r.gross_pay or 0, 2),
+            "total_deductions": round(r.total_deductions or 0, 2),
+            "net_pay": round(r.net_pay or 0, 2),
+            "deductions": breakdown.get(r.payroll_id, []),
+        })
+    return contexts
+
+
+def content_hash(context):
+    payload = json.dumps(context, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# ============================================================
+# DISK CACHE
+# ============================================================
+
+def pdf_cache_dir():
+    path = current_app.config.get("PAYSLIP_PDF_DIR") or os.path.join(current_app.instance_path, "payslips")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cached_pdf_path(context, cache_dir=None):
+    """<cache>/<payslip id>-<content hash>.pdf; new content means a new file."""
+    cache_dir = cache_dir or pdf_cache_dir()
+    return os.path.join(cache_dir, f"{context['payslip_id']}-{content_hash(context)}.pdf")
+
+
+def _drop_stale(payslip_id, keep, cache_dir):
+    for path in glob.glob(os.path.join(cache_dir, f"{payslip_id}-*.pdf")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ============================================================
+# RENDERING (runs in worker processes; no app context needed)
+# ============================================================
+
+def render_payslip_pdf(context, path):
+    """Write one payslip PDF to path atomically."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A5, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    money = "{:,.2f}".format
+
+    # Unique per call: job threads in one process may render the same payslip
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    doc = SimpleDocTemplate(
+        tmp_path,
+        pagesize=landscape(A5),
+        leftMargin=30,
+        rightMargin=30,
+        topMargin=24,
+        bottomMargin=24,
+        title=context["payslip_number"]
+    )
+
+    info = Table([
+        ["Payslip No.", context["payslip_number"], "Pay Period", context["period"]],
+        ["Employee", context["employee_name"], "Pay Date", context["pay_date"]],
+        ["Employee ID", context["employee_code"], "Department", context["department"]],
+    ], colWidths=[70, 170, 70, 190])
+    info.setStyle(TableStyle([
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+    ]))
+
+    lines = [
+        ["Basic Salary", money(context["basic_salary"])],
+        ["Hours Worked", money(context["working_hours"])],
+        ["Gross Pay", money(context["gross_pay"])],
+    ]
+    lines += [[name, f"-{money(amount)}"] for name, amount in context["deductions"]]
+    lines += [
+        ["Total Deductions", money(context["total_deductions"])],
+        ["NET PAY", money(context["net_pay"])],
+    ]
+    amounts = Table(lines, colWidths=[300, 200])
+    amounts.setStyle(TableStyle([
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+        ("LINEABOVE", (0, -2), (-1, -2), 0.5, colors.grey),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("BACKGROUND", (0, -1), (-1, -1), colors.whitesmoke),
+    ]))
+
+    try:
+        doc.build([
+            Paragraph(f"PAYSLIP - {context['period_name']}", styles["Heading2"]),
+            info,
+            Spacer(1, 10),
+            amounts,
+        ])
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _render_batch(jobs):
+    return [render_payslip_pdf(context, path) for context, path in jobs]
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def get_payslip_pdf(payslip_id):
+    """Path of the payslip's PDF, rendering it only when not cached."""
+    contexts = load_payslip_contexts(payslip_ids=[payslip_id])
+    if not contexts:
+        return None
+
+    cache_dir = pdf_cache_dir()
+    path = cached_pdf_path(contexts[0], cache_dir)
+    if not os.path.exists(path):
+        render_payslip_pdf(contexts[0], path)
+        _drop_stale(payslip_id, path, cache_dir)
+    return path
+
+
+def render_period_payslips(period_id, max_workers=None):
+    """
+    Pre-render every payslip PDF of a period into the disk cache across
+    a process pool. Already cached PDFs are skipped. Returns a stats dict.
+    """
+    started = time.perf_counter()
+    cache_dir = pdf_cache_dir()
+
+    jobs = []
+    contexts = load_payslip_contexts(period_id=period_id)
+    for context in contexts:
+        path = cached_pdf_path(context, cache_dir)
+        if not os.path.exists(path):
+            jobs.append((context, path))
+
+    batches = [jobs[i:i + BATCH_SIZE] for i in range(0, len(jobs), BATCH_SIZE)]
+    max_workers = max_workers or current_app.config.get("PAYSLIP_PDF_WORKERS")
+
+    if len(jobs) < POOL_THRESHOLD:
+        for batch in batches:
+            _render_batch(batch)
+    else:
+        # Called from job threads inside a threaded server: fork would copy
+        # locks held by other threads into the children, so spawn workers
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(_render_batch, batches))
+
+    for context, path in jobs:
+        _drop_stale(context["payslip_id"], path, cache_dir)
+
+    return {
+        "period_id": period_id,
+        "payslips": len(contexts),
+        "rendered": len(jobs),
+        "cached": len(contexts) - len(jobs),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
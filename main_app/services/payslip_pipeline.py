@@ -0,0 +1,104 @@
+import time
+from datetime import datetime
+
+from sqlalchemy import exists, insert, select
+
+from main_app.extensions import db
+from main_app.models.payroll_models import Payroll, PayrollPeriod, Payslip
+
+
+INSERT_CHUNK_SIZE = 1000
+
+
+# ============================================================
+# PAYSLIP NUMBERS
+# ============================================================
+
+def payslip_number(period_end, payroll_id):
+    """
+    Deterministic payslip number: PS-<period YYYYMM>-<payroll id>.
+    A payroll has at most one payslip, so the number never collides.
+    """
+    stamp = period_end.strftime("%Y%m") if period_end else "000000"
+    return f"PS-{stamp}-{payroll_id:06d}"
+
+
+def payslip_values(payroll, period_end=None):
+    """Column values for the payslip of a single Payroll row."""
+    if period_end is None and payroll.period is not None:
+        period_end = payroll.period.end_date
+
+    return dict(
+        employee_id=payroll.employee_id,
+        payroll_id=payroll.id,
+        payslip_number=payslip_number(period_end, payroll.id),
+        gross_pay=payroll.gross_pay,
+        total_deductions=payroll.total_deductions,
+        net_pay=payroll.net_pay,
+        generated_at=datetime.utcnow()
+    )
+
+
+# ============================================================
+# PERIOD PIPELINE
+# ============================================================
+
+def generate_period_payslips(period_id, chunk_size=INSERT_CHUNK_SIZE):
+    """
+    Create the missing payslips of a payroll period.
+
+    Payrolls without a payslip are found with one anti-join and the new
+    rows are bulk-inserted in chunks; nothing is loaded per payroll.
+    Commits and returns a stats dict.
+    """
+    started = time.perf_counter()
+
+    period = db.session.get(PayrollPeriod, period_id)
+    if period is None:
+        raise ValueError(f"Payroll period {period_id} not found.")
+
+    total = db.session.scalar(
+        select(db.func.count(Payroll.id)).where(Payroll.payroll_period_id == period_id)
+    ) or 0
+
+    rows = db.session.execute(
+        select(
+            Payroll.id,
+            Payroll.employee_id,
+            Payroll.gross_pay,
+            Payroll.total_deductions,
+            Payroll.net_pay
+        )
+        .where(
+            Payroll.payroll_period_id == period_id,
+            ~exists().where(Payslip.payroll_id == Payroll.id)
+        )
+        .order_by(Payroll.id)
+    ).all()
+
+    generated_at = datetime.utcnow()
+    payload = [
+        dict(
+            employee_id=r.employee_id,
+            payroll_id=r.id,
+            payslip_number=payslip_number(period.end_date, r.id),
+            gross_pay=r.gross_pay,
+            total_deductions=r.total_deductions,
+            net_pay=r.net_pay,
+            generated_at=generated_at
+        )
+        for r in rows
+    ]
+
+    for start in range(0, len(payload), chunk_size):
+        db.session.execute(insert(Payslip), payload[start:start + chunk_size])
+
+    db.session.commit()
+
+    return {
+        "period_id": period_id,
+        "payrolls": total,
+        "created": len(payload),
+        "skipped": total - len(payload),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
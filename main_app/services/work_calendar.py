@@ -0,0 +1,295 @@
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session, object_session
+
+from main_app.extensions import db
+from main_app.helpers.cache import TTLCache
+from main_app.models.hr_models import Attendance, Department, Employee, Holiday, WorkingDay, WorkShift
+from main_app.services.working_hours import DEFAULT_SCHEDULE, WorkSchedule
+
+
+# Calendar of departments without a shift (the default shift's work week if any)
+STANDARD_CALENDAR = 0
+STANDARD_WORKDAYS = "1111100"
+
+# Holiday types that are days off; "Special Working" days stay working days
+NON_WORKING_HOLIDAYS = ("Regular", "Special")
+
+CALENDAR_START = date(2000, 1, 1)
+CALENDAR_END = date(2040, 12, 31)
+
+CALENDAR_TTL = 3600
+
+# Set in session.info when a flush touches shifts, holidays or departments
+DIRTY_KEY = "work_calendar_dirty"
+REBUILD_KEY = "work_calendar_rebuild"
+
+# {employee_id: WorkSchedule} for the Attendance rows of the running flush
+SCHEDULES_KEY = "work_calendar_flush_schedules"
+
+_calendar_cache = TTLCache(ttl=CALENDAR_TTL, maxsize=64)
+
+
+# ============================================================
+# SHIFTS & SCHEDULES
+# ============================================================
+
+def _load_config(bind):
+    shifts = bind.execute(select(
+        WorkShift.id, WorkShift.start_time, WorkShift.end_time, WorkShift.lunch_hours,
+        WorkShift.lunch_after_hours, WorkShift.workdays, WorkShift.is_default
+    ).order_by(WorkShift.id)).all()
+
+    default = next((s for s in shifts if s.is_default), None)
+    schedules = {
+        s.id: WorkSchedule(s.start_time, s.end_time, s.lunch_hours, s.lunch_after_hours)
+        for s in shifts
+    }
+    schedules[STANDARD_CALENDAR] = schedules[default.id] if default else DEFAULT_SCHEDULE
+
+    workdays = {s.id: s.workdays for s in shifts}
+    workdays[STANDARD_CALENDAR] = default.workdays if default else STANDARD_WORKDAYS
+
+    return {
+        "schedules": schedules,
+        "workdays": workdays,
+        "departments": dict(bind.execute(
+            select(Department.id, Department.shift_id).where(Department.shift_id.isnot(None))
+        ).all()),
+        "holidays": dict(bind.execute(select(Holiday.date, Holiday.holiday_type)).all()),
+    }
+
+
+def _config(bind=None):
+    return _calendar_cache.get_or_set("config", lambda: _load_config(bind or db.session))
+
+
+def calendar_for_department(department_id, bind=None):
+    """Shift calendar id of a department (STANDARD_CALENDAR when unassigned)."""
+    return _config(bind)["departments"].get(department_id, STANDARD_CALENDAR)
+
+
+def department_schedule(department_id, bind=None):
+    """WorkSchedule of a department's shift."""
+    config = _config(bind)
+    return config["schedules"].get(calendar_for_department(department_id, bind), DEFAULT_SCHEDULE)
+
+
+def _employee_departments(employee_ids, bind):
+    ids = {i for i in employee_ids if i is not None}
+    if not ids:
+        return {}
+    return dict(bind.execute(
+        select(Employee.id, Employee.department_id).where(Employee.id.in_(ids))
+    ).all())
+
+
+def employee_schedules(employee_ids, bind=None):
+    """{employee_id: WorkSchedule} from one department lookup."""
+    bind = bind or db.session
+    departments = _employee_departments(employee_ids, bind)
+    return {
+        emp_id: department_schedule(departments.get(emp_id), bind)
+        for emp_id in {i for i in employee_ids if i is not None}
+    }
+
+
+def row_schedules(employee_ids, bind=None):
+    """One WorkSchedule per row, aligned with employee_ids, for the batch kernels."""
+    by_employee = employee_schedules(employee_ids, bind)
+    fallback = department_schedule(None, bind)
+    return [by_employee.get(emp_id, fallback) for emp_id in employee_ids]
+
+
+def attendance_schedule(attendance, bind=None):
+    """
+    WorkSchedule of one Attendance row. Inside a flush this is read from the
+    schedules resolved once in before_flush instead of a lookup per row.
+    """
+    session = object_session(attendance)
+    resolved = session.info.get(SCHEDULES_KEY, {}) if session is not None else {}
+    if attendance.employee_id in resolved:
+        return resolved[attendance.employee_id]
+    return row_schedules([attendance.employee_id], bind)[0]
+
+
+# ============================================================
+# PRECOMPUTED WORKING-DAY TABLE
+# ============================================================
+
+def _calendar_rows(calendar_id, workdays, holidays, start, end):
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    weekday = (days.astype(np.int64) + 3) % 7   # 1970-01-01 was a Thursday; Monday = 0
+    mask = np.array([c == "1" for c in workdays.ljust(7, "0")[:7]])
+    is_work = mask[weekday]
+
+    holiday_types = [None] * len(days)
+    for day, holiday_type in holidays.items():
+        if start <= day <= end:
+            i = (day - start).days
+            holiday_types[i] = holiday_type
+            if holiday_type in NON_WORKING_HOLIDAYS:
+                is_work[i] = False
+
+    through = np.cumsum(is_work)
+    return [
+        dict(
+            calendar_id=calendar_id,
+            date=start + timedelta(days=i),
+            is_workday=work,
+            holiday_type=holiday_types[i],
+            workdays_through=count
+        )
+        for i, (work, count) in enumerate(zip(is_work.tolist(), through.tolist()))
+    ]
+
+
+def refresh_work_calendar(session=None, start=CALENDAR_START, end=CALENDAR_END):
+    """Regenerate working_day for the standard calendar and every shift. Does not commit."""
+    session = session or db.session
+    config = _load_config(session)
+
+    session.execute(delete(WorkingDay).execution_options(synchronize_session=False))
+    rows = 0
+    for calendar_id, workdays in config["workdays"].items():
+        payload = _calendar_rows(calendar_id, workdays, config["holidays"], start, end)
+        session.execute(insert(WorkingDay), payload)
+        rows += len(payload)
+    return {"calendars": len(config["workdays"]), "rows": rows}
+
+
+def rebuild_work_calendar(start=None, end=None):
+    """Rebuild the working-day table for a date range (default 2000-2040)."""
+    stats = refresh_work_calendar(db.session, start or CALENDAR_START, end or CALENDAR_END)
+    db.session.commit()
+    invalidate_work_calendar()
+    return stats
+
+
+# ============================================================
+# WORKING-DAY COUNTS
+# ============================================================
+
+def _load_calendar(calendar_id):
+    rows = db.session.execute(
+        select(WorkingDay.date, WorkingDay.is_workday, WorkingDay.workdays_through)
+        .where(WorkingDay.calendar_id == calendar_id)
+        .order_by(WorkingDay.date)
+    ).all()
+    if not rows:
+        return None
+    return {
+        "first": rows[0].date,
+        "is_workday": np.array([r.is_workday for r in rows], dtype=np.int64),
+        "through": np.array([r.workdays_through for r in rows], dtype=np.int64),
+    }
+
+
+def _busday_count(start, end, calendar_id):
+    """Fallback for dates outside the precomputed table."""
+    config = _config()
+    workdays = config["workdays"].get(calendar_id, STANDARD_WORKDAYS)
+    holidays = [d for d, t in config["holidays"].items() if t in NON_WORKING_HOLIDAYS]
+    return int(np.busday_count(
+        start, end + timedelta(days=1),
+        weekmask=workdays.ljust(7, "0")[:7], holidays=holidays
+    ))
+
+
+def working_days_between(start, end, calendar_id=STANDARD_CALENDAR):
+    """Working days in [start, end] (inclusive) from the prefix-sum table."""
+    if not start or not end or end < start:
+        return 0
+
+    calendar = _calendar_cache.get_or_set(("calendar", calendar_id), lambda: _load_calendar(calendar_id))
+    if calendar is not None:
+        s = (start - calendar["first"]).days
+        e = (end - calendar["first"]).days
+        if s >= 0 and e < len(calendar["through"]):
+            return int(calendar["through"][e] - calendar["through"][s] + calendar["is_workday"][s])
+
+    return _busday_count(start, end, calendar_id)
+
+
+def department_working_days(start, end, department_id=None):
+    return working_days_between(start, end, calendar_for_department(department_id))
+
+
+def employee_working_days(employee_id, start, end):
+    """Working days in [start, end] on the employee's department calendar."""
+    department_id = db.session.scalar(select(Employee.department_id).where(Employee.id == employee_id))
+    return department_working_days(start, end, department_id)
+
+
+def invalidate_work_calendar():
+    _calendar_cache.invalidate()
+
+
+# ============================================================
+# SESSION HOOKS
+# ============================================================
+
+def _mark_dirty(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (WorkShift, Holiday)):
+            session.info[REBUILD_KEY] = True
+            session.info[DIRTY_KEY] = True
+        elif isinstance(obj, Department):
+            session.info[DIRTY_KEY] = True
+
+
+def _resolve_schedules(session, flush_context, instances):
+    rows = [obj for obj in (*session.new, *session.dirty) if isinstance(obj, Attendance)]
+    if not rows:
+        session.info.pop(SCHEDULES_KEY, None)
+        return
+
+    departments = _employee_departments({r.employee_id for r in rows}, session)
+    # Department moves flushed together with the attendance rows win
+    departments.update({
+        obj.id: obj.department_id
+        for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Employee) and obj.id in departments
+    })
+    session.info[SCHEDULES_KEY] = {
+        emp_id: department_schedule(department_id, session)
+        for emp_id, department_id in departments.items()
+    }
+
+
+def _forget_schedules(session, flush_context):
+    session.info.pop(SCHEDULES_KEY, None)
+
+
+def _rebuild_on_commit(session):
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    if session.info.pop(REBUILD_KEY, False):
+        refresh_work_calendar(session)
+
+
+def _invalidate_on_commit(session):
+    if session.info.pop(DIRTY_KEY, False):
+        invalidate_work_calendar()
+
+
+def _discard_dirty(session, *args):
+    session.info.pop(REBUILD_KEY, None)
+    session.info.pop(DIRTY_KEY, None)
+    session.info.pop(SCHEDULES_KEY, None)
+
+
+def register_work_calendar():
+    """
+    Regenerate the working-day table when shifts or holidays are committed,
+    and resolve Attendance schedules once per flush.
+    """
+    if not event.contains(Session, "before_commit", _rebuild_on_commit):
+        event.listen(Session, "before_flush", _mark_dirty)
+        event.listen(Session, "before_flush", _resolve_schedules)
+        event.listen(Session, "after_flush_postexec", _forget_schedules)
+        event.listen(Session, "before_commit", _rebuild_on_commit)
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+        event.listen(Session, "after_rollback", _discard_dirty)
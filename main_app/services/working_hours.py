@@ -0,0 +1,147 @@
+from datetime import time
+
+import numpy as np
+
+
+# ============================================================
+# SCHEDULE
+# ============================================================
+
+class WorkSchedule:
+    """Official hours and lunch policy used to score attendance punches."""
+
+    __slots__ = ("start", "end", "lunch_hours", "lunch_after_hours")
+
+    def __init__(self, start=time(8, 0), end=time(17, 0), lunch_hours=1.0, lunch_after_hours=4.0):
+        self.start = start
+        self.end = end
+        # Lunch is taken off only when the clamped span is longer than this
+        self.lunch_hours = lunch_hours
+        self.lunch_after_hours = lunch_after_hours
+
+    @property
+    def start_seconds(self):
+        return self.start.hour * 3600 + self.start.minute * 60 + self.start.second
+
+    @property
+    def end_seconds(self):
+        return self.end.hour * 3600 + self.end.minute * 60 + self.end.second
+
+
+DEFAULT_SCHEDULE = WorkSchedule()
+
+
+# ============================================================
+# INPUT CONVERSION
+# ============================================================
+
+def _to_seconds(value):
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, str):
+        parts = [int(p) for p in value.split(":")]
+        parts += [0] * (3 - len(parts))
+        return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    if value != value:  # NaN / NaT from pandas
+        return np.nan
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def time_seconds(values):
+    """
+    Seconds since midnight for time objects or "HH:MM[:SS]" strings, NaN
+    for missing ones. Float/integer arrays are passed through.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "fiu":
+        return values.astype(float, copy=False)
+    return np.fromiter((_to_seconds(v) for v in values), dtype=float, count=len(values))
+
+
+def _schedule_arrays(schedule, n):
+    """(start, end, lunch, lunch_after) as scalars, or per-row arrays for a schedule list."""
+    if isinstance(schedule, WorkSchedule):
+        return schedule.start_seconds, schedule.end_seconds, schedule.lunch_hours, schedule.lunch_after_hours
+
+    # Few distinct schedules: encode rows by schedule and gather
+    distinct = {}
+    codes = np.fromiter(
+        (distinct.setdefault(id(s), (len(distinct), s))[0] for s in schedule), dtype=np.int64, count=n
+    )
+    table = np.array(
+        [(s.start_seconds, s.end_seconds, s.lunch_hours, s.lunch_after_hours) for _, s in distinct.values()],
+        dtype=float
+    ).reshape(-1, 4)
+    return tuple(table[codes, i] for i in range(4))
+
+
+def _round_hours(values):
+    """
+    round(x, 2) for every value, bit-for-bit like Python's round(): np.round
+    scales by 100 first and can land on the other side of a .xx5 tie
+    (5.135 -> 5.14 instead of 5.13), so near-ties go through round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        idx = np.flatnonzero(near_tie)
+        rounded[idx] = [round(v, 2) for v in values[idx].tolist()]
+    return rounded
+
+
+# ============================================================
+# KERNEL
+# ============================================================
+
+def compute_working_hours(time_ins, time_outs, absent=None, schedule=DEFAULT_SCHEDULE):
+    """
+    Working hours, late minutes and undertime minutes for many punches.
+
+    time_ins / time_outs are time objects, strings or seconds since
+    midnight (NaN = missing); absent is a boolean array; schedule is one
+    WorkSchedule or one per row (e.g. per department). Hours are the
+    punches clamped to the schedule minus lunch when over the threshold,
+    0 for absences and incomplete punches. Late counts from time-in alone;
+    undertime is time-out before the end of day on non-absent days.
+    Returns a dict of NumPy arrays (hours, late, late_minutes,
+    undertime_minutes).
+    """
+    tin = time_seconds(time_ins)
+    tout = time_seconds(time_outs)
+    absent = np.zeros(len(tin), dtype=bool) if absent is None else np.asarray(absent, dtype=bool)
+
+    work_start, work_end, lunch_hours, lunch_after_hours = _schedule_arrays(schedule, len(tin))
+
+    start = np.maximum(tin, work_start)
+    end = np.minimum(tout, work_end)
+    with np.errstate(invalid="ignore"):
+        total = (end - start) / 3600
+        valid = ~absent & (end > start)  # False whenever a punch is NaN
+
+    hours = np.where(total > lunch_after_hours, total - lunch_hours, total)
+    hours = _round_hours(np.where(valid, hours, 0.0))
+
+    with np.errstate(invalid="ignore"):
+        is_late = tin > work_start
+        late = np.where(is_late, np.floor((tin - work_start) / 60), 0)
+        undertime = np.where(~absent & (tout < work_end), np.floor((work_end - tout) / 60), 0)
+
+    return {
+        "hours": hours,
+        "late": is_late,
+        "late_minutes": late.astype(np.int64),
+        "undertime_minutes": undertime.astype(np.int64),
+    }
+
+
+def compute_working_hours_batch(time_ins, time_outs, statuses, schedule=DEFAULT_SCHEDULE):
+    """Working hours as a list of floats for rows with Attendance-style statuses."""
+    absent = np.fromiter((s == "Absent" for s in statuses), dtype=bool, count=len(statuses))
+    return compute_working_hours(time_ins, time_outs, absent, schedule)["hours"].tolist()
+
+
+def working_hours_for(time_in, time_out, status=None, schedule=None):
+    """Working hours of a single punch pair."""
+    if status == "Absent" or not time_in or not time_out:
+        return 0.0
+    return compute_working_hours_batch([time_in], [time_out], [status], schedule or DEFAULT_SCHEDULE)[0]
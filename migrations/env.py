@@ -94,6 +94,14 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
+    # The employee search FTS5 table and its shadow tables are managed by
+    # hand (see services/employee_search.py), not by autogenerate
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (type_ == "table" and name.startswith("employee_fts"))
+
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
+
     connectable = get_engine()
 
     with connectable.connect() as connection:
@@ -0,0 +1,68 @@
+"""unique attendance per employee per day
+
+Revision ID: 8f41c2d9a7e3
+Revises: 5d2a8e7c4b10
+Create Date: 2026-03-11 16:42:07.530911
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# revision identifiers, used by Alembic.
+revision = '8f41c2d9a7e3'
+down_revision = '5d2a8e7c4b10'
+branch_labels = None
+depends_on = None
+
+
+def _backup(bind, table, where):
+    """Copy the rows about to be deleted into <table>_duplicate_backup."""
+    backup = f"{table}_duplicate_backup"
+    if sa.inspect(bind).has_table(backup):
+        op.execute(f"INSERT INTO {backup} SELECT * FROM {table} WHERE {where}")
+    else:
+        op.execute(f"CREATE TABLE {backup} AS SELECT * FROM {table} WHERE {where}")
+    return backup
+
+
+def upgrade():
+    # Keep the first row of any duplicated (employee_id, date) pair so the
+    # constraint can be created on existing data. Removed rows are copied
+    # to *_duplicate_backup tables first so they can be reviewed/restored.
+    duplicates = """
+        SELECT id FROM attendance a
+        WHERE EXISTS (
+            SELECT 1 FROM attendance b
+            WHERE b.employee_id = a.employee_id
+              AND b.date = a.date
+              AND b.id < a.id
+        )
+    """
+    bind = op.get_bind()
+    count = bind.execute(sa.text(f"SELECT COUNT(*) FROM ({duplicates}) d")).scalar()
+    if count:
+        if sa.inspect(bind).has_table('late_computation'):
+            backup = _backup(bind, 'late_computation', f"attendance_id IN ({duplicates})")
+            logger.warning("Backed up late_computation rows of duplicate attendance to %s", backup)
+            op.execute(f"DELETE FROM late_computation WHERE attendance_id IN ({duplicates})")
+
+        backup = _backup(bind, 'attendance', f"id IN ({duplicates})")
+        logger.warning(
+            "Removing %s duplicate attendance row(s) (same employee and date); "
+            "copies are kept in %s", count, backup
+        )
+        op.execute(f"DELETE FROM attendance WHERE id IN ({duplicates})")
+
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_attendance_employee_date', ['employee_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_attendance_employee_date', type_='unique')
@@ -0,0 +1,57 @@
+"""employee search fts5 index
+
+Revision ID: f8b3d5e1a6c2
+Revises: d2a6f1c8b473
+Create Date: 2026-03-18 14:05:52.771903
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b3d5e1a6c2'
+down_revision = 'd2a6f1c8b473'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite only; other databases keep the ilike search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS employee_fts USING fts5("
+        "first_name, last_name, email, employee_id, "
+        "content='employee', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS employee_fts_ai AFTER INSERT ON employee BEGIN "
+        "INSERT INTO employee_fts(rowid, first_name, last_name, email, employee_id) "
+        "VALUES (new.id, new.first_name, new.last_name, new.email, new.employee_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS employee_fts_ad AFTER DELETE ON employee BEGIN "
+        "INSERT INTO employee_fts(employee_fts, rowid, first_name, last_name, email, employee_id) "
+        "VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.employee_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS employee_fts_au "
+        "AFTER UPDATE OF first_name, last_name, email, employee_id ON employee BEGIN "
+        "INSERT INTO employee_fts(employee_fts, rowid, first_name, last_name, email, employee_id) "
+        "VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.employee_id); "
+        "INSERT INTO employee_fts(rowid, first_name, last_name, email, employee_id) "
+        "VALUES (new.id, new.first_name, new.last_name, new.email, new.employee_id); END"
+    )
+    op.execute("INSERT INTO employee_fts(employee_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS employee_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS employee_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS employee_fts_ai")
+    op.execute("DROP TABLE IF EXISTS employee_fts")
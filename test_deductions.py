@@ -0,0 +1,53 @@
+"""
+Parity checks: compiled deduction rules in main_app/services/deduction_rules.py
+must give the same shares as the original first-match bracket walk
+(compute_deduction_shares), including salaries on shared boundaries.
+
+Run with `python -m pytest test_deductions.py` or `python test_deductions.py`.
+"""
+from types import SimpleNamespace
+
+from main_app.models.payroll_models import compute_deduction_shares
+from main_app.services.deduction_rules import CompiledDeduction
+
+
+# ------------------------
+# Compiled deduction brackets
+# ------------------------
+def bracket_deduction(calculation_type):
+    # Adjacent brackets share their boundaries (salary_to == next salary_from)
+    bounds = [(0, 10_000), (10_000, 20_000), (20_000, 30_000), (30_000, 50_000)]
+    brackets = [
+        SimpleNamespace(salary_from=lo, salary_to=hi, employee_share=100 * (i + 1),
+                        employer_share=200 * (i + 1), ec=10 * (i + 1),
+                        rate=0.01 * (i + 1), fixed_amount=5 * i)
+        for i, (lo, hi) in enumerate(bounds)
+    ]
+    return SimpleNamespace(id=1, name="Bracketed", calculation_type=calculation_type, rate=0,
+                           ceiling=None, floor=None, active=True, brackets=brackets)
+
+
+def test_compiled_brackets_match_first_match_walk():
+    salaries = [0, 5_000, 9_999.99, 10_000, 10_000.01, 20_000, 30_000, 50_000, 50_000.01, 75_000]
+    for calculation_type in ("bracket", "progressive"):
+        d = bracket_deduction(calculation_type)
+        rule = CompiledDeduction(d)
+        columns = rule.compute(salaries)
+        for i, salary in enumerate(salaries):
+            expected = compute_deduction_shares(d, salary)
+            assert rule.compute_one(salary) == expected, (calculation_type, salary)
+            for key, value in expected.items():
+                assert columns[key][i] == value, (calculation_type, salary, key)
+
+
+def test_shared_boundary_uses_lower_bracket():
+    rule = CompiledDeduction(bracket_deduction("bracket"))
+    assert rule.compute_one(10_000)["employee_share"] == 100
+    assert rule.compute_one(10_000.01)["employee_share"] == 200
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")
@@ -0,0 +1,112 @@
+"""
+Engine checks: run_period_payroll() in main_app/services/payroll_engine.py
+must pick up deduction edits committed between runs (compiled rules are
+cached by main_app/services/deduction_rules.py).
+
+Run with `python -m pytest test_payroll_engine.py`.
+"""
+from datetime import date, time
+
+import pytest
+
+from main_app.config import Config
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+    from main_app import create_app
+    from main_app.extensions import db
+    from main_app.services.deduction_rules import invalidate_deduction_rules
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        invalidate_deduction_rules()
+        yield app
+        db.session.remove()
+        invalidate_deduction_rules()
+
+
+def seed_period(month):
+    from main_app.extensions import db
+    from main_app.models.payroll_models import PayrollPeriod
+
+    period = PayrollPeriod(period_name=f"2025-{month:02d}", start_date=date(2025, month, 1),
+                           end_date=date(2025, month, 28), pay_date=date(2025, month, 28))
+    db.session.add(period)
+    db.session.commit()
+    return period
+
+
+def seed_employee():
+    from main_app.extensions import db
+    from main_app.models.hr_models import Attendance, Employee
+    from main_app.models.payroll_models import Deduction, DeductionBracket, EmployeeDeduction
+
+    employee = Employee(employee_id="E-001", first_name="First", last_name="Last",
+                        email="e1@example.com", date_hired=date(2020, 1, 1), salary=20_000,
+                        status="Active", archived=False)
+    deduction = Deduction(name="SSS", calculation_type="bracket", active=True, brackets=[
+        DeductionBracket(salary_from=0, salary_to=10_000, employee_share=100),
+        DeductionBracket(salary_from=10_000.01, salary_to=50_000, employee_share=500),
+    ])
+    db.session.add_all([employee, deduction])
+    db.session.flush()
+    db.session.add(EmployeeDeduction(employee_id=employee.id, deduction_id=deduction.id, active=True))
+    for month in (3, 4):
+        db.session.add(Attendance(employee_id=employee.id, date=date(2025, month, 3),
+                                  time_in=time(8, 0), time_out=time(17, 0)))
+    db.session.commit()
+    return employee, deduction
+
+
+def employee_share(period):
+    from main_app.models.payroll_models import Payroll, PayrollDeduction
+
+    payroll = Payroll.query.filter_by(payroll_period_id=period.id).one()
+    return PayrollDeduction.query.filter_by(payroll_id=payroll.id).one().employee_share
+
+
+def test_bracket_edit_applies_to_next_run(app):
+    from main_app.extensions import db
+    from main_app.models.payroll_models import DeductionBracket
+    from main_app.services.payroll_engine import run_period_payroll
+
+    employee, deduction = seed_employee()
+    march, april = seed_period(3), seed_period(4)
+
+    assert run_period_payroll(march.id)["created"] == 1
+    assert employee_share(march) == 500
+
+    bracket = DeductionBracket.query.filter_by(deduction_id=deduction.id, salary_to=50_000).one()
+    bracket.employee_share = 650
+    db.session.commit()
+
+    assert run_period_payroll(april.id)["created"] == 1
+    assert employee_share(april) == 650
+
+
+def test_rate_change_and_deactivation_apply_after_commit(app):
+    from main_app.extensions import db
+    from main_app.services.deduction_rules import get_deduction_rules
+
+    employee, deduction = seed_employee()
+    assert get_deduction_rules()[deduction.id].compute_one(20_000)["employee_share"] == 500
+
+    deduction.calculation_type = "fixed"
+    deduction.rate = 250
+    db.session.commit()
+    assert get_deduction_rules()[deduction.id].compute_one(20_000)["employee_share"] == 250
+
+    deduction.active = False
+    db.session.commit()
+    assert deduction.id not in get_deduction_rules()
+
+    # Rolled-back edits keep the cached rules
+    rules = get_deduction_rules()
+    deduction.active = True
+    db.session.flush()
+    db.session.rollback()
+    assert get_deduction_rules() is rules
@@ -0,0 +1,58 @@
+"""
+Export checks: rows streamed by main_app/services/docs.py must carry the
+same values as the Payroll ORM properties they replaced.
+
+Run with `python -m pytest test_payroll_export.py`.
+"""
+from datetime import date
+
+import pytest
+
+from main_app.config import Config
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+    from main_app import create_app
+    from main_app.extensions import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def seed_payrolls():
+    from main_app.extensions import db
+    from main_app.models.hr_models import Employee
+    from main_app.models.payroll_models import Payroll, PayrollPeriod
+
+    period = PayrollPeriod(period_name="March", start_date=date(2025, 3, 1),
+                           end_date=date(2025, 3, 31), pay_date=date(2025, 4, 5))
+    db.session.add(period)
+
+    samples = [(25_000, 0), (25_000, 3.5), (18_333.33, 7.25), (0, 4), (41_250.5, 12.75)]
+    for i, (basic, ot_hours) in enumerate(samples):
+        employee = Employee(employee_id=f"E-{i:03d}", first_name=f"First{i}", last_name=f"Last{i}",
+                            email=f"e{i}@example.com", date_hired=date(2020, 1, 1))
+        db.session.add(employee)
+        db.session.add(Payroll(employee=employee, period=period, basic_salary=basic,
+                               overtime_hours=ot_hours, gross_pay=basic, net_pay=basic))
+    db.session.commit()
+    return Payroll.query.order_by(Payroll.id).all()
+
+
+def test_export_overtime_pay_matches_orm(app):
+    from main_app.services.docs import EXPORT_COLUMNS, payroll_export_rows
+
+    payrolls = seed_payrolls()
+    rows = list(payroll_export_rows())
+    column = EXPORT_COLUMNS.index("Overtime Pay")
+
+    assert len(rows) == len(payrolls)
+    for payroll, row in zip(payrolls, rows):
+        assert row[column] == payroll.overtime_pay
+    assert any(row[column] > 0 for row in rows)
@@ -0,0 +1,237 @@
+"""
+Calendar checks: the precomputed working-day table in
+main_app/services/work_calendar.py must count the same days as a plain
+day-by-day loop, follow holidays and shifts, and give each attendance row
+its department's schedule.
+
+Run with `python -m pytest test_work_calendar.py`.
+"""
+import random
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from main_app.config import Config
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+    from main_app import create_app
+    from main_app.extensions import db
+    from main_app.services.work_calendar import invalidate_work_calendar
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        invalidate_work_calendar()
+        yield app
+        db.session.remove()
+        invalidate_work_calendar()
+
+
+def loop_count(start, end, workdays="1111100", days_off=()):
+    """Reference: walk every day in [start, end]."""
+    total = 0
+    day = start
+    while day <= end:
+        if workdays[day.weekday()] == "1" and day not in days_off:
+            total += 1
+        day += timedelta(days=1)
+    return total
+
+
+def seed_employees():
+    from main_app.extensions import db
+    from main_app.models.hr_models import Department, Employee
+
+    departments = [Department(name="Operations"), Department(name="Finance")]
+    db.session.add_all(departments)
+    db.session.flush()
+    employees = [
+        Employee(employee_id=f"E-{i:03d}", first_name=f"First{i}", last_name=f"Last{i}",
+                 email=f"e{i}@example.com", date_hired=date(2020, 1, 1),
+                 department_id=departments[i % 2].id)
+        for i in range(4)
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+    return departments, employees
+
+
+# ------------------------
+# Calendar rows
+# ------------------------
+def test_calendar_rows_weekday_mask_and_holidays():
+    from main_app.services.work_calendar import _calendar_rows
+
+    start, end = date(2025, 3, 1), date(2025, 3, 31)
+    holidays = {date(2025, 3, 5): "Regular", date(2025, 3, 8): "Special Working",
+                date(2025, 3, 12): "Special", date(2025, 4, 1): "Regular"}
+    rows = _calendar_rows(7, "1111110", holidays, start, end)
+
+    assert len(rows) == 31
+    assert rows[0]["date"] == start and rows[-1]["date"] == end
+    assert {r["calendar_id"] for r in rows} == {7}
+
+    by_date = {r["date"]: r for r in rows}
+    assert by_date[date(2025, 3, 1)]["is_workday"]           # Saturday on a Mon-Sat shift
+    assert not by_date[date(2025, 3, 2)]["is_workday"]       # Sunday
+    assert not by_date[date(2025, 3, 5)]["is_workday"]
+    assert by_date[date(2025, 3, 5)]["holiday_type"] == "Regular"
+    assert by_date[date(2025, 3, 8)]["is_workday"]
+    assert by_date[date(2025, 3, 8)]["holiday_type"] == "Special Working"
+    assert not by_date[date(2025, 3, 12)]["is_workday"]
+
+    days_off = {date(2025, 3, 5), date(2025, 3, 12)}
+    for row in rows:
+        assert row["workdays_through"] == loop_count(start, row["date"], "1111110", days_off)
+
+
+# ------------------------
+# Working-day counts
+# ------------------------
+def test_working_days_between_matches_loop(app):
+    from main_app.services.work_calendar import rebuild_work_calendar, working_days_between
+
+    # No table rows yet: numpy busday fallback
+    assert working_days_between(date(2025, 3, 1), date(2025, 3, 31)) == loop_count(
+        date(2025, 3, 1), date(2025, 3, 31))
+
+    rebuild_work_calendar(date(2024, 1, 1), date(2026, 12, 31))
+    rng = random.Random(25)
+    for _ in range(500):
+        start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 1000))
+        end = start + timedelta(days=rng.randint(0, 90))
+        assert working_days_between(start, end) == loop_count(start, end), (start, end)
+
+    # Ranges leaving the table fall back to the busday count
+    assert working_days_between(date(2023, 12, 1), date(2024, 1, 31)) == loop_count(
+        date(2023, 12, 1), date(2024, 1, 31))
+    assert working_days_between(date(2026, 12, 1), date(2027, 1, 31)) == loop_count(
+        date(2026, 12, 1), date(2027, 1, 31))
+
+    assert working_days_between(date(2025, 3, 31), date(2025, 3, 1)) == 0
+    assert working_days_between(None, date(2025, 3, 1)) == 0
+
+
+def test_holiday_commit_rebuilds_table(app):
+    from main_app.extensions import db
+    from main_app.models.hr_models import Holiday, WorkingDay
+    from main_app.services.work_calendar import rebuild_work_calendar, working_days_between
+
+    rebuild_work_calendar(date(2025, 1, 1), date(2025, 12, 31))
+    march = loop_count(date(2025, 3, 1), date(2025, 3, 31))
+    assert working_days_between(date(2025, 3, 1), date(2025, 3, 31)) == march
+
+    db.session.add(Holiday(date=date(2025, 3, 5), name="Holiday", holiday_type="Regular"))
+    db.session.add(Holiday(date=date(2025, 3, 8), name="Make-up day", holiday_type="Special Working"))
+    db.session.commit()
+
+    assert working_days_between(date(2025, 3, 1), date(2025, 3, 31)) == march - 1
+    row = WorkingDay.query.filter_by(calendar_id=0, date=date(2025, 3, 5)).one()
+    assert not row.is_workday and row.holiday_type == "Regular"
+
+    db.session.delete(Holiday.query.filter_by(date=date(2025, 3, 5)).one())
+    db.session.commit()
+    assert working_days_between(date(2025, 3, 1), date(2025, 3, 31)) == march
+
+
+# ------------------------
+# Per-department schedules
+# ------------------------
+def assign_late_shift(department):
+    from main_app.extensions import db
+    from main_app.models.hr_models import WorkShift
+
+    shift = WorkShift(name="Late shift", start_time=time(9, 0), end_time=time(18, 0), workdays="1111110")
+    db.session.add(shift)
+    db.session.flush()
+    department.shift_id = shift.id
+    db.session.commit()
+    return shift
+
+
+def test_department_shift_calendar(app):
+    from main_app.services.work_calendar import (
+        department_working_days, employee_working_days, rebuild_work_calendar,
+    )
+
+    departments, employees = seed_employees()
+    rebuild_work_calendar(date(2025, 1, 1), date(2025, 12, 31))
+    assign_late_shift(departments[0])
+
+    start, end = date(2025, 3, 1), date(2025, 3, 31)
+    assert department_working_days(start, end, departments[0].id) == loop_count(start, end, "1111110")
+    assert department_working_days(start, end, departments[1].id) == loop_count(start, end)
+    assert employee_working_days(employees[0].id, start, end) == loop_count(start, end, "1111110")
+    assert employee_working_days(employees[1].id, start, end) == loop_count(start, end)
+
+
+def test_attendance_uses_department_schedule(app):
+    from main_app.extensions import db
+    from main_app.models.hr_models import Attendance
+
+    departments, employees = seed_employees()
+    assign_late_shift(departments[0])
+
+    # 8:30 is on time for the 9:00 shift and late for the standard 8:00 one
+    rows = [Attendance(employee_id=e.id, date=date(2025, 4, 1), time_in=time(8, 30), time_out=time(18, 0))
+            for e in employees[:2]]
+    for row in rows:
+        row.check_late()
+    db.session.add_all(rows)
+    db.session.commit()
+
+    assert [r.status for r in rows] == ["Present", "Late"]
+    assert [r.working_hours for r in rows] == [8.0, 7.5]
+
+
+def test_flush_resolves_schedules_once(app):
+    from main_app.extensions import db
+    from main_app.models.hr_models import Attendance, Employee
+
+    departments, employees = seed_employees()
+    assign_late_shift(departments[0])
+    ids = [e.id for e in employees]
+
+    lookups = []
+
+    def count_lookups(conn, cursor, statement, parameters, context, executemany):
+        if "FROM employee" in statement:
+            lookups.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count_lookups)
+    try:
+        db.session.add_all([
+            Attendance(employee_id=emp_id, date=date(2025, 4, 2), time_in=time(8, 30), time_out=time(18, 0))
+            for emp_id in ids
+        ])
+        db.session.flush()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count_lookups)
+    db.session.commit()
+
+    assert len(lookups) == 1
+    hours = dict(db.session.query(Attendance.employee_id, Attendance.working_hours)
+                 .filter(Attendance.date == date(2025, 4, 2)))
+    assert hours == {ids[0]: 8.0, ids[1]: 7.5, ids[2]: 8.0, ids[3]: 7.5}
+
+    # A department move flushed with the attendance row applies to it
+    mover = db.session.get(Employee, ids[1])
+    mover.department_id = departments[0].id
+    db.session.add(Attendance(employee_id=mover.id, date=date(2025, 4, 3),
+                              time_in=time(8, 30), time_out=time(18, 0)))
+    # An employee inserted in the same flush falls back to a per-row lookup
+    newcomer = Employee(employee_id="E-100", first_name="New", last_name="Hire",
+                        email="new@example.com", date_hired=date(2025, 4, 1),
+                        department_id=departments[0].id)
+    db.session.add(Attendance(employee=newcomer, date=date(2025, 4, 3),
+                              time_in=time(8, 30), time_out=time(18, 0)))
+    db.session.commit()
+
+    hours = dict(db.session.query(Attendance.employee_id, Attendance.working_hours)
+                 .filter(Attendance.date == date(2025, 4, 3)))
+    assert hours == {mover.id: 8.0, newcomer.id: 8.0}
@@ -0,0 +1,90 @@
+"""
+Parity checks: the working-hours kernel in main_app/services/working_hours.py
+must match the per-row rule Attendance used to run, including punches
+with seconds (device imports produce those).
+
+Run with `python -m pytest test_working_hours.py` or `python test_working_hours.py`.
+"""
+import random
+from datetime import date, datetime, time
+
+import numpy as np
+
+from main_app.services.working_hours import (
+    WorkSchedule, compute_working_hours, compute_working_hours_batch, working_hours_for,
+)
+
+
+# ------------------------
+# Reference (original per-row) rule
+# ------------------------
+def ref_hours(time_in, time_out, status, start=time(8, 0), end=time(17, 0)):
+    if status == "Absent" or not time_in or not time_out:
+        return 0.0
+    day = date(2025, 1, 6)
+    work_start = datetime.combine(day, start)
+    work_end = datetime.combine(day, end)
+    actual_in = max(datetime.combine(day, time_in), work_start)
+    actual_out = min(datetime.combine(day, time_out), work_end)
+    if actual_out <= actual_in:
+        return 0.0
+    total_hours = (actual_out - actual_in).total_seconds() / 3600
+    return round(total_hours - 1, 2) if total_hours > 4 else round(total_hours, 2)
+
+
+# ------------------------
+# Sample punches
+# ------------------------
+def sample_punches(n=50_000, seed=2025):
+    rng = random.Random(seed)
+    statuses = rng.choices(["Present", "Late", "Absent"], [80, 12, 8], k=n)
+    time_ins = [
+        None if s == "Absent" else time(rng.randint(6, 10), rng.randint(0, 59), rng.randint(0, 59))
+        for s in statuses
+    ]
+    time_outs = [
+        None if s == "Absent" or rng.random() < 0.02
+        else time(rng.randint(11, 19), rng.randint(0, 59), rng.randint(0, 59))
+        for s in statuses
+    ]
+    return time_ins, time_outs, statuses
+
+
+TIME_INS, TIME_OUTS, STATUSES = sample_punches()
+
+
+# ------------------------
+# Tests
+# ------------------------
+def test_kernel_parity_with_seconds():
+    expected = [ref_hours(i, o, s) for i, o, s in zip(TIME_INS, TIME_OUTS, STATUSES)]
+    assert compute_working_hours_batch(TIME_INS, TIME_OUTS, STATUSES) == expected
+
+
+def test_rounding_ties():
+    # 6.135h - 1h lunch: Python's round() gives 5.13, np.round gives 5.14
+    assert working_hours_for(time(7, 40, 49), time(14, 8, 6), "Present") == 5.13
+    assert working_hours_for(time(7, 40, 49), time(14, 8, 6), "Present") == ref_hours(
+        time(7, 40, 49), time(14, 8, 6), "Present")
+
+
+def test_per_row_schedules():
+    late_shift = WorkSchedule(start=time(9, 0), end=time(18, 0))
+    schedules = [late_shift if i % 2 else WorkSchedule() for i in range(len(TIME_INS))]
+    result = compute_working_hours(
+        TIME_INS, TIME_OUTS, np.array([s == "Absent" for s in STATUSES]), schedules
+    )
+    for i in range(0, len(TIME_INS), 37):
+        schedule = schedules[i]
+        assert result["hours"][i] == ref_hours(
+            TIME_INS[i], TIME_OUTS[i], STATUSES[i], schedule.start, schedule.end
+        )
+        if TIME_INS[i] is not None:
+            assert bool(result["late"][i]) == (TIME_INS[i] > schedule.start)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: ok")